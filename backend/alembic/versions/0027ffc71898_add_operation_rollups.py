@@ -0,0 +1,58 @@
+"""Add hourly/daily operation rollup tables
+
+Revision ID: 0027ffc71898
+Revises: 5e0b7d31c8a4
+Create Date: 2026-10-18 12:51:03.227410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0027ffc71898'
+down_revision: Union[str, None] = '5e0b7d31c8a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _metric_columns():
+    return [
+        sa.Column('samples', sa.Integer(), nullable=False),
+        sa.Column('power_min', sa.Float(), nullable=True),
+        sa.Column('power_max', sa.Float(), nullable=True),
+        sa.Column('power_sum', sa.Float(), nullable=True),
+        sa.Column('voltage_min', sa.Float(), nullable=True),
+        sa.Column('voltage_max', sa.Float(), nullable=True),
+        sa.Column('voltage_sum', sa.Float(), nullable=True),
+        sa.Column('temperature_min', sa.Float(), nullable=True),
+        sa.Column('temperature_max', sa.Float(), nullable=True),
+        sa.Column('temperature_sum', sa.Float(), nullable=True),
+        sa.Column('fault_count', sa.Integer(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table('light_operation_rollups',
+    sa.Column('resolution', sa.String(), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('street_light_id', sa.Integer(), nullable=False),
+    *_metric_columns(),
+    sa.ForeignKeyConstraint(['street_light_id'], ['street_lights.id'], ),
+    sa.PrimaryKeyConstraint('resolution', 'bucket', 'street_light_id')
+    )
+    op.create_table('street_operation_rollups',
+    sa.Column('resolution', sa.String(), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('street_id', sa.Integer(), nullable=False),
+    *_metric_columns(),
+    sa.ForeignKeyConstraint(['street_id'], ['streets.id'], ),
+    sa.PrimaryKeyConstraint('resolution', 'bucket', 'street_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('street_operation_rollups')
+    op.drop_table('light_operation_rollups')
@@ -0,0 +1,139 @@
+"""Notify changes to every table the cached street views read
+
+Revision ID: 1e1312df6eed
+Revises: e5a7c3d9b1f2
+Create Date: 2026-10-18 21:14:03.127845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e1312df6eed'
+down_revision: Union[str, None] = 'e5a7c3d9b1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Table -> column holding the street light id (the street id for streets),
+# added to the tables 3b8f2c6d1e47 covered.
+TABLES = {
+    'streets': 'id',
+    'installation_details': 'street_light_id',
+    'light_specifications': 'street_light_id',
+    'warranty_information': 'street_light_id',
+    'maintenance_history': 'street_light_id',
+}
+EVENTS = (
+    ('INSERT', 'NEW TABLE AS new_rows'),
+    ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('DELETE', 'OLD TABLE AS old_rows'),
+)
+
+# Adds streets and the writing transaction's id to the payload.
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_street_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed_rows text;
+    pairs text;
+    payload text;
+BEGIN
+    changed_rows := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+    -- (light, street) pairs touched. Child rows of lights deleted by the
+    -- same statement are covered by the street_lights trigger.
+    IF TG_TABLE_NAME = 'streets' THEN
+        pairs := 'SELECT DISTINCT NULL::integer AS light_id, id AS street_id FROM (' || changed_rows || ') r';
+    ELSIF TG_TABLE_NAME = 'street_lights' THEN
+        pairs := 'SELECT DISTINCT id AS light_id, street_id FROM (' || changed_rows || ') r';
+    ELSE
+        pairs := 'SELECT id AS light_id, street_id FROM street_lights WHERE id IN (SELECT '
+            || quote_ident(TG_ARGV[0]) || ' FROM (' || changed_rows || ') r)';
+    END IF;
+    -- NOTIFY payloads are capped at 8000 bytes, so large statements send
+    -- batches of 250 lights, each carrying its own streets. Lights without a
+    -- street are batched apart so listeners can tell their street is unknown.
+    -- xid lets listeners skip rollups the writing session already refreshed.
+    FOR payload IN EXECUTE $q$
+        SELECT json_build_object(
+            'xid', txid_current(),
+            'street_ids', coalesce(array_agg(DISTINCT street_id) FILTER (WHERE street_id IS NOT NULL), '{}'),
+            'light_ids', coalesce(array_agg(DISTINCT light_id) FILTER (WHERE light_id IS NOT NULL), '{}')
+        )::text
+        FROM (
+            SELECT light_id, street_id,
+                (row_number() OVER (PARTITION BY street_id IS NULL ORDER BY street_id, light_id) - 1) / 250 AS batch
+            FROM ($q$ || pairs || $q$) p
+        ) b
+        GROUP BY street_id IS NULL, batch
+    $q$
+    LOOP
+        PERFORM pg_notify('street_changes', payload);
+    END LOOP;
+    RETURN NULL;
+END $$
+"""
+
+PREVIOUS_NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_street_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed_rows text;
+    pairs text;
+    payload text;
+BEGIN
+    changed_rows := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+    -- (light, street) pairs touched. Child rows of lights deleted by the
+    -- same statement are covered by the street_lights trigger.
+    IF TG_TABLE_NAME = 'street_lights' THEN
+        pairs := 'SELECT DISTINCT id AS light_id, street_id FROM (' || changed_rows || ') r';
+    ELSE
+        pairs := 'SELECT id AS light_id, street_id FROM street_lights WHERE id IN (SELECT '
+            || quote_ident(TG_ARGV[0]) || ' FROM (' || changed_rows || ') r)';
+    END IF;
+    -- NOTIFY payloads are capped at 8000 bytes, so large statements send
+    -- batches of 250 lights, each carrying its own streets. Lights without a
+    -- street are batched apart so listeners can tell their street is unknown.
+    FOR payload IN EXECUTE $q$
+        SELECT json_build_object(
+            'street_ids', coalesce(array_agg(DISTINCT street_id) FILTER (WHERE street_id IS NOT NULL), '{}'),
+            'light_ids', array_agg(DISTINCT light_id)
+        )::text
+        FROM (
+            SELECT light_id, street_id,
+                (row_number() OVER (PARTITION BY street_id IS NULL ORDER BY street_id, light_id) - 1) / 250 AS batch
+            FROM ($q$ || pairs || $q$) p
+        ) b
+        GROUP BY street_id IS NULL, batch
+    $q$
+    LOOP
+        PERFORM pg_notify('street_changes', payload);
+    END LOOP;
+    RETURN NULL;
+END $$
+"""
+
+
+def upgrade() -> None:
+    op.execute(NOTIFY_FUNCTION)
+    for table, light_column in TABLES.items():
+        for event_name, referencing in EVENTS:
+            op.execute(
+                f"CREATE TRIGGER {table}_notify_{event_name.lower()} AFTER {event_name} ON {table} "
+                f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION notify_street_changes('{light_column}')"
+            )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        for event_name, _ in EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_{event_name.lower()} ON {table}")
+    op.execute(PREVIOUS_NOTIFY_FUNCTION)
@@ -0,0 +1,89 @@
+"""Notify street changes from triggers
+
+Revision ID: 3b8f2c6d1e47
+Revises: 9e6d14444d3c
+Create Date: 2026-10-18 17:02:41.508913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8f2c6d1e47'
+down_revision: Union[str, None] = '9e6d14444d3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Table -> column holding the street light id.
+TABLES = {
+    'street_lights': 'id',
+    'operational_status': 'street_light_id',
+    'issue_reports': 'street_light_id',
+    'energy_consumption': 'street_light_id',
+    'cost_and_pricing': 'street_light_id',
+}
+EVENTS = (
+    ('INSERT', 'NEW TABLE AS new_rows'),
+    ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('DELETE', 'OLD TABLE AS old_rows'),
+)
+
+
+def upgrade() -> None:
+    op.execute("""
+CREATE OR REPLACE FUNCTION notify_street_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed_rows text;
+    pairs text;
+    payload text;
+BEGIN
+    changed_rows := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+    -- (light, street) pairs touched. Child rows of lights deleted by the
+    -- same statement are covered by the street_lights trigger.
+    IF TG_TABLE_NAME = 'street_lights' THEN
+        pairs := 'SELECT DISTINCT id AS light_id, street_id FROM (' || changed_rows || ') r';
+    ELSE
+        pairs := 'SELECT id AS light_id, street_id FROM street_lights WHERE id IN (SELECT '
+            || quote_ident(TG_ARGV[0]) || ' FROM (' || changed_rows || ') r)';
+    END IF;
+    -- NOTIFY payloads are capped at 8000 bytes, so large statements send
+    -- batches of 250 lights, each carrying its own streets. Lights without a
+    -- street are batched apart so listeners can tell their street is unknown.
+    FOR payload IN EXECUTE $q$
+        SELECT json_build_object(
+            'street_ids', coalesce(array_agg(DISTINCT street_id) FILTER (WHERE street_id IS NOT NULL), '{}'),
+            'light_ids', array_agg(DISTINCT light_id)
+        )::text
+        FROM (
+            SELECT light_id, street_id,
+                (row_number() OVER (PARTITION BY street_id IS NULL ORDER BY street_id, light_id) - 1) / 250 AS batch
+            FROM ($q$ || pairs || $q$) p
+        ) b
+        GROUP BY street_id IS NULL, batch
+    $q$
+    LOOP
+        PERFORM pg_notify('street_changes', payload);
+    END LOOP;
+    RETURN NULL;
+END $$
+""")
+    for table, light_column in TABLES.items():
+        for event_name, referencing in EVENTS:
+            op.execute(
+                f"CREATE TRIGGER {table}_notify_{event_name.lower()} AFTER {event_name} ON {table} "
+                f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION notify_street_changes('{light_column}')"
+            )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        for event_name, _ in EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_{event_name.lower()} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_street_changes()")
@@ -0,0 +1,46 @@
+"""Add partitioned street_light_operations telemetry table
+
+Revision ID: 5e0b7d31c8a4
+Revises: c29662abe4b9
+Create Date: 2026-10-18 11:24:37.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7d31c8a4'
+down_revision: Union[str, None] = 'c29662abe4b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('street_light_operations',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('street_light_id', sa.Integer(), nullable=False),
+    sa.Column('power_consumption', sa.Float(), nullable=True),
+    sa.Column('voltage_levels', sa.Float(), nullable=True),
+    sa.Column('current_fluctuations', sa.Float(), nullable=True),
+    sa.Column('temperature', sa.Float(), nullable=True),
+    sa.Column('environmental_conditions', sa.String(), nullable=True),
+    sa.Column('current_fluctuations_env', sa.Float(), nullable=True),
+    sa.Column('fault_type', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['street_light_id'], ['street_lights.id'], ),
+    sa.PrimaryKeyConstraint('id', 'timestamp'),
+    postgresql_partition_by='RANGE (timestamp)'
+    )
+    op.create_index('ix_street_light_operations_light_timestamp', 'street_light_operations', ['street_light_id', 'timestamp'], unique=False)
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS street_light_operations_default "
+        "PARTITION OF street_light_operations DEFAULT"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_street_light_operations_light_timestamp', table_name='street_light_operations')
+    op.drop_table('street_light_operations')
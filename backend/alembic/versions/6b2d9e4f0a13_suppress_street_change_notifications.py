@@ -0,0 +1,122 @@
+"""Let bulk loads suppress street change notifications
+
+Revision ID: 6b2d9e4f0a13
+Revises: 1e1312df6eed
+Create Date: 2026-10-18 23:05:47.381920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b2d9e4f0a13'
+down_revision: Union[str, None] = '1e1312df6eed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Skips the NOTIFY when the transaction set streetsmart.suppress_street_changes.
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_street_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed_rows text;
+    pairs text;
+    payload text;
+BEGIN
+    IF current_setting('streetsmart.suppress_street_changes', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    changed_rows := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+    -- (light, street) pairs touched. Child rows of lights deleted by the
+    -- same statement are covered by the street_lights trigger.
+    IF TG_TABLE_NAME = 'streets' THEN
+        pairs := 'SELECT DISTINCT NULL::integer AS light_id, id AS street_id FROM (' || changed_rows || ') r';
+    ELSIF TG_TABLE_NAME = 'street_lights' THEN
+        pairs := 'SELECT DISTINCT id AS light_id, street_id FROM (' || changed_rows || ') r';
+    ELSE
+        pairs := 'SELECT id AS light_id, street_id FROM street_lights WHERE id IN (SELECT '
+            || quote_ident(TG_ARGV[0]) || ' FROM (' || changed_rows || ') r)';
+    END IF;
+    -- NOTIFY payloads are capped at 8000 bytes, so large statements send
+    -- batches of 250 lights, each carrying its own streets. Lights without a
+    -- street are batched apart so listeners can tell their street is unknown.
+    -- xid lets listeners skip rollups the writing session already refreshed.
+    FOR payload IN EXECUTE $q$
+        SELECT json_build_object(
+            'xid', txid_current(),
+            'street_ids', coalesce(array_agg(DISTINCT street_id) FILTER (WHERE street_id IS NOT NULL), '{}'),
+            'light_ids', coalesce(array_agg(DISTINCT light_id) FILTER (WHERE light_id IS NOT NULL), '{}')
+        )::text
+        FROM (
+            SELECT light_id, street_id,
+                (row_number() OVER (PARTITION BY street_id IS NULL ORDER BY street_id, light_id) - 1) / 250 AS batch
+            FROM ($q$ || pairs || $q$) p
+        ) b
+        GROUP BY street_id IS NULL, batch
+    $q$
+    LOOP
+        PERFORM pg_notify('street_changes', payload);
+    END LOOP;
+    RETURN NULL;
+END $$
+"""
+
+PREVIOUS_NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_street_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed_rows text;
+    pairs text;
+    payload text;
+BEGIN
+    changed_rows := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+    -- (light, street) pairs touched. Child rows of lights deleted by the
+    -- same statement are covered by the street_lights trigger.
+    IF TG_TABLE_NAME = 'streets' THEN
+        pairs := 'SELECT DISTINCT NULL::integer AS light_id, id AS street_id FROM (' || changed_rows || ') r';
+    ELSIF TG_TABLE_NAME = 'street_lights' THEN
+        pairs := 'SELECT DISTINCT id AS light_id, street_id FROM (' || changed_rows || ') r';
+    ELSE
+        pairs := 'SELECT id AS light_id, street_id FROM street_lights WHERE id IN (SELECT '
+            || quote_ident(TG_ARGV[0]) || ' FROM (' || changed_rows || ') r)';
+    END IF;
+    -- NOTIFY payloads are capped at 8000 bytes, so large statements send
+    -- batches of 250 lights, each carrying its own streets. Lights without a
+    -- street are batched apart so listeners can tell their street is unknown.
+    -- xid lets listeners skip rollups the writing session already refreshed.
+    FOR payload IN EXECUTE $q$
+        SELECT json_build_object(
+            'xid', txid_current(),
+            'street_ids', coalesce(array_agg(DISTINCT street_id) FILTER (WHERE street_id IS NOT NULL), '{}'),
+            'light_ids', coalesce(array_agg(DISTINCT light_id) FILTER (WHERE light_id IS NOT NULL), '{}')
+        )::text
+        FROM (
+            SELECT light_id, street_id,
+                (row_number() OVER (PARTITION BY street_id IS NULL ORDER BY street_id, light_id) - 1) / 250 AS batch
+            FROM ($q$ || pairs || $q$) p
+        ) b
+        GROUP BY street_id IS NULL, batch
+    $q$
+    LOOP
+        PERFORM pg_notify('street_changes', payload);
+    END LOOP;
+    RETURN NULL;
+END $$
+"""
+
+
+def upgrade() -> None:
+    op.execute(NOTIFY_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute(PREVIOUS_NOTIFY_FUNCTION)
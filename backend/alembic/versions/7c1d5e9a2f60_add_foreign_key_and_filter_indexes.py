@@ -0,0 +1,50 @@
+"""Add foreign key and filter indexes
+
+Revision ID: 7c1d5e9a2f60
+Revises: 3b8f2c6d1e47
+Create Date: 2026-10-18 17:48:09.337260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d5e9a2f60'
+down_revision: Union[str, None] = '3b8f2c6d1e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_street_lights_street_id'), 'street_lights', ['street_id'], unique=False)
+    op.create_index(op.f('ix_installation_details_street_light_id'), 'installation_details', ['street_light_id'], unique=False)
+    op.create_index(op.f('ix_light_specifications_street_light_id'), 'light_specifications', ['street_light_id'], unique=False)
+    op.create_index(op.f('ix_hardware_information_street_light_id'), 'hardware_information', ['street_light_id'], unique=False)
+    op.create_index(op.f('ix_warranty_information_street_light_id'), 'warranty_information', ['street_light_id'], unique=False)
+    op.create_index(op.f('ix_warranty_information_warranty_end'), 'warranty_information', ['warranty_end'], unique=False)
+    op.create_index(op.f('ix_cost_and_pricing_street_light_id'), 'cost_and_pricing', ['street_light_id'], unique=False)
+    op.create_index('ix_maintenance_history_light_date', 'maintenance_history', ['street_light_id', 'maintenance_date'], unique=False)
+    op.create_index('ix_issue_reports_light_date', 'issue_reports', ['street_light_id', 'issue_date'], unique=False)
+    op.create_index(op.f('ix_issue_reports_issue_date'), 'issue_reports', ['issue_date'], unique=False)
+    op.create_index(op.f('ix_energy_consumption_street_light_id'), 'energy_consumption', ['street_light_id'], unique=False)
+    op.create_index(op.f('ix_operational_status_current_status'), 'operational_status', ['current_status'], unique=False)
+    op.create_index(op.f('ix_life_cycle_information_street_light_id'), 'life_cycle_information', ['street_light_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_life_cycle_information_street_light_id'), table_name='life_cycle_information')
+    op.drop_index(op.f('ix_operational_status_current_status'), table_name='operational_status')
+    op.drop_index(op.f('ix_energy_consumption_street_light_id'), table_name='energy_consumption')
+    op.drop_index(op.f('ix_issue_reports_issue_date'), table_name='issue_reports')
+    op.drop_index('ix_issue_reports_light_date', table_name='issue_reports')
+    op.drop_index('ix_maintenance_history_light_date', table_name='maintenance_history')
+    op.drop_index(op.f('ix_cost_and_pricing_street_light_id'), table_name='cost_and_pricing')
+    op.drop_index(op.f('ix_warranty_information_warranty_end'), table_name='warranty_information')
+    op.drop_index(op.f('ix_warranty_information_street_light_id'), table_name='warranty_information')
+    op.drop_index(op.f('ix_hardware_information_street_light_id'), table_name='hardware_information')
+    op.drop_index(op.f('ix_light_specifications_street_light_id'), table_name='light_specifications')
+    op.drop_index(op.f('ix_installation_details_street_light_id'), table_name='installation_details')
+    op.drop_index(op.f('ix_street_lights_street_id'), table_name='street_lights')
@@ -0,0 +1,43 @@
+"""Add precomputed light cluster tables
+
+Revision ID: 9e6d14444d3c
+Revises: fafe8fd16485
+Create Date: 2026-10-18 15:38:52.114027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e6d14444d3c'
+down_revision: Union[str, None] = 'fafe8fd16485'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('light_cluster_members',
+    sa.Column('street_light_id', sa.Integer(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('street_light_id')
+    )
+    op.create_table('light_clusters',
+    sa.Column('zoom', sa.SmallInteger(), nullable=False),
+    sa.Column('cell_x', sa.Integer(), nullable=False),
+    sa.Column('cell_y', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('light_count', sa.Integer(), nullable=False),
+    sa.Column('latitude_sum', sa.Float(), nullable=False),
+    sa.Column('longitude_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('zoom', 'cell_x', 'cell_y', 'status')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('light_clusters')
+    op.drop_table('light_cluster_members')
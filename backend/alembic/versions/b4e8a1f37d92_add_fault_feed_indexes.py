@@ -0,0 +1,36 @@
+"""Add fault feed indexes
+
+Revision ID: b4e8a1f37d92
+Revises: 7c1d5e9a2f60
+Create Date: 2026-10-18 18:31:55.204716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e8a1f37d92'
+down_revision: Union[str, None] = '7c1d5e9a2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_street_light_operations_faults', 'street_light_operations', ['timestamp', 'id'],
+        unique=False, postgresql_where=sa.text('fault_type <> 0')
+    )
+    op.create_index(
+        'ix_street_light_operations_light_faults', 'street_light_operations', ['street_light_id', 'timestamp', 'id'],
+        unique=False, postgresql_where=sa.text('fault_type <> 0')
+    )
+    op.create_index(op.f('ix_street_lights_ward'), 'street_lights', ['ward'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_street_lights_ward'), table_name='street_lights')
+    op.drop_index('ix_street_light_operations_light_faults', table_name='street_light_operations')
+    op.drop_index('ix_street_light_operations_faults', table_name='street_light_operations')
@@ -0,0 +1,35 @@
+"""Add street_summaries rollup table
+
+Revision ID: c29662abe4b9
+Revises: a276b0fe17f8
+Create Date: 2026-10-18 10:02:11.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c29662abe4b9'
+down_revision: Union[str, None] = 'a276b0fe17f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('street_summaries',
+    sa.Column('street_id', sa.Integer(), nullable=False),
+    sa.Column('total_lights', sa.Integer(), nullable=False),
+    sa.Column('total_power_consumption', sa.Float(), nullable=False),
+    sa.Column('operational_summary', sa.JSON(), nullable=False),
+    sa.Column('recent_issues', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['street_id'], ['streets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('street_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('street_summaries')
@@ -0,0 +1,26 @@
+"""Add warranty component and end date index
+
+Revision ID: d91f4c2b8e35
+Revises: b4e8a1f37d92
+Create Date: 2026-10-18 19:12:40.871553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91f4c2b8e35'
+down_revision: Union[str, None] = 'b4e8a1f37d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_warranty_information_component_end', 'warranty_information', ['component_name', 'warranty_end'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_warranty_information_component_end', table_name='warranty_information')
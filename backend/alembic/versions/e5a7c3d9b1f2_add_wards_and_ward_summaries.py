@@ -0,0 +1,86 @@
+"""Add wards and ward summaries
+
+Revision ID: e5a7c3d9b1f2
+Revises: d91f4c2b8e35
+Create Date: 2026-10-18 19:47:26.660184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c3d9b1f2'
+down_revision: Union[str, None] = 'd91f4c2b8e35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+WARD_TABLES = ('streets', 'street_lights')
+
+
+def upgrade() -> None:
+    op.create_table('wards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_wards_id'), 'wards', ['id'], unique=False)
+    op.execute(
+        "INSERT INTO wards (name) "
+        "SELECT ward FROM streets WHERE ward IS NOT NULL "
+        "UNION SELECT ward FROM street_lights WHERE ward IS NOT NULL"
+    )
+    for table in WARD_TABLES:
+        op.add_column(table, sa.Column('ward_id', sa.Integer(), nullable=True))
+        op.execute(f"UPDATE {table} SET ward_id = wards.id FROM wards WHERE wards.name = {table}.ward")
+        op.create_index(op.f(f'ix_{table}_ward_id'), table, ['ward_id'], unique=False)
+        op.create_foreign_key(f'{table}_ward_id_fkey', table, 'wards', ['ward_id'], ['id'])
+    op.execute("""
+CREATE OR REPLACE FUNCTION set_ward_id() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF NEW.ward IS NULL THEN
+        NEW.ward_id := NULL;
+        RETURN NEW;
+    END IF;
+    SELECT id INTO NEW.ward_id FROM wards WHERE name = NEW.ward;
+    IF NOT FOUND THEN
+        INSERT INTO wards (name) VALUES (NEW.ward) ON CONFLICT (name) DO NOTHING;
+        SELECT id INTO NEW.ward_id FROM wards WHERE name = NEW.ward;
+    END IF;
+    RETURN NEW;
+END $$
+""")
+    for table in WARD_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_set_ward_id BEFORE INSERT OR UPDATE OF ward ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION set_ward_id()"
+        )
+    op.create_table('ward_summaries',
+    sa.Column('ward_id', sa.Integer(), nullable=False),
+    sa.Column('total_streets', sa.Integer(), nullable=False),
+    sa.Column('total_lights', sa.Integer(), nullable=False),
+    sa.Column('total_power_consumption', sa.Float(), nullable=False),
+    sa.Column('operational_summary', sa.JSON(), nullable=False),
+    sa.Column('open_issues', sa.Integer(), nullable=False),
+    sa.Column('total_installation_cost', sa.Float(), nullable=False),
+    sa.Column('total_maintenance_cost', sa.Float(), nullable=False),
+    sa.Column('total_electricity_cost', sa.Float(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['ward_id'], ['wards.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ward_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ward_summaries')
+    for table in WARD_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_set_ward_id ON {table}")
+        op.drop_constraint(f'{table}_ward_id_fkey', table, type_='foreignkey')
+        op.drop_index(op.f(f'ix_{table}_ward_id'), table_name=table)
+        op.drop_column(table, 'ward_id')
+    op.execute("DROP FUNCTION IF EXISTS set_ward_id()")
+    op.drop_index(op.f('ix_wards_id'), table_name='wards')
+    op.drop_table('wards')
@@ -0,0 +1,46 @@
+"""Add grid cell spatial keys to street_lights and streets
+
+Revision ID: fafe8fd16485
+Revises: 0027ffc71898
+Create Date: 2026-10-18 14:07:45.630918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fafe8fd16485'
+down_revision: Union[str, None] = '0027ffc71898'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _grid_cell(latitude_column: str, longitude_column: str) -> str:
+    # Must match app.core.spatial.grid_cell_sql at the time of this revision.
+    return (
+        f"(floor(({latitude_column} + 90) / 0.01)::bigint * 36000 "
+        f"+ floor(({longitude_column} + 180) / 0.01)::bigint)"
+    )
+
+
+def upgrade() -> None:
+    op.add_column('street_lights', sa.Column('grid_cell', sa.BigInteger(), sa.Computed(_grid_cell('latitude', 'longitude'), persisted=True), nullable=True))
+    op.create_index(op.f('ix_street_lights_grid_cell'), 'street_lights', ['grid_cell'], unique=False)
+    op.add_column('streets', sa.Column('start_grid_cell', sa.BigInteger(), sa.Computed(_grid_cell('start_latitude', 'start_longitude'), persisted=True), nullable=True))
+    op.add_column('streets', sa.Column('end_grid_cell', sa.BigInteger(), sa.Computed(_grid_cell('end_latitude', 'end_longitude'), persisted=True), nullable=True))
+    op.create_index(op.f('ix_streets_start_grid_cell'), 'streets', ['start_grid_cell'], unique=False)
+    op.create_index(op.f('ix_streets_end_grid_cell'), 'streets', ['end_grid_cell'], unique=False)
+    op.create_index(op.f('ix_operational_status_street_light_id'), 'operational_status', ['street_light_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_operational_status_street_light_id'), table_name='operational_status')
+    op.drop_index(op.f('ix_streets_end_grid_cell'), table_name='streets')
+    op.drop_index(op.f('ix_streets_start_grid_cell'), table_name='streets')
+    op.drop_column('streets', 'end_grid_cell')
+    op.drop_column('streets', 'start_grid_cell')
+    op.drop_index(op.f('ix_street_lights_grid_cell'), table_name='street_lights')
+    op.drop_column('street_lights', 'grid_cell')
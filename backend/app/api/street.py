@@ -1,326 +1,434 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from app.models import models
-from app.db import get_db
+from app.core import fast_json
+from app.core.config import settings
+from app.core.pool_metrics import pool_metrics
+from app.db import ReadAsyncSessionLocal, get_async_db, get_async_read_db, get_db, get_read_db
 from app.schemas import schemas
-from app.services.street_service import interpolate_points
-from typing import List
-from datetime import datetime, timedelta
+from app.services.street_service import (
+    DETAILED_SECTIONS, build_street_detailed_info, build_street_detailed_payload, interpolate_paths, interpolate_points
+)
+from app.services.operations_service import ingest_operations, get_operation_series
+from app.services.summary_service import get_street_basic_infos
+from app.services.spatial_service import get_viewport
+from app.services.cluster_service import get_clusters
+from app.services.tile_service import MAX_TILE_ZOOM, get_tile
+from app.services.geometry_service import get_street_geometries
+from app.services.light_service import create_street_lights
+from app.services.fault_service import (
+    FAULT_PAGE_SIZE, FAULT_STREAM_CHUNK, MAX_FAULT_PAGE_SIZE, decode_fault_cursor, encode_fault_cursor, fault_query
+)
+from app.services.analytics_service import WARRANTY_EXPIRY_WINDOW_DAYS, get_cost_report, get_warranty_report
+from app.services.maintenance_service import (
+    MAINTENANCE_PAGE_SIZE, MAX_MAINTENANCE_PAGE_SIZE, decode_maintenance_cursor, encode_maintenance_cursor,
+    get_maintenance_cost_series, maintenance_query
+)
+from app.services.ward_service import get_ward_summaries
+from app.services.export_service import (
+    EXPORT_MEDIA_TYPES, export_available, operation_export_query, street_light_export_query, stream_export
+)
+from app.services.street_batch_service import MAX_BATCH_STREETS, load_street_batch
+from app.services.response_cache import LIST_VIEW, cached_response
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+from datetime import date, datetime, timedelta
 
 router = APIRouter()
 
-@router.post("/streetlights/", response_model=schemas.StreetLight)
-def create_street_light(request: schemas.StreetLightCreate, db: Session = Depends(get_db)):
-    db_street_light = models.StreetLight(
-        latitude=street_light.latitude,
-        longitude=street_light.longitude,
-        address=street_light.address,
-        ward=street_light.ward,
-        street_id=street_light.street_id,
-    )
-
-    db.add(db_street_light)
-    db.commit()
-    db.refresh(db_street_light)
+# Async sessions cannot lazy load, so responses that serialize a light's
+# relationships load them up front.
+STREET_LIGHT_DETAILS = [
+    selectinload(relationship)
+    for relationship in models.StreetLight.__mapper__.relationships
+    if relationship.key != "street"
+]
 
-    if street_light.installation_detail:
-        installation_detail = models.InstallationDetail(
-            street_light_id=db_street_light.id,
-            **street_light.installation_detail.dict()
-        )
-        db.add(installation_detail)
-    
-    if street_light.light_specification:
-        light_specification = models.LightSpecification(
-            street_light_id=db_street_light.id,
-            **street_light.light_specification.dict()
-        )
-        db.add(light_specification)
+async def _load_street_light(db: AsyncSession, street_light_id: int) -> Optional[models.StreetLight]:
+    return await db.scalar(
+        select(models.StreetLight)
+        .options(*STREET_LIGHT_DETAILS)
+        .where(models.StreetLight.id == street_light_id)
+    )
 
-    if street_light.hardware_information:    
-        hardware_information = models.HardwareInformation(
-            street_light_id=db_street_light.id,
-            **street_light.hardware_information.dict()
-        )
-        db.add(hardware_information)
+@router.post("/streetlights/", response_model=schemas.StreetLight)
+async def create_street_light(request: schemas.StreetLightCreate, db: AsyncSession = Depends(get_async_db)):
+    created, errors = await db.run_sync(create_street_lights, [request])
+    if errors:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=errors[0][1])
+    await db.commit()
+    return await _load_street_light(db, created[0][1])
 
-    if street_light.warranties:   
-        for warranty in street_light.warranties:
-            db_warranty = models.WarrantyInformation(
-                street_light_id=db_street_light.id,
-                **warranty.dict()
+@router.post("/streetlights/bulk", response_model=schemas.StreetLightBulkResponse)
+async def create_street_lights_bulk(
+    items: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_async_db)
+):
+    lights, indexes, errors = [], [], []
+    for index, item in enumerate(items):
+        try:
+            lights.append(schemas.StreetLightCreate.model_validate(item))
+            indexes.append(index)
+        except ValidationError as exc:
+            detail = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
             )
-            db.add(db_warranty)
-    
-    if street_light.cost_pricing:
-        cost_pricing = models.CostAndPricing(
-            street_light_id=db_street_light.id,
-            **street_light.cost_pricing.dict()
-        )
-        db.add(cost_pricing)
+            errors.append(schemas.BulkItemError(index=index, detail=detail))
 
-    if street_light.energy_consumption:
-        energy_consumption = models.EnergyConsumption(
-            street_light_id=db_street_light.id,
-            **street_light.energy_consumption.dict()
-        )
-        db.add(energy_consumption)
-
-    if street_light.operational_status:
-        operational_status = models.OperationalStatus(
-            street_light_id=db_street_light.id,
-            **street_light.operational_status.dict()
-        )
-        db.add(operational_status)
-
-    if street_light.life_cycle_information:
-        life_cycle_information = models.LifeCycleInformation(
-            street_light_id=db_street_light.id,
-            **street_light.life_cycle_information.dict()
-        )
-        db.add(life_cycle_information)
-
-    db.commit()
-    return db_street_light
+    created, failed = await db.run_sync(create_street_lights, lights)
+    await db.commit()
+    errors += [schemas.BulkItemError(index=indexes[position], detail=detail) for position, detail in failed]
+    return schemas.StreetLightBulkResponse(
+        created=[schemas.BulkCreatedItem(index=indexes[position], id=light_id) for position, light_id in created],
+        errors=sorted(errors, key=lambda error: error.index)
+    )
 
 @router.get("/streetlights/{street_light_id}", response_model=schemas.StreetLight)
-def get_street_light(street_light_id: int, db: Session = Depends(get_db)):
-    street_light = db.query(models.StreetLight).filter(models.StreetLight.id == street_light_id).first()
+async def get_street_light(street_light_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    street_light = await _load_street_light(db, street_light_id)
     if not street_light:
         raise HTTPException(status_code=404, detail="Street Light not found")
     return street_light
 
 @router.post("/interpolate-points", response_model=schemas.StreetPointsResponse)
 def get_interpolated_points(request: schemas.StreetPointsRequest):
-    points = interpolate_points(request.start_point, request.end_point, request.num_points)
+    try:
+        points = interpolate_points(request.start_point, request.end_point, request.num_points)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     return schemas.StreetPointsResponse(points=points)
 
-@router.post("/streetlights/operations/")
+@router.post("/interpolate-points/batch", response_model=schemas.BatchPointsResponse)
+def get_interpolated_paths(request: schemas.BatchPointsRequest):
+    try:
+        paths = interpolate_paths(
+            [item.path for item in request.paths],
+            [item.num_points for item in request.paths]
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return schemas.BatchPointsResponse(paths=paths)
+
+# COPY needs the raw psycopg2 connection, so ingest stays on the sync session.
+@router.post("/streetlights/operations/", response_model=schemas.OperationsIngestResponse)
 def create_street_light_operations(
     operations: List[schemas.StreetLightOperationCreate], db: Session = Depends(get_db)
 ):
-    for operation in operations:
-        db_operation = models.StreetLightOperation(
-            street_light_id=operation.street_light_id,
-            timestamp=operation.timestamp,
-            power_consumption=operation.power_consumption,
-            voltage_levels=operation.voltage_levels,
-            current_fluctuations=operation.current_fluctuations,
-            temperature=operation.temperature,
-            environmental_conditions=operation.environmental_conditions,
-            current_fluctuations_env=operation.current_fluctuations_env,
-            fault_type=operation.fault_type,
-        )
-        db.add(db_operation)
-
-    db.commit()
-    return {"status": "success", "message": "Operations data ingested successfully"}
+    try:
+        ingested = ingest_operations(db, operations)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Operations reference an unknown street light")
+    return schemas.OperationsIngestResponse(
+        status="success",
+        message="Operations data ingested successfully",
+        ingested=ingested
+    )
 
-@router.get("/streetlights/{street_light_id}/operations/")
-def get_street_light_operations(street_light_id: int, db: Session = Depends(get_db)):
-    operations = db.query(models.StreetLightOperation).filter(
+@router.get("/streetlights/{street_light_id}/operations/", response_model=List[schemas.StreetLightOperation])
+async def get_street_light_operations(
+    street_light_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    query = select(models.StreetLightOperation).where(
         models.StreetLightOperation.street_light_id == street_light_id
-    ).all()
+    )
+    if start:
+        query = query.where(models.StreetLightOperation.timestamp >= start)
+    if end:
+        query = query.where(models.StreetLightOperation.timestamp < end)
+    operations = (await db.scalars(query.order_by(models.StreetLightOperation.timestamp))).all()
 
     if not operations:
         raise HTTPException(status_code=404, detail="No operations found for this street light")
 
     return operations
 
-@router.get("/streetlights/faults/")
-async def get_faulty_street_lights(db: Session = Depends(get_db)):
-    faulty_lights = db.query(models.StreetLightOperation).filter(
-        models.StreetLightOperation.fault_type != 0
-    ).all()
+@router.get("/streetlights/{street_light_id}/operations/series", response_model=schemas.OperationSeries)
+async def get_street_light_operation_series(
+    street_light_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: Optional[Literal["minute", "hour", "day"]] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    end = end or datetime.now()
+    start = start or end - timedelta(days=1)
+    return await db.run_sync(
+        lambda session: get_operation_series(session, start, end, resolution, street_light_id=street_light_id)
+    )
 
-    return faulty_lights
+@router.get("/streets/{street_id}/operations/series", response_model=schemas.OperationSeries)
+async def get_street_operation_series(
+    street_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: Optional[Literal["minute", "hour", "day"]] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    end = end or datetime.now()
+    start = start or end - timedelta(days=1)
+    return await db.run_sync(
+        lambda session: get_operation_series(session, start, end, resolution, street_id=street_id)
+    )
 
-@router.get("/streets/{street_id}/basic", response_model=schemas.StreetBasicInfo)
-def get_street_basic_info(street_id: int, db: Session = Depends(get_db)):
-    street = db.query(models.Street).filter(models.Street.id == street_id).first()
-    if not street:
-        raise HTTPException(status_code=404, detail="Street not found")
-    total_lights = db.query(func.count(models.StreetLight.id))\
-        .filter(models.StreetLight.street_id == street_id)\
-        .scalar()
-    total_power = db.query(func.sum(models.EnergyConsumption.average_monthly_consumption))\
-        .join(models.StreetLight)\
-        .filter(models.StreetLight.street_id == street_id)\
-        .scalar() or 0
-    status_summary = db.query(
-        models.OperationalStatus.current_status,
-        func.count(models.OperationalStatus.id)
-    ).join(models.StreetLight)\
-        .filter(models.StreetLight.street_id == street_id)\
-        .group_by(models.OperationalStatus.current_status)\
-        .all()
-    recent_issues = db.query(func.count(models.IssueReport.id))\
-        .join(models.StreetLight)\
-        .filter(
-            models.StreetLight.street_id == street_id,
-            models.IssueReport.issue_date >= datetime.now() - timedelta(days=30)
-        ).scalar() or 0
-    coordinates = None
-    if street.start_latitude and street.start_longitude and street.end_latitude and street.end_longitude:
-        coordinates = schemas.StreetLocation(
-            start=schemas.Coordinates(
-                latitude=street.start_latitude,
-                longitude=street.start_longitude
-            ),
-            end=schemas.Coordinates(
-                latitude=street.end_latitude,
-                longitude=street.end_longitude
+@router.get("/streets/{street_id}/maintenance", response_model=schemas.MaintenancePage)
+async def get_street_maintenance(
+    street_id: int,
+    maintenance_type: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAINTENANCE_PAGE_SIZE, ge=1, le=MAX_MAINTENANCE_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """A street's maintenance records newest first, a page at a time; ``end`` is exclusive."""
+    try:
+        after = decode_maintenance_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    query = maintenance_query(street_id, maintenance_type, start, end, after)
+    records = (await db.scalars(query.limit(limit + 1))).all()
+    next_cursor = encode_maintenance_cursor(records[limit - 1]) if len(records) > limit else None
+    return schemas.MaintenancePage(items=records[:limit], next_cursor=next_cursor)
+
+@router.get("/streets/{street_id}/maintenance/costs", response_model=schemas.MaintenanceCostSeries)
+async def get_street_maintenance_costs(
+    street_id: int,
+    resolution: Literal["week", "month"] = "month",
+    maintenance_type: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Maintenance record count and cost per week or month; ``end`` is exclusive."""
+    return await db.run_sync(
+        lambda session: get_maintenance_cost_series(session, street_id, resolution, maintenance_type, start, end)
+    )
+
+@router.get("/streetlights/faults/", response_model=schemas.FaultPage)
+async def get_faulty_street_lights(
+    street_id: Optional[int] = None,
+    ward: Optional[str] = None,
+    fault_type: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(FAULT_PAGE_SIZE, ge=1, le=MAX_FAULT_PAGE_SIZE),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Faulty readings oldest first, a page at a time or, with ``format=ndjson``, all at once.
+
+    The NDJSON stream ignores ``limit`` and returns every match after ``cursor``.
+    """
+    try:
+        after = decode_fault_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    query = fault_query(street_id, ward, fault_type, start, end, after)
+
+    if format == "ndjson":
+        return StreamingResponse(_stream_faults(query), media_type="application/x-ndjson")
+
+    operations = (await db.scalars(query.limit(limit + 1))).all()
+    next_cursor = encode_fault_cursor(operations[limit - 1]) if len(operations) > limit else None
+    return schemas.FaultPage(items=operations[:limit], next_cursor=next_cursor)
+
+async def _stream_faults(query):
+    # The request's session is closed before a streamed body is sent, so the
+    # stream holds its own; rows arrive from a server-side cursor in chunks.
+    async with ReadAsyncSessionLocal() as db:
+        result = await db.stream_scalars(query.execution_options(yield_per=FAULT_STREAM_CHUNK))
+        async for operations in result.partitions():
+            yield "".join(
+                schemas.StreetLightOperation.model_validate(operation).model_dump_json() + "\n"
+                for operation in operations
             )
+
+@router.get("/viewport", response_model=schemas.ViewportResponse)
+async def get_viewport_contents(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(50000, ge=1, le=200000),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Bounding box minimums must not exceed maximums")
+    return await db.run_sync(get_viewport, min_lat, min_lon, max_lat, max_lon, limit)
+
+@router.get("/clusters", response_model=schemas.ClusterResponse)
+async def get_light_clusters(
+    zoom: int = Query(..., ge=0, le=24),
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Bounding box minimums must not exceed maximums")
+    return await db.run_sync(get_clusters, zoom, min_lat, min_lon, max_lat, max_lon)
+
+# Tile encoding is CPU bound, so it stays a sync endpoint on FastAPI's threadpool
+# instead of blocking the event loop inside run_sync.
+@router.get("/tiles/{z}/{x}/{y}.mvt", response_class=Response)
+def get_vector_tile(z: int, x: int, y: int, db: Session = Depends(get_read_db)):
+    if not 0 <= z <= MAX_TILE_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    return Response(content=get_tile(db, z, x, y), media_type="application/vnd.mapbox-vector-tile")
+
+@router.get("/streets/{street_id}/basic", response_model=schemas.StreetBasicInfo)
+async def get_street_basic_info(street_id: int, request: Request):
+    async def build(db: AsyncSession):
+        street_infos = await db.run_sync(get_street_basic_infos, [street_id])
+        if not street_infos:
+            raise HTTPException(status_code=404, detail="Street not found")
+        return street_infos[0]
+    return await cached_response(request, "basic", street_id, schemas.StreetBasicInfo, build)
+
+def _detailed_sections(include: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Sections named in a comma-separated ``include``, in ``DETAILED_SECTIONS`` order; None means all."""
+    if include is None:
+        return None
+    requested = {section.strip() for section in include.split(",") if section.strip()}
+    unknown = requested.difference(DETAILED_SECTIONS, ["street_info"])
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sections {', '.join(sorted(unknown))}; choose from {', '.join(DETAILED_SECTIONS)}"
         )
-    return schemas.StreetBasicInfo(
-        id=street.id,
-        street_name=street.name,
-        ward=street.ward,
-        total_lights=total_lights,
-        total_power_consumption=total_power,
-        operational_summary={status: count for status, count in status_summary},
-        recent_issues=recent_issues,
-        coordinates=coordinates
-    )
+    sections = tuple(section for section in DETAILED_SECTIONS if section in requested)
+    return None if len(sections) == len(DETAILED_SECTIONS) else sections
 
-@router.get("/streets/{street_id}/detailed", response_model=schemas.StreetDetailedInfo)
-def get_street_detailed_info(street_id: int, db: Session = Depends(get_db)):
-    street = db.query(models.Street).filter(models.Street.id == street_id).first()
-    if not street:
+@router.get(
+    "/streets/batch",
+    response_model=Union[List[schemas.StreetBasicInfo], List[schemas.StreetDetailedInfo]]
+)
+async def get_streets_batch(
+    ids: List[int] = Query(...),
+    view: Literal["basic", "detailed"] = "basic",
+    include: Optional[str] = None
+):
+    """The ``view`` of many streets in one request, in ``ids`` order; unknown ids are skipped.
+
+    ``include`` selects detailed sections as for ``/streets/{street_id}/detailed``.
+    """
+    if len(set(ids)) > MAX_BATCH_STREETS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_STREETS} streets per batch")
+    sections = _detailed_sections(include) if view == "detailed" else None
+    return Response(content=await load_street_batch(view, ids, sections), media_type="application/json")
+
+@router.get("/streets/geometry", response_model=List[schemas.StreetGeometry])
+async def get_streets_geometry(ids: List[int] = Query(...), db: AsyncSession = Depends(get_async_read_db)):
+    return await db.run_sync(get_street_geometries, ids)
+
+@router.get("/streets/{street_id}/geometry", response_model=schemas.StreetGeometry)
+async def get_street_geometry(street_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    geometries = await db.run_sync(get_street_geometries, [street_id])
+    if not geometries:
         raise HTTPException(status_code=404, detail="Street not found")
-    lights = db.query(models.StreetLight)\
-        .filter(models.StreetLight.street_id == street_id)\
-        .all()
-    light_ids = [light.id for light in lights]
-    maintenance_history = db.query(models.MaintenanceHistory)\
-        .filter(models.MaintenanceHistory.street_light_id.in_(light_ids))\
-        .order_by(models.MaintenanceHistory.maintenance_date.desc())\
-        .all()
-    energy_data = db.query(models.EnergyConsumption)\
-        .filter(models.EnergyConsumption.street_light_id.in_(light_ids))\
-        .all()
-    warranties = db.query(models.WarrantyInformation)\
-        .filter(models.WarrantyInformation.street_light_id.in_(light_ids))\
-        .all()
-    costs = db.query(models.CostAndPricing)\
-        .filter(models.CostAndPricing.street_light_id.in_(light_ids))\
-        .all()
-    total_installation_cost = sum(cost.installation_cost or 0 for cost in costs)
-    total_maintenance_cost = sum(cost.maintenance_cost or 0 for cost in costs)
-    total_electricity_cost = sum(cost.electricity_cost or 0 for cost in costs)
-    return schemas.StreetDetailedInfo(
-        street_info=schemas.StreetInfo(
-            street_name=street.name,
-            ward=street.ward,
-            description=street.description
-        ),
-        lights_info=[
-            schemas.LightInfo(
-                id=light.id,
-                location=schemas.Coordinates(
-                    latitude=light.latitude,
-                    longitude=light.longitude
-                ),
-                address=light.address,
-                installation=schemas.LightInstallation(
-                    installation_date=light.installation_detail.installation_date,
-                    contractor_name=light.installation_detail.contractor_name
-                ) if light.installation_detail else None,
-                specifications=schemas.LightSpecification(
-                    bulb_type=light.light_specification.bulb_type,
-                    bulb_manufacturer=light.light_specification.bulb_manufacturer,
-                    wattage=light.light_specification.wattage
-                ) if light.light_specification else None,
-                status=schemas.OperationalStatus(
-                    current_status=light.operational_status.current_status,
-                    last_status_update=light.operational_status.last_status_update
-                ) if light.operational_status else None
-            ) for light in lights
-        ],
-        maintenance_summary=schemas.MaintenanceSummary(
-            total_maintenance_records=len(maintenance_history),
-            maintenance=[
-                schemas.MaintenanceRecord(
-                    date=record.maintenance_date,
-                    type=record.maintenance_type,
-                    cost=record.cost,
-                    street_light_id=record.street_light_id,
-                )
-                for record in maintenance_history
-            ]
-        ),
-        energy_summary=schemas.EnergySummary(
-            total_monthly_consumption=sum(e.average_monthly_consumption or 0 for e in energy_data),
-            average_daily_consumption=sum(e.average_daily_consumption or 0 for e in energy_data) / len(energy_data) if energy_data else 0,
-            per_light_consumption=[
-                schemas.LightEnergyConsumption(
-                    light_id=e.street_light_id,
-                    monthly_consumption=e.average_monthly_consumption or 0,
-                    daily_consumption=e.average_daily_consumption or 0
-                )
-                for e in energy_data
-            ]
-        ),
-        cost_summary=schemas.CostSummary(
-            total_installation_cost=total_installation_cost,
-            total_maintenance_cost=total_maintenance_cost,
-            total_electricity_cost=total_electricity_cost,
-            total_cost=total_installation_cost + total_maintenance_cost + total_electricity_cost
-        ),
-        warranty_summary=schemas.WarrantySummary(
-            active_warranties=len([w for w in warranties if w.warranty_end > datetime.now().date()]),
-            expiring_soon=len([w for w in warranties if w.warranty_end > datetime.now().date() 
-                                and w.warranty_end <= (datetime.now() + timedelta(days=90)).date()])
-        )
-    )
+    return geometries[0]
+
+@router.get("/streets/{street_id}/detailed", response_model=schemas.StreetDetailedInfo)
+async def get_street_detailed_info(
+    street_id: int,
+    request: Request,
+    include: Optional[str] = None
+):
+    """Street details; ``include`` (e.g. ``cost_summary,warranty_summary``) limits the optional sections.
+
+    Sections left out are neither queried nor returned.
+    """
+    sections = _detailed_sections(include)
+
+    async def build(db: AsyncSession):
+        if settings.fast_json:
+            payload = await db.run_sync(build_street_detailed_payload, street_id, sections)
+            if not payload:
+                raise HTTPException(status_code=404, detail="Street not found")
+            return fast_json.dumps(payload)
+        detailed_info = await db.run_sync(build_street_detailed_info, street_id, sections)
+        if not detailed_info:
+            raise HTTPException(status_code=404, detail="Street not found")
+        return detailed_info
+    view = "detailed" if sections is None else f"detailed:{','.join(sections)}"
+    return await cached_response(request, view, street_id, schemas.StreetDetailedInfo, build)
 
 @router.get("/streets/list", response_model=List[schemas.StreetBasicInfo])
-def get_all_streets(db: Session = Depends(get_db)):
-    streets = db.query(models.Street).all()
-    street_info_list = []
-    for street in streets:
-        total_lights = db.query(func.count(models.StreetLight.id))\
-            .filter(models.StreetLight.street_id == street.id)\
-            .scalar()
-        total_power = db.query(func.sum(models.EnergyConsumption.average_monthly_consumption))\
-            .join(models.StreetLight)\
-            .filter(models.StreetLight.street_id == street.id)\
-            .scalar() or 0
-        status_summary = db.query(
-            models.OperationalStatus.current_status,
-            func.count(models.OperationalStatus.id)
-        ).join(models.StreetLight)\
-            .filter(models.StreetLight.street_id == street.id)\
-            .group_by(models.OperationalStatus.current_status)\
-            .all()
-        recent_issues = db.query(func.count(models.IssueReport.id))\
-            .join(models.StreetLight)\
-            .filter(
-                models.StreetLight.street_id == street.id,
-                models.IssueReport.issue_date >= datetime.now() - timedelta(days=30)
-            ).scalar() or 0
-        coordinates = None
-        if street.start_latitude and street.start_longitude and street.end_latitude and street.end_longitude:
-            coordinates = schemas.StreetLocation(
-                start=schemas.Coordinates(
-                    latitude=street.start_latitude,
-                    longitude=street.start_longitude
-                ),
-                end=schemas.Coordinates(
-                    latitude=street.end_latitude,
-                    longitude=street.end_longitude
-                )
-            )
-        street_info = schemas.StreetBasicInfo(
-            id=street.id,
-            street_name=street.name,
-            ward=street.ward,
-            total_lights=total_lights,
-            total_power_consumption=total_power,
-            operational_summary={status: count for status, count in status_summary},
-            recent_issues=recent_issues,
-            coordinates=coordinates
-        )
-        street_info_list.append(street_info)
-    return street_info_list
\ No newline at end of file
+async def get_all_streets(request: Request):
+    async def build(db: AsyncSession):
+        return await db.run_sync(get_street_basic_infos)
+    return await cached_response(request, LIST_VIEW, None, List[schemas.StreetBasicInfo], build)
+
+@router.get("/analytics/warranties", response_model=schemas.WarrantyReport)
+async def get_warranty_report_endpoint(
+    ward: Optional[str] = None,
+    days: int = Query(WARRANTY_EXPIRY_WINDOW_DAYS, ge=1, le=3650),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Warranty counts for the city, or for one ward when ``ward`` is given."""
+    return await db.run_sync(lambda session: get_warranty_report(session, days, ward=ward))
+
+@router.get("/analytics/costs", response_model=schemas.CostReport)
+async def get_cost_report_endpoint(ward: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db)):
+    """Cost totals and breakdowns for the city, or for one ward when ``ward`` is given."""
+    return await db.run_sync(get_cost_report, ward)
+
+@router.get("/wards", response_model=List[schemas.WardSummary])
+async def get_wards(db: AsyncSession = Depends(get_async_read_db)):
+    return await db.run_sync(get_ward_summaries)
+
+@router.get("/wards/{ward_id}/summary", response_model=schemas.WardSummary)
+async def get_ward_summary(ward_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    summaries = await db.run_sync(get_ward_summaries, [ward_id])
+    if not summaries:
+        raise HTTPException(status_code=404, detail="Ward not found")
+    return summaries[0]
+
+def _export_response(query, format: str, name: str) -> StreamingResponse:
+    if not export_available():
+        raise HTTPException(status_code=501, detail="Exports need the pyarrow package")
+    extension = "arrows" if format == "arrow" else "parquet"
+    return StreamingResponse(
+        stream_export(query, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'}
+    )
+
+@router.get("/export/streetlights")
+async def export_street_lights(
+    street_id: Optional[int] = None,
+    ward: Optional[str] = None,
+    format: Literal["arrow", "parquet"] = "arrow"
+):
+    """Every light with its specification, energy, cost and status as an Arrow IPC stream or Parquet file."""
+    return _export_response(street_light_export_query(street_id, ward), format, "streetlights")
+
+@router.get("/export/operations")
+async def export_operations(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    street_id: Optional[int] = None,
+    ward: Optional[str] = None,
+    format: Literal["arrow", "parquet"] = "arrow"
+):
+    """Telemetry readings in ``[start, end)`` (the last day by default) as an Arrow IPC stream or Parquet file."""
+    end = end or datetime.now()
+    start = start or end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return _export_response(operation_export_query(start, end, street_id, ward), format, "operations")
+
+@router.get("/metrics/db-pool")
+def get_db_pool_metrics():
+    return pool_metrics()
@@ -0,0 +1,128 @@
+"""Measure request throughput of the API under concurrent clients, per server configuration.
+
+Sends ``--requests`` GETs per path from ``--concurrency`` client threads
+and reports throughput, latency percentiles and failed requests. Each
+``--config NAME:VAR=VALUE,...`` starts a one-worker uvicorn server from
+this checkout with those environment overrides, against the configured
+(seeded) database, and stops it afterwards; by default the default
+connection pool is compared with a larger one::
+
+    python -m app.concurrency_benchmark \\
+        --config "pool 5:DB_POOL_SIZE=5,DB_MAX_OVERFLOW=10" \\
+        --config "pool 20:DB_POOL_SIZE=20,DB_MAX_OVERFLOW=20" \\
+        --path /streetlights/faults/ --path "/streets/geometry?ids=1"
+
+``--server URL`` benchmarks an already running server instead, e.g. one
+started from another commit.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_PATHS = ["/streetlights/faults/", "/streets/geometry?ids=1", "/streets/1/detailed"]
+DEFAULT_CONFIGS = [
+    "pool 5:DB_POOL_SIZE=5,DB_MAX_OVERFLOW=10",
+    "pool 20:DB_POOL_SIZE=20,DB_MAX_OVERFLOW=20",
+]
+STARTUP_TIMEOUT = 60
+
+def _get(url: str, timeout: float) -> Optional[float]:
+    """Seconds the request took, or None if it failed."""
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+    except (urllib.error.URLError, OSError):
+        return None
+    return time.perf_counter() - started
+
+def run_path(url: str, requests: int, concurrency: int, timeout: float) -> str:
+    # Warm up connections and caches outside the timed run.
+    _get(url, timeout)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda _: _get(url, timeout), range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies: List[float] = sorted(result * 1000 for result in results if result is not None)
+    failed = len(results) - len(latencies)
+    if not latencies:
+        return f"{url}: all {failed} requests failed"
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return (
+        f"{url}: {len(latencies) / elapsed:7.0f} req/s, "
+        f"p50 {statistics.median(latencies):7.1f} ms, p95 {p95:7.1f} ms, {failed} failed"
+    )
+
+def parse_config(value: str) -> Tuple[str, Dict[str, str]]:
+    """``"NAME:VAR=VALUE,VAR=VALUE"`` -> (name, environment overrides)."""
+    name, _, assignments = value.partition(":")
+    overrides = {}
+    for assignment in filter(None, assignments.split(",")):
+        variable, separator, setting = assignment.partition("=")
+        if not separator:
+            raise argparse.ArgumentTypeError(f"Expected VAR=VALUE, got {assignment!r}")
+        overrides[variable.strip()] = setting.strip()
+    return name, overrides
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+@contextmanager
+def serve(overrides: Dict[str, str]) -> Iterator[str]:
+    """Run a one-worker server from this checkout with ``overrides`` and yield its base URL."""
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **overrides},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while _get(f"{base_url}/", 1) is None:
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise SystemExit(f"Server with {overrides} did not start")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare API throughput under concurrent clients.")
+    parser.add_argument("--config", action="append", type=parse_config,
+                        help=f"NAME:VAR=VALUE,... server configuration to start (default: {DEFAULT_CONFIGS})")
+    parser.add_argument("--server", action="append", help="base URL of a running server instead (repeatable)")
+    parser.add_argument("--path", action="append", help=f"path under /api to request (default: {DEFAULT_PATHS})")
+    parser.add_argument("--requests", type=int, default=400, help="requests per path and server")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client threads")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    args = parser.parse_args(argv)
+    paths = args.path or DEFAULT_PATHS
+
+    def run(label: str, base_url: str):
+        print(label)
+        for path in paths:
+            print("  " + run_path(f"{base_url.rstrip('/')}/api{path}", args.requests, args.concurrency, args.timeout))
+
+    if args.server:
+        for server in args.server:
+            run(server, server)
+        return
+    for name, overrides in args.config or [parse_config(config) for config in DEFAULT_CONFIGS]:
+        with serve(overrides) as base_url:
+            run(name, base_url)
+
+if __name__ == "__main__":
+    main()
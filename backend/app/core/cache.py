@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """Thread-safe, size-bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: Hashable, value: Any) -> List[Tuple[Hashable, Any]]:
+        """Store ``value`` and return the (key, value) entries evicted to make room for it."""
+        evicted = []
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                evicted.append(self._entries.popitem(last=False))
+        return evicted
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._entries.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+class SingleFlight:
+    """Coalesces concurrent async loads that share a key into one in-flight call.
+
+    The first caller for a key starts ``load``; callers arriving before it
+    finishes await the same result (or exception) instead of starting their
+    own. Nothing is kept once the load completes. A caller that is cancelled
+    does not cancel the load the others are waiting on.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(load())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(call)
+
+    def _forget(self, key: Hashable, call: asyncio.Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Retrieved here so a load whose callers all went away is not logged as unhandled.
+            call.exception()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+class CacheBackend(ABC):
+    """Store shared by all workers behind the per-worker response LRU.
+
+    Holds serialized responses and the version counters their ETags are
+    built from. ``epoch`` changes whenever the counters may have been reset,
+    so ETags from before a reset never match again. Request handlers use
+    the async methods; ``bump_versions`` is called from commit listeners.
+
+    A bumped version stays "recent" for ``recent_window`` seconds, the time
+    a read replica may still be serving the data from before the change.
+    """
+    epoch: str
+
+    def __init__(self, recent_window: int):
+        self.recent_window = recent_window
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int):
+        ...
+
+    @abstractmethod
+    async def get_versions(self, keys: List[str]) -> Tuple[List[int], bool]:
+        """Current versions of ``keys``, and whether any of them was bumped recently."""
+
+    @abstractmethod
+    def bump_versions(self, keys: List[str]):
+        """Increment ``keys``; must not block when called on the event loop."""
+
+class LocalCacheBackend(CacheBackend):
+    """Single-process backend: nothing is shared and versions live in memory."""
+
+    def __init__(self, recent_window: int):
+        super().__init__(recent_window)
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: Dict[str, int] = {}
+        self._bumped_at: Dict[str, float] = {}
+        self._lock = Lock()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        pass
+
+    async def get_versions(self, keys: List[str]) -> Tuple[List[int], bool]:
+        recent_since = time.monotonic() - self.recent_window
+        with self._lock:
+            versions = [self._versions.get(key, 0) for key in keys]
+            recent = any(self._bumped_at.get(key, -math.inf) > recent_since for key in keys)
+        return versions, recent
+
+    def bump_versions(self, keys: List[str]):
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._bumped_at[key] = now
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-backed store shared by every worker; needs the optional ``redis`` package.
+
+    Requests go through an asyncio client so a slow Redis never blocks the
+    event loop. Commit listeners run on the loop after an async session
+    commits, and in worker threads otherwise: on the loop the bump is
+    scheduled as a task on the asyncio client, in a thread it is sent
+    with a sync one.
+    """
+
+    EPOCH_KEY = "streetsmart:cache:epoch"
+
+    def __init__(self, url: str, recent_window: int):
+        super().__init__(recent_window)
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise RuntimeError("RESPONSE_CACHE_URL points at Redis but the redis package is not installed") from exc
+        self.client = redis.Redis.from_url(url, socket_timeout=1)
+        self.async_client = redis.asyncio.Redis.from_url(url, socket_timeout=1)
+        self.client.set(self.EPOCH_KEY, uuid.uuid4().hex[:8], nx=True)
+        self.epoch = self.client.get(self.EPOCH_KEY).decode()
+        # Scheduled bumps, referenced until done so they are not garbage collected.
+        self._pending_bumps: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _recent_key(key: str) -> str:
+        return f"{key}:recent"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.async_client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.async_client.set(key, value, ex=ttl)
+
+    async def get_versions(self, keys: List[str]) -> Tuple[List[int], bool]:
+        values = await self.async_client.mget(keys + [self._recent_key(key) for key in keys])
+        return [int(value or 0) for value in values[:len(keys)]], any(values[len(keys):])
+
+    def _queue_bump(self, pipeline, keys: List[str]):
+        for key in keys:
+            pipeline.incr(key)
+            if self.recent_window > 0:
+                pipeline.set(self._recent_key(key), 1, ex=self.recent_window)
+        return pipeline
+
+    async def _bump_async(self, keys: List[str]):
+        await self._queue_bump(self.async_client.pipeline(transaction=False), keys).execute()
+
+    def _bump_done(self, task: asyncio.Task):
+        self._pending_bumps.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Bumping cache versions failed", exc_info=task.exception())
+
+    def bump_versions(self, keys: List[str]):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._queue_bump(self.client.pipeline(transaction=False), keys).execute()
+            return
+        task = loop.create_task(self._bump_async(keys))
+        self._pending_bumps.add(task)
+        task.add_done_callback(self._bump_done)
+
+def create_cache_backend(url: Optional[str], recent_window: int = 0) -> CacheBackend:
+    if not url:
+        return LocalCacheBackend(recent_window)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url, recent_window)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
@@ -1,10 +1,40 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     app_name: str = "StreetSmart"
     environment: str = os.getenv("ENVIRONMENT", "development")
     debug: bool = os.getenv("DEBUG", True)
+    street_summary_repair_interval: int = int(os.getenv("STREET_SUMMARY_REPAIR_INTERVAL", 3600))
+    ward_summary_repair_interval: int = int(os.getenv("WARD_SUMMARY_REPAIR_INTERVAL", 3600))
+    operation_partition_interval: int = int(os.getenv("OPERATION_PARTITION_INTERVAL", 86400))
+    operation_rollup_repair_interval: int = int(os.getenv("OPERATION_ROLLUP_REPAIR_INTERVAL", 86400))
+    # Days of telemetry whose rollups each repair pass rebuilds, for readings written outside ingest.
+    operation_rollup_repair_days: int = int(os.getenv("OPERATION_ROLLUP_REPAIR_DAYS", 2))
+    light_cluster_repair_interval: int = int(os.getenv("LIGHT_CLUSTER_REPAIR_INTERVAL", 86400))
+    tile_cache_size: int = int(os.getenv("TILE_CACHE_SIZE", 4096))
+    street_geometry_cache_size: int = int(os.getenv("STREET_GEOMETRY_CACHE_SIZE", 10000))
+    tile_cache_dir: Optional[str] = os.getenv("TILE_CACHE_DIR")
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", 2048))
+    response_cache_ttl: int = int(os.getenv("RESPONSE_CACHE_TTL", 3600))
+    # Shared response cache, e.g. redis://host:6379/0 (requires the redis package); per-worker only when unset.
+    response_cache_url: Optional[str] = os.getenv("RESPONSE_CACHE_URL")
+    # Encode the detailed street views straight from row payloads with orjson (optional package).
+    fast_json: bool = os.getenv("FAST_JSON", False)
+    # LISTEN for the street change triggers and evict this worker's caches on every write.
+    street_change_listener_enabled: bool = os.getenv("STREET_CHANGE_LISTENER_ENABLED", True)
+    # Applied to every engine (primary and replica, sync and async) in each worker process.
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", 5))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    db_pool_timeout: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", True)
+    # postgresql:// URL of a read replica; read-only endpoints use the primary when unset.
+    read_replica_url: Optional[str] = os.getenv("STREET_SMART_READ_REPLICA_URL")
+    # Upper bound on replica lag in seconds: cached responses invalidated more recently
+    # than this are rebuilt from the primary so a lagging replica cannot refill them.
+    replica_max_lag: int = int(os.getenv("REPLICA_MAX_LAG", 30))
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,16 @@
+from typing import Any
+from app.core.config import settings
+
+if settings.fast_json:
+    try:
+        import orjson
+    except ImportError as exc:
+        raise RuntimeError("FAST_JSON is set but the orjson package is not installed") from exc
+
+def dumps(payload: Any) -> bytes:
+    """Encode plain dicts, lists, numbers, strings, dates and None; only available with ``settings.fast_json``.
+
+    Payloads must already have the types their schema would coerce to
+    (e.g. floats for float fields) for the output to match Pydantic's.
+    """
+    return orjson.dumps(payload)
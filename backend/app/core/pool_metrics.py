@@ -0,0 +1,72 @@
+import time
+from threading import Lock
+from typing import Dict
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class PoolMetrics:
+    """Connection checkout counters for one engine's pool, fed by pool events."""
+
+    def __init__(self, engine: Engine):
+        self.pool = engine.pool
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.total_hold_seconds = 0.0
+        self._lock = Lock()
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is None:
+            return
+        with self._lock:
+            self.checkins += 1
+            self.checked_out -= 1
+            self.total_hold_seconds += time.perf_counter() - checked_out_at
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pool_size": self.pool.size(),
+                "overflow": self.pool.overflow(),
+                "idle": self.pool.checkedin(),
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "average_hold_ms": 1000 * self.total_hold_seconds / self.checkins if self.checkins else 0.0,
+            }
+
+_registry: Dict[str, PoolMetrics] = {}
+
+def instrument_pool(name: str, engine: Engine):
+    """Start collecting metrics for ``engine`` under ``name``; pass ``AsyncEngine.sync_engine`` for async engines."""
+    if name not in _registry:
+        _registry[name] = PoolMetrics(engine)
+
+def pool_metrics() -> Dict[str, dict]:
+    return {name: metrics.snapshot() for name, metrics in _registry.items()}
@@ -0,0 +1,75 @@
+import math
+from typing import List, Optional, Tuple
+
+# Fixed lat/lon grid used as a cheap spatial key: one cell is 0.01 degrees
+# (~1.1 km north-south), numbered row-major from (-90, -180).
+GRID_CELL_DEGREES = 0.01
+GRID_COLUMNS = 36000
+# Viewports spanning more grid rows than this skip the grid and filter on
+# latitude/longitude directly; they are better served by clustering.
+MAX_GRID_ROWS = 200
+GRID_EDGE_EPSILON = 1e-9
+
+def grid_cell_sql(latitude_column: str, longitude_column: str) -> str:
+    """SQL expression for the grid cell of a coordinate pair, used by computed columns."""
+    return (
+        f"(floor(({latitude_column} + 90) / {GRID_CELL_DEGREES})::bigint * {GRID_COLUMNS} "
+        f"+ floor(({longitude_column} + 180) / {GRID_CELL_DEGREES})::bigint)"
+    )
+
+def grid_row(latitude: float) -> int:
+    return math.floor((latitude + 90) / GRID_CELL_DEGREES)
+
+def grid_column(longitude: float) -> int:
+    return math.floor((longitude + 180) / GRID_CELL_DEGREES)
+
+def grid_cell(latitude: float, longitude: float) -> int:
+    return grid_row(latitude) * GRID_COLUMNS + grid_column(longitude)
+
+def grid_cell_ranges(
+    min_latitude: float, min_longitude: float, max_latitude: float, max_longitude: float
+) -> Optional[List[Tuple[int, int]]]:
+    """Contiguous ``(first, last)`` cell ranges covering a bounding box, one per grid row.
+
+    Edges are widened by ``GRID_EDGE_EPSILON`` so float rounding on a cell
+    boundary cannot drop a row; callers still filter on the exact
+    coordinates. Returns None when the box spans more than ``MAX_GRID_ROWS``
+    rows.
+    """
+    first_row = grid_row(min_latitude - GRID_EDGE_EPSILON)
+    last_row = grid_row(max_latitude + GRID_EDGE_EPSILON)
+    if last_row - first_row + 1 > MAX_GRID_ROWS:
+        return None
+    first_column = max(grid_column(min_longitude - GRID_EDGE_EPSILON), 0)
+    last_column = min(grid_column(max_longitude + GRID_EDGE_EPSILON), GRID_COLUMNS - 1)
+    return [
+        (row * GRID_COLUMNS + first_column, row * GRID_COLUMNS + last_column)
+        for row in range(first_row, last_row + 1)
+    ]
+
+# Web-mercator cluster grid: each map tile at zoom z is split into
+# 2**CLUSTER_CELL_BITS cells per axis, i.e. 2**(z + CLUSTER_CELL_BITS) per axis.
+CLUSTER_CELL_BITS = 4
+MAX_CLUSTER_ZOOM = 14
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+def cluster_cells_per_axis(zoom: int) -> int:
+    return 2 ** (zoom + CLUSTER_CELL_BITS)
+
+def mercator_position(latitude: float, longitude: float, cells: int) -> Tuple[float, float]:
+    """Fractional web-mercator grid position of a coordinate on a ``cells`` x ``cells`` grid."""
+    latitude = math.radians(min(max(latitude, -MAX_MERCATOR_LATITUDE), MAX_MERCATOR_LATITUDE))
+    x = (longitude + 180) / 360 * cells
+    y = (1 - math.asinh(math.tan(latitude)) / math.pi) / 2 * cells
+    return x, y
+
+def mercator_cell(latitude: float, longitude: float, zoom: int) -> Tuple[int, int]:
+    cells = cluster_cells_per_axis(zoom)
+    x, y = mercator_position(latitude, longitude, cells)
+    return min(max(math.floor(x), 0), cells - 1), min(max(math.floor(y), 0), cells - 1)
+
+def mercator_latitude(y: float, cells: int) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / cells))))
+
+def mercator_longitude(x: float, cells: int) -> float:
+    return x / cells * 360 - 180
@@ -1,11 +1,20 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import argparse
+import io
+import multiprocessing
 import random
+import time
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import numpy as np
 import os
 from dotenv import load_dotenv
+from app.models.models import SUPPRESS_STREET_CHANGES_SETTING
+from app.services.change_tracking import broadcast_reset
+from app.services.summary_service import refresh_street_summaries
+from app.services.cluster_service import rebuild_light_clusters
+from app.services.ward_service import refresh_ward_summaries
 
 load_dotenv()
 
@@ -205,6 +214,8 @@ def generate_data():
                     }
                 )
 
+        refresh_street_summaries(db, [street_id])
+        refresh_ward_summaries(db)
         db.commit()
         print("Data generation completed successfully!")
         
@@ -215,5 +226,314 @@ def generate_data():
     finally:
         db.close()
 
+# Load-test datasets are scattered over this box (Delhi) as short straight streets.
+CITY_BOUNDS = (28.40, 76.84, 28.88, 77.35)
+STREET_LENGTH_METERS = (200, 2000)
+METERS_PER_DEGREE = 111320
+STREETS_PER_WARD = 50
+CONTRACTORS = ["Smart City Contractors Ltd.", "Urban Maintenance Corp", "Metro Lighting Services", "Capital Electricals"]
+BRANDS = {
+    "Philips": {"consumption": 1.8, "power_cost": 180},
+    "Havells": {"consumption": 2.0, "power_cost": 200},
+    "Syska": {"consumption": 1.9, "power_cost": 190},
+}
+WATTAGES = [60, 90, 120]
+POLE_TYPES = ["Galvanized Steel", "Octagonal", "Concrete"]
+CONTROL_SYSTEMS = ["Timer", "Photocell", "Smart Controller"]
+WARRANTY_COMPONENTS = {"LED Module": 3, "Driver": 5, "Pole": 10}
+STATUSES = ["Operational", "Faulty", "Under Maintenance"]
+STATUS_WEIGHTS = [0.9, 0.07, 0.03]
+MAINTENANCE_TYPES = ["Routine Inspection", "Emergency Repair"]
+MAINTENANCE_INTERVAL_DAYS = 90
+ISSUES_PER_YEAR = 0.5
+ISSUE_DESCRIPTIONS = ["Light not working", "Flickering light", "Pole damaged", "Light on during daytime"]
+
+def _copy_text(values) -> list:
+    """COPY text-format fields for a column; NaN/NaT become NULL."""
+    values = np.asarray(values)
+    text_values = values.astype(str)
+    if values.dtype.kind in "fM":
+        text_values = np.where(np.isnan(values), "\\N", text_values)
+    return text_values.tolist()
+
+def _copy(cursor, table: str, columns: dict):
+    """COPY equally long column arrays into ``table``; values must not contain tabs or newlines."""
+    rows = zip(*(_copy_text(values) for values in columns.values()))
+    buffer = io.StringIO("".join("\t".join(row) + "\n" for row in rows))
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+def _pick(rng, choices: list, size: int, p=None) -> np.ndarray:
+    return np.asarray(choices)[rng.choice(len(choices), size=size, p=p)]
+
+def _events_per_light(light_index: np.ndarray, counts: np.ndarray):
+    """Expand per-light event counts into (owning light index, 0-based rank) arrays."""
+    owners = np.repeat(light_index, counts)
+    ranks = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owners, ranks
+
+def _generate_chunk(task: dict) -> int:
+    """Generate and COPY one chunk of streets with their lights and history, in one transaction."""
+    rng = np.random.default_rng([task["seed"], task["chunk"]])
+    street_count, lights_per_street = task["street_count"], task["lights_per_street"]
+    light_count = street_count * lights_per_street
+    today = np.datetime64(task["today"], "D")
+    history_days = max(int(task["history_years"] * 365), 31)
+
+    street_ids = np.arange(task["first_street_id"], task["first_street_id"] + street_count)
+    min_lat, min_lon, max_lat, max_lon = CITY_BOUNDS
+    start_lat = rng.uniform(min_lat, max_lat, street_count)
+    start_lon = rng.uniform(min_lon, max_lon, street_count)
+    bearing = rng.uniform(0, 2 * np.pi, street_count)
+    length = rng.uniform(*STREET_LENGTH_METERS, street_count)
+    end_lat = start_lat + length * np.cos(bearing) / METERS_PER_DEGREE
+    end_lon = start_lon + length * np.sin(bearing) / (METERS_PER_DEGREE * np.cos(np.radians(start_lat)))
+    street_wards = np.asarray([f"Ward {n}" for n in rng.integers(1, task["ward_count"] + 1, street_count)])
+    street_names = [f"Road {street_id}" for street_id in street_ids.tolist()]
+
+    light_ids = np.arange(task["first_light_id"], task["first_light_id"] + light_count)
+    light_index = np.arange(light_count)
+    light_street = np.repeat(np.arange(street_count), lights_per_street)
+    position = (np.tile(np.arange(lights_per_street), street_count) + 0.5) / lights_per_street
+    latitude = start_lat[light_street] + position * (end_lat - start_lat)[light_street]
+    longitude = start_lon[light_street] + position * (end_lon - start_lon)[light_street]
+    addresses = [
+        f"Light {rank + 1}, {street_names[street]}"
+        for rank, street in zip(np.tile(np.arange(lights_per_street), street_count).tolist(), light_street.tolist())
+    ]
+
+    install_date = today - rng.integers(30, history_days, light_count).astype("timedelta64[D]")
+    contractor = _pick(rng, CONTRACTORS, light_count)
+    brand = _pick(rng, list(BRANDS), light_count)
+    consumption = np.asarray([BRANDS[name]["consumption"] for name in brand.tolist()])
+    power_cost = np.asarray([BRANDS[name]["power_cost"] for name in brand.tolist()])
+    inflation = rng.uniform(0.9, 1.2, light_count)
+    daily_consumption = consumption * rng.uniform(0.9, 1.1, light_count)
+
+    warranty_owner, warranty_rank = _events_per_light(light_index, np.full(light_count, len(WARRANTY_COMPONENTS)))
+    warranty_years = np.asarray(list(WARRANTY_COMPONENTS.values()))[warranty_rank]
+
+    age_days = (today - install_date).astype(int)
+    maintenance_owner, maintenance_rank = _events_per_light(light_index, age_days // MAINTENANCE_INTERVAL_DAYS)
+    maintenance_date = np.minimum(
+        install_date[maintenance_owner]
+        + (MAINTENANCE_INTERVAL_DAYS * (maintenance_rank + 1)
+           + rng.integers(-10, 11, maintenance_owner.size)).astype("timedelta64[D]"),
+        today
+    )
+    maintenance_type = _pick(rng, MAINTENANCE_TYPES, maintenance_owner.size)
+
+    issue_owner, _ = _events_per_light(light_index, rng.poisson(age_days / 365 * ISSUES_PER_YEAR))
+    issue_date = install_date[issue_owner] + (
+        rng.random(issue_owner.size) * age_days[issue_owner]
+    ).astype("timedelta64[D]")
+    resolved = (issue_date < today - np.timedelta64(7, "D")) | (rng.random(issue_owner.size) < 0.5)
+    time_to_resolve = np.where(resolved, np.round(rng.exponential(48, issue_owner.size), 1), np.nan)
+    resolution_date = np.where(
+        resolved, issue_date + (np.nan_to_num(time_to_resolve) // 24).astype("timedelta64[D]"), np.datetime64("NaT")
+    )
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        # The rollups are rebuilt and listening workers reset once the load is done.
+        cursor.execute(f"SET LOCAL {SUPPRESS_STREET_CHANGES_SETTING} = 'on'")
+        _copy(cursor, "streets", {
+            "id": street_ids,
+            "name": street_names,
+            "start_latitude": start_lat,
+            "start_longitude": start_lon,
+            "end_latitude": end_lat,
+            "end_longitude": end_lon,
+            "description": np.full(street_count, "Generated load-test street"),
+            "ward": street_wards,
+        })
+        _copy(cursor, "street_lights", {
+            "id": light_ids,
+            "latitude": latitude,
+            "longitude": longitude,
+            "address": addresses,
+            "ward": street_wards[light_street],
+            "street_id": street_ids[light_street],
+        })
+        _copy(cursor, "installation_details", {
+            "street_light_id": light_ids,
+            "installation_date": install_date,
+            "contractor_name": contractor,
+        })
+        _copy(cursor, "light_specifications", {
+            "street_light_id": light_ids,
+            "bulb_type": np.full(light_count, "LED"),
+            "bulb_manufacturer": brand,
+            "wattage": _pick(rng, WATTAGES, light_count),
+        })
+        _copy(cursor, "hardware_information", {
+            "street_light_id": light_ids,
+            "pole_type": _pick(rng, POLE_TYPES, light_count),
+            "pole_height": np.round(rng.uniform(6, 12, light_count), 1),
+            "control_system_type": _pick(rng, CONTROL_SYSTEMS, light_count),
+        })
+        _copy(cursor, "warranty_information", {
+            "street_light_id": light_ids[warranty_owner],
+            "component_name": np.asarray(list(WARRANTY_COMPONENTS))[warranty_rank],
+            "warranty_start": install_date[warranty_owner],
+            "warranty_end": install_date[warranty_owner] + (365 * warranty_years).astype("timedelta64[D]"),
+            "warranty_terms": np.asarray([
+                f"{years}-year warranty for {component}" for component, years in WARRANTY_COMPONENTS.items()
+            ])[warranty_rank],
+        })
+        _copy(cursor, "cost_and_pricing", {
+            "street_light_id": light_ids,
+            "installation_cost": np.round(12000.0 * inflation, 2),
+            "bulb_cost": np.round(1500.0 * inflation, 2),
+            "fixture_cost": np.round(3500.0 * inflation, 2),
+            "electricity_cost": np.round(power_cost * inflation, 2),
+            "maintenance_cost": np.round(rng.uniform(800, 1500, light_count), 2),
+        })
+        _copy(cursor, "energy_consumption", {
+            "street_light_id": light_ids,
+            "average_daily_consumption": daily_consumption,
+            "average_monthly_consumption": daily_consumption * 30 + rng.uniform(0, 10, light_count),
+            "operating_hours": np.full(light_count, 12),
+        })
+        _copy(cursor, "operational_status", {
+            "street_light_id": light_ids,
+            "current_status": _pick(rng, STATUSES, light_count, STATUS_WEIGHTS),
+            "last_status_update": today - rng.integers(0, 30, light_count).astype("timedelta64[D]"),
+        })
+        _copy(cursor, "life_cycle_information", {
+            "street_light_id": light_ids,
+            "component": np.full(light_count, "LED Module"),
+            "expected_lifespan": np.full(light_count, 10),
+            "replacement_schedule": install_date + np.timedelta64(3650, "D"),
+        })
+        _copy(cursor, "maintenance_history", {
+            "street_light_id": light_ids[maintenance_owner],
+            "maintenance_date": maintenance_date,
+            "maintenance_type": maintenance_type,
+            "cost": np.round(rng.uniform(800, 1500, maintenance_owner.size), 2),
+            "contractor_name": contractor[maintenance_owner],
+            "notes": np.char.add(maintenance_type, " performed"),
+        })
+        _copy(cursor, "issue_reports", {
+            "street_light_id": light_ids[issue_owner],
+            "issue_date": issue_date,
+            "issue_description": _pick(rng, ISSUE_DESCRIPTIONS, issue_owner.size),
+            "resolution_status": np.where(resolved, "Resolved", "Open"),
+            "resolution_date": resolution_date,
+            "time_to_resolve": time_to_resolve,
+        })
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    return light_count
+
+def _reserve_ids(db, table: str, count: int) -> int:
+    """Advance ``table``'s id sequence by ``count`` and return the first reserved id."""
+    last_id = db.execute(
+        text("SELECT setval(pg_get_serial_sequence(:table, 'id'), nextval(pg_get_serial_sequence(:table, 'id')) + :count - 1)"),
+        {"table": table, "count": count}
+    ).scalar()
+    return last_id - count + 1
+
+def _init_worker():
+    # Forked workers must not share the parent's pooled connections.
+    engine.dispose(close=False)
+
+def generate_dataset(
+    streets: int,
+    lights_per_street: int,
+    history_years: float,
+    seed: int = 0,
+    workers: int = 1,
+    batch_size: int = 50000,
+):
+    """Bulk-load a synthetic city of ``streets`` x ``lights_per_street`` lights with history.
+
+    Streets are split into chunks of about ``batch_size`` lights. Each chunk
+    is generated with NumPy from its own seed, so output does not depend on
+    ``workers``, and COPYed in its own transaction using ids reserved up
+    front. Summaries and clusters are rebuilt once at the end.
+    """
+    streets_per_chunk = max(1, batch_size // lights_per_street)
+    ward_count = max(1, streets // STREETS_PER_WARD)
+    db = SessionLocal()
+    try:
+        first_street_id = _reserve_ids(db, "streets", streets)
+        first_light_id = _reserve_ids(db, "street_lights", streets * lights_per_street)
+        # Created up front so the set_ward_id trigger only looks wards up;
+        # chunks inserting the same new ward would wait on each other.
+        db.execute(
+            text("INSERT INTO wards (name) SELECT 'Ward ' || n FROM generate_series(1, :count) n "
+                 "ON CONFLICT (name) DO NOTHING"),
+            {"count": ward_count}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    tasks = [
+        {
+            "chunk": chunk,
+            "seed": seed,
+            "first_street_id": first_street_id + offset,
+            "first_light_id": first_light_id + offset * lights_per_street,
+            "street_count": min(streets_per_chunk, streets - offset),
+            "lights_per_street": lights_per_street,
+            "history_years": history_years,
+            "ward_count": ward_count,
+            "today": date.today().isoformat(),
+        }
+        for chunk, offset in enumerate(range(0, streets, streets_per_chunk))
+    ]
+
+    started = time.perf_counter()
+    loaded = 0
+    if workers > 1:
+        with multiprocessing.get_context("fork").Pool(workers, initializer=_init_worker) as pool:
+            for light_count in pool.imap_unordered(_generate_chunk, tasks):
+                loaded += light_count
+                print(f"Loaded {loaded}/{streets * lights_per_street} lights ({time.perf_counter() - started:.0f}s)")
+    else:
+        for task in tasks:
+            loaded += _generate_chunk(task)
+            print(f"Loaded {loaded}/{streets * lights_per_street} lights ({time.perf_counter() - started:.0f}s)")
+
+    # Fresh statistics first: the rebuilds below plan per-light lookups.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+    db = SessionLocal()
+    try:
+        refresh_street_summaries(db)
+        refresh_ward_summaries(db)
+        rebuild_light_clusters(db)
+        # The chunks were loaded without change notifications, so workers drop every cached entry.
+        broadcast_reset(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Data generation completed in {time.perf_counter() - started:.0f}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate StreetSmart data. Without --streets, loads the single demo street."
+    )
+    parser.add_argument("--streets", type=int, help="number of streets to generate")
+    parser.add_argument("--lights-per-street", type=int, default=100)
+    parser.add_argument("--history-years", type=float, default=3, help="depth of maintenance and issue history")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="parallel loader processes")
+    parser.add_argument("--batch-size", type=int, default=50000, help="lights per COPY transaction")
+    args = parser.parse_args(argv)
+    if args.streets is None:
+        generate_data()
+    else:
+        generate_dataset(
+            args.streets, args.lights_per_street, args.history_years,
+            args.seed, args.workers, args.batch_size
+        )
+
 if __name__ == "__main__":
-    generate_data()
\ No newline at end of file
+    main()
\ No newline at end of file
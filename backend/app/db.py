@@ -1,8 +1,12 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.pool_metrics import instrument_pool
 
 load_dotenv()
 
@@ -12,10 +16,43 @@ POSTGRES_DB = os.getenv('STREET_SMART_DATABASE_NAME')
 POSTGRES_HOST = os.getenv('STREET_SMART_DATABASE_HOST')
 
 SQLALCHEMY_DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}/{POSTGRES_DB}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}/{POSTGRES_DB}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+POOL_OPTIONS = {
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+    "pool_recycle": settings.db_pool_recycle,
+    "pool_pre_ping": settings.db_pool_pre_ping,
+}
+
+# Sync engine: scripts, Alembic, background jobs and COPY-based ingest.
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: request handlers. Sessions do not expire on commit because
+# async sessions cannot lazily reload expired attributes.
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **POOL_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Read-only endpoints go to the replica when one is configured, so dashboard
+# reads do not compete with ingest for primary connections. Replica reads can
+# trail the primary by the replication lag.
+if settings.read_replica_url:
+    replica_url = make_url(settings.read_replica_url)
+    read_engine = create_engine(replica_url, **POOL_OPTIONS)
+    read_async_engine = create_async_engine(replica_url.set(drivername="postgresql+asyncpg"), **POOL_OPTIONS)
+else:
+    read_engine, read_async_engine = engine, async_engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+ReadAsyncSessionLocal = async_sessionmaker(bind=read_async_engine, autoflush=False, expire_on_commit=False)
+
+instrument_pool("primary", engine)
+instrument_pool("primary_async", async_engine.sync_engine)
+if settings.read_replica_url:
+    instrument_pool("replica", read_engine)
+    instrument_pool("replica_async", read_async_engine.sync_engine)
+
 DECLARATIVE_BASE = declarative_base()
 
 def get_db():
@@ -24,3 +61,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db():
+    async with ReadAsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,79 @@
+"""Time ``interpolate_paths`` against the per-segment loop it replaced.
+
+Needs no database. Builds ``--paths`` random street segments and
+interpolates ``--points`` positions on each, once through the original
+straight-line loop and once through ``interpolate_paths``::
+
+    python -m app.interpolation_benchmark --paths 10000 --points 20
+"""
+import argparse
+import gc
+import random
+import statistics
+import time
+from typing import Callable, List
+from app.services.street_service import interpolate_paths
+
+def original_interpolate_points(start_point: list, end_point: list, num_points: int):
+    """``interpolate_points`` as it was before batching, kept as the baseline."""
+    lat_step = (end_point[1] - start_point[1]) / (num_points - 1)
+    lon_step = (end_point[0] - start_point[0]) / (num_points - 1)
+
+    points = []
+    for i in range(num_points):
+        lat = start_point[1] + lat_step * i
+        lon = start_point[0] + lon_step * i
+        points.append([lon, lat])
+
+    return points
+
+def _timed(run: Callable[[], object], repeat: int) -> List[float]:
+    # Collections are paused while timing, as timeit does: both versions
+    # allocate the same output lists, and collector pauses dwarf the difference.
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            gc.enable()
+    return timings
+
+def _random_path(rng: random.Random, vertices: int) -> List[List[float]]:
+    # Streets of a few hundred metres around Delhi.
+    longitude, latitude = 77.1 + rng.random() * 0.1, 28.6 + rng.random() * 0.1
+    path = [[longitude, latitude]]
+    for _ in range(vertices - 1):
+        longitude += rng.uniform(-0.003, 0.003)
+        latitude += rng.uniform(-0.003, 0.003)
+        path.append([longitude, latitude])
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time batched point interpolation against the original loop.")
+    parser.add_argument("--paths", type=int, default=10000, help="street segments to interpolate")
+    parser.add_argument("--points", type=int, default=20, help="points per segment")
+    parser.add_argument("--vertices", type=int, default=5, help="vertices per path in the polyline case")
+    parser.add_argument("--repeat", type=int, default=7, help="timed runs per case")
+    args = parser.parse_args(argv)
+    rng = random.Random(0)
+    segments = [_random_path(rng, 2) for _ in range(args.paths)]
+    polylines = [_random_path(rng, args.vertices) for _ in range(args.paths)]
+    counts = [args.points] * args.paths
+
+    timings = {
+        "original loop": _timed(
+            lambda: [original_interpolate_points(start, end, args.points) for start, end in segments], args.repeat
+        ),
+        "interpolate_paths": _timed(lambda: interpolate_paths(segments, counts), args.repeat),
+        f"  {args.vertices}-vertex paths": _timed(lambda: interpolate_paths(polylines, counts), args.repeat),
+    }
+    print(f"{args.paths} paths x {args.points} points")
+    for case, values in timings.items():
+        print(f"{case:>20}: {statistics.median(values):8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare the validated and fast JSON paths for the detailed street view.
+
+Moves ``--lights`` existing lights onto a temporary street, times building
+and encoding its detailed view both ways, then rolls everything back.
+Needs a seeded database and the orjson package::
+
+    python -m app.json_benchmark --lights 1000
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, List
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.db import SessionLocal
+from app.models import models
+from app.schemas import schemas
+from app.services.street_service import build_street_detailed_payloads
+
+def _timed(run: Callable[[], object], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def _create_street(db: Session, lights: int) -> int:
+    street = models.Street(name="JSON benchmark street", start_latitude=0, start_longitude=0)
+    db.add(street)
+    db.flush()
+    light_ids = select(models.StreetLight.id).order_by(models.StreetLight.id).limit(lights).scalar_subquery()
+    moved = db.execute(
+        update(models.StreetLight)
+        .where(models.StreetLight.id.in_(light_ids))
+        .values(street_id=street.id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if moved < lights:
+        raise SystemExit(f"Only {moved} lights to move; seed a larger database")
+    return street.id
+
+def run_benchmark(db: Session, lights: int, repeat: int) -> Dict[str, List[float]]:
+    # Optional like the FAST_JSON path itself, so importing this module never needs it.
+    try:
+        import orjson
+    except ImportError:
+        raise SystemExit("The JSON benchmark needs the orjson package") from None
+    street_id = _create_street(db, lights)
+    payload = build_street_detailed_payloads(db, [street_id])[street_id]
+    detailed_info = schemas.StreetDetailedInfo.model_validate(payload)
+    validated = detailed_info.model_dump_json().encode()
+    if orjson.dumps(payload) != validated:
+        raise SystemExit("Fast path output differs from the validated path")
+    print(f"street with {lights} lights, {len(validated)} bytes")
+
+    return {
+        "queries + payload": _timed(lambda: build_street_detailed_payloads(db, [street_id]), repeat),
+        "validate": _timed(lambda: schemas.StreetDetailedInfo.model_validate(payload), repeat),
+        "pydantic dump_json": _timed(lambda: detailed_info.model_dump_json(), repeat),
+        "orjson dumps": _timed(lambda: orjson.dumps(payload), repeat),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the detailed street view with and without FAST_JSON.")
+    parser.add_argument("--lights", type=int, default=1000, help="lights on the temporary street")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per step")
+    args = parser.parse_args(argv)
+    db = SessionLocal()
+    try:
+        timings = run_benchmark(db, args.lights, args.repeat)
+    finally:
+        db.rollback()
+        db.close()
+
+    medians = {step: statistics.median(values) for step, values in timings.items()}
+    for step, median in medians.items():
+        print(f"{step:>20}: {median:8.2f} ms")
+    shared = medians["queries + payload"]
+    validated = shared + medians["validate"] + medians["pydantic dump_json"]
+    fast = shared + medians["orjson dumps"]
+    print(f"{'validated path':>20}: {validated:8.2f} ms")
+    print(f"{'fast path':>20}: {fast:8.2f} ms ({validated / fast:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,115 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from threading import Lock
+from typing import Optional
 from fastapi import FastAPI
+from sqlalchemy import Connection, Engine, text
+from sqlalchemy.exc import DBAPIError
 from app.api import street
 from app.core.config import settings
 from fastapi.middleware.cors import CORSMiddleware
-from app.db import DECLARATIVE_BASE, engine
+from app.db import DECLARATIVE_BASE, async_engine, engine, read_async_engine
 from app.models.models import Street, StreetLight
+from app.services.summary_service import repair_street_summaries
+from app.services.cluster_service import repair_light_clusters
+from app.services.ward_service import repair_ward_summaries
+from app.services.operations_service import maintain_operation_partitions, repair_operation_rollups
+from app.services.change_tracking import PERIODIC_JOB_LOCK
+from app.services.invalidation_bus import street_change_listener
 
-app = FastAPI(title=settings.app_name)
+logger = logging.getLogger(__name__)
+
+class PeriodicJobLock:
+    """Elects the one worker that runs the periodic jobs.
+
+    The first worker to take a session-level advisory lock keeps it, on a
+    connection of its own, until it shuts down; every other worker skips
+    its passes. If the holder dies its connection closes, Postgres releases
+    the lock and another worker takes it on its next pass.
+    """
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._connection: Optional[Connection] = None
+        self._lock = Lock()
+
+    def held(self) -> bool:
+        with self._lock:
+            if self._connection is not None:
+                try:
+                    self._connection.execute(text("SELECT 1"))
+                    return True
+                except DBAPIError:
+                    # The session, and the lock with it, is gone.
+                    self._connection.invalidate()
+                    self._connection = None
+            # Autocommit, so the held connection does not sit idle in a transaction.
+            connection = self._engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            try:
+                if connection.execute(
+                    text("SELECT pg_try_advisory_lock(:namespace, 0)"), {"namespace": PERIODIC_JOB_LOCK}
+                ).scalar():
+                    self._connection, connection = connection, None
+                    return True
+                return False
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def release(self):
+        with self._lock:
+            if self._connection is None:
+                return
+            try:
+                self._connection.execute(text("SELECT pg_advisory_unlock(:namespace, 0)"), {"namespace": PERIODIC_JOB_LOCK})
+                self._connection.close()
+            except DBAPIError:
+                self._connection.invalidate()
+            self._connection = None
+
+periodic_job_lock = PeriodicJobLock(engine)
+
+async def run_periodically(job, interval: int):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await asyncio.to_thread(periodic_job_lock.held):
+                await asyncio.to_thread(job)
+        except Exception:
+            logger.exception("Periodic job %s failed", job.__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Partitions for this month onwards exist before the first ingest.
+    try:
+        await asyncio.to_thread(maintain_operation_partitions)
+    except Exception:
+        logger.exception("Creating telemetry partitions failed")
+    periodic_jobs = [
+        (repair_street_summaries, settings.street_summary_repair_interval),
+        (repair_ward_summaries, settings.ward_summary_repair_interval),
+        (repair_light_clusters, settings.light_cluster_repair_interval),
+        (maintain_operation_partitions, settings.operation_partition_interval),
+        (repair_operation_rollups, settings.operation_rollup_repair_interval),
+    ]
+    tasks = [
+        asyncio.create_task(run_periodically(job, interval))
+        for job, interval in periodic_jobs
+        if interval > 0
+    ]
+    if settings.street_change_listener_enabled:
+        street_change_listener.start()
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.to_thread(periodic_job_lock.release)
+    street_change_listener.stop()
+    await async_engine.dispose()
+    if read_async_engine is not async_engine:
+        await read_async_engine.dispose()
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,4 +126,3 @@ app.include_router(street.router, prefix="/api")
 @app.get("/")
 def read_root():
     return {"message": "Welcome to StreetSmart - A Street Light Management System"}
-
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, Text
+from sqlalchemy import Column, FetchedValue, Integer, BigInteger, SmallInteger, String, Float, ForeignKey, Date, DateTime, Text, JSON, Index, DDL, Computed, event, text
 from sqlalchemy.orm import relationship
 from app.db import DECLARATIVE_BASE as Base
+from app.core.spatial import grid_cell_sql
 
 class StreetLight(Base):
     __tablename__ = "street_lights"
@@ -9,8 +10,11 @@ class StreetLight(Base):
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     address = Column(String)
-    ward = Column(String)
-    street_id = Column(Integer, ForeignKey("streets.id"))
+    ward = Column(String, index=True)
+    # Set from ``ward`` by the set_ward_id trigger.
+    ward_id = Column(Integer, ForeignKey("wards.id"), index=True, server_default=FetchedValue(), server_onupdate=FetchedValue())
+    street_id = Column(Integer, ForeignKey("streets.id"), index=True)
+    grid_cell = Column(BigInteger, Computed(grid_cell_sql("latitude", "longitude"), persisted=True), index=True)
 
     installation_detail = relationship("InstallationDetail", uselist=False, back_populates="street_light")
     light_specification = relationship("LightSpecification", uselist=False, back_populates="street_light")
@@ -30,7 +34,7 @@ class InstallationDetail(Base):
     __tablename__ = "installation_details"
 
     id = Column(Integer, primary_key=True, index=True)
-    street_light_id = Column(Integer, ForeignKey("street_lights.id"))
+    street_light_id = Column(Integer, ForeignKey("street_lights.id"), index=True)
     installation_date = Column(Date, nullable=False)
     contractor_name = Column(String)
 
@@ -41,7 +45,7 @@ class LightSpecification(Base):
     __tablename__ = "light_specifications"
 
     id = Column(Integer, primary_key=True, index=True)
-    street_light_id = Column(Integer, ForeignKey("street_lights.id"))
+    street_light_id = Column(Integer, ForeignKey("street_lights.id"), index=True)
     bulb_type = Column(String)
     bulb_manufacturer = Column(String)
     wattage = Column(Integer)
@@ -53,7 +57,7 @@ class HardwareInformation(Base):
     __tablename__ = "hardware_information"
 
     id = Column(Integer, primary_key=True, index=True)
-    street_light_id = Column(Integer, ForeignKey("street_lights.id"))
+    street_light_id = Column(Integer, ForeignKey("street_lights.id"), index=True)
     pole_type = Column(String)
     pole_height = Column(Float)
     control_system_type = Column(String)
@@ -63,12 +67,15 @@ class HardwareInformation(Base):
 
 class WarrantyInformation(Base):
     __tablename__ = "warranty_information"
+    __table_args__ = (
+        Index("ix_warranty_information_component_end", "component_name", "warranty_end"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    street_light_id = Column(Integer, ForeignKey("street_lights.id"))
+    street_light_id = Column(Integer, ForeignKey("street_lights.id"), index=True)
     component_name = Column(String)
     warranty_start = Column(Date)
-    warranty_end = Column(Date)
+    warranty_end = Column(Date, index=True)
     warranty_terms = Column(Text)
 
     street_light = relationship("StreetLight", back_populates="warranties")
@@ -78,7 +85,7 @@ class CostAndPricing(Base):
     __tablename__ = "cost_and_pricing"
 
     id = Column(Integer, primary_key=True, index=True)
-    street_light_id = Column(Integer, ForeignKey("street_lights.id"))
+    street_light_id = Column(Integer, ForeignKey("street_lights.id"), index=True)
     installation_cost = Column(Float)
     bulb_cost = Column(Float)
     fixture_cost = Column(Float)
@@ -90,6 +97,9 @@ class CostAndPricing(Base):
 
 class MaintenanceHistory(Base):
     __tablename__ = "maintenance_history"
+    __table_args__ = (
+        Index("ix_maintenance_history_light_date", "street_light_id", "maintenance_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     street_light_id = Column(Integer, ForeignKey("street_lights.id"))
@@ -104,10 +114,13 @@ class MaintenanceHistory(Base):
 
 class IssueReport(Base):
     __tablename__ = "issue_reports"
+    __table_args__ = (
+        Index("ix_issue_reports_light_date", "street_light_id", "issue_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     street_light_id = Column(Integer, ForeignKey("street_lights.id"))
-    issue_date = Column(Date)
+    issue_date = Column(Date, index=True)
     issue_description = Column(Text)
     resolution_status = Column(String)
     resolution_date = Column(Date)
@@ -120,7 +133,7 @@ class EnergyConsumption(Base):
     __tablename__ = "energy_consumption"
 
     id = Column(Integer, primary_key=True, index=True)
-    street_light_id = Column(Integer, ForeignKey("street_lights.id"))
+    street_light_id = Column(Integer, ForeignKey("street_lights.id"), index=True)
     average_daily_consumption = Column(Float)
     average_monthly_consumption = Column(Float)
     operating_hours = Column(Integer)
@@ -132,8 +145,8 @@ class OperationalStatus(Base):
     __tablename__ = "operational_status"
 
     id = Column(Integer, primary_key=True, index=True)
-    street_light_id = Column(Integer, ForeignKey("street_lights.id"))
-    current_status = Column(String)
+    street_light_id = Column(Integer, ForeignKey("street_lights.id"), index=True)
+    current_status = Column(String, index=True)
     last_status_update = Column(Date)
 
     street_light = relationship("StreetLight", back_populates="operational_status")
@@ -143,7 +156,7 @@ class LifeCycleInformation(Base):
     __tablename__ = "life_cycle_information"
 
     id = Column(Integer, primary_key=True, index=True)
-    street_light_id = Column(Integer, ForeignKey("street_lights.id"))
+    street_light_id = Column(Integer, ForeignKey("street_lights.id"), index=True)
     component = Column(String)
     expected_lifespan = Column(Integer)  # In years
     replacement_schedule = Column(Date)
@@ -162,5 +175,268 @@ class Street(Base):
     end_longitude = Column(Float)
     description = Column(String)
     ward = Column(String)
+    ward_id = Column(Integer, ForeignKey("wards.id"), index=True, server_default=FetchedValue(), server_onupdate=FetchedValue())
+    start_grid_cell = Column(
+        BigInteger, Computed(grid_cell_sql("start_latitude", "start_longitude"), persisted=True), index=True
+    )
+    end_grid_cell = Column(
+        BigInteger, Computed(grid_cell_sql("end_latitude", "end_longitude"), persisted=True), index=True
+    )
 
-    street_lights = relationship("StreetLight", back_populates="street")
\ No newline at end of file
+    street_lights = relationship("StreetLight", back_populates="street")
+
+
+class StreetSummary(Base):
+    __tablename__ = "street_summaries"
+
+    street_id = Column(Integer, ForeignKey("streets.id", ondelete="CASCADE"), primary_key=True)
+    total_lights = Column(Integer, nullable=False, default=0)
+    total_power_consumption = Column(Float, nullable=False, default=0)
+    operational_summary = Column(JSON, nullable=False, default=dict)
+    recent_issues = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, nullable=False)
+
+
+class Ward(Base):
+    """Distinct ward names, so ward rollups join on an integer key."""
+    __tablename__ = "wards"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False, unique=True)
+
+
+class WardSummary(Base):
+    __tablename__ = "ward_summaries"
+
+    ward_id = Column(Integer, ForeignKey("wards.id", ondelete="CASCADE"), primary_key=True)
+    total_streets = Column(Integer, nullable=False, default=0)
+    total_lights = Column(Integer, nullable=False, default=0)
+    total_power_consumption = Column(Float, nullable=False, default=0)
+    operational_summary = Column(JSON, nullable=False, default=dict)
+    open_issues = Column(Integer, nullable=False, default=0)
+    total_installation_cost = Column(Float, nullable=False, default=0)
+    total_maintenance_cost = Column(Float, nullable=False, default=0)
+    total_electricity_cost = Column(Float, nullable=False, default=0)
+    refreshed_at = Column(DateTime, nullable=False)
+
+
+class StreetLightOperation(Base):
+    """Per-reading controller telemetry, range-partitioned by month on ``timestamp``."""
+    __tablename__ = "street_light_operations"
+    __table_args__ = (
+        Index("ix_street_light_operations_light_timestamp", "street_light_id", "timestamp"),
+        # Faults are a small share of readings; the fault feed pages through
+        # them in (timestamp, id) order, city-wide or for a set of lights.
+        Index(
+            "ix_street_light_operations_faults", "timestamp", "id",
+            postgresql_where=text("fault_type <> 0")
+        ),
+        Index(
+            "ix_street_light_operations_light_faults", "street_light_id", "timestamp", "id",
+            postgresql_where=text("fault_type <> 0")
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    timestamp = Column(DateTime, primary_key=True)
+    street_light_id = Column(Integer, ForeignKey("street_lights.id"), nullable=False)
+    power_consumption = Column(Float)
+    voltage_levels = Column(Float)
+    current_fluctuations = Column(Float)
+    temperature = Column(Float)
+    environmental_conditions = Column(String)
+    current_fluctuations_env = Column(Float)
+    fault_type = Column(Integer, nullable=False, default=0)
+
+
+# Catch-all partition so rows outside the pre-created monthly ranges are never rejected.
+event.listen(
+    StreetLightOperation.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS street_light_operations_default "
+        "PARTITION OF street_light_operations DEFAULT")
+)
+
+
+class LightOperationRollup(Base):
+    """Hourly/daily aggregates of ``street_light_operations`` per light."""
+    __tablename__ = "light_operation_rollups"
+
+    resolution = Column(String, primary_key=True)  # "hour" or "day"
+    bucket = Column(DateTime, primary_key=True)
+    street_light_id = Column(Integer, ForeignKey("street_lights.id"), primary_key=True)
+    samples = Column(Integer, nullable=False)
+    power_min = Column(Float)
+    power_max = Column(Float)
+    power_sum = Column(Float)
+    voltage_min = Column(Float)
+    voltage_max = Column(Float)
+    voltage_sum = Column(Float)
+    temperature_min = Column(Float)
+    temperature_max = Column(Float)
+    temperature_sum = Column(Float)
+    fault_count = Column(Integer, nullable=False)
+
+
+class StreetOperationRollup(Base):
+    """Hourly/daily aggregates of ``street_light_operations`` per street."""
+    __tablename__ = "street_operation_rollups"
+
+    resolution = Column(String, primary_key=True)  # "hour" or "day"
+    bucket = Column(DateTime, primary_key=True)
+    street_id = Column(Integer, ForeignKey("streets.id"), primary_key=True)
+    samples = Column(Integer, nullable=False)
+    power_min = Column(Float)
+    power_max = Column(Float)
+    power_sum = Column(Float)
+    voltage_min = Column(Float)
+    voltage_max = Column(Float)
+    voltage_sum = Column(Float)
+    temperature_min = Column(Float)
+    temperature_max = Column(Float)
+    temperature_sum = Column(Float)
+    fault_count = Column(Integer, nullable=False)
+
+
+class LightClusterMember(Base):
+    """Position and status each light last contributed to ``light_clusters``."""
+    __tablename__ = "light_cluster_members"
+
+    street_light_id = Column(Integer, primary_key=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    status = Column(String, nullable=False)
+
+
+class LightCluster(Base):
+    """Light counts per zoom level, web-mercator cluster cell and operational status."""
+    __tablename__ = "light_clusters"
+
+    zoom = Column(SmallInteger, primary_key=True)
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    light_count = Column(Integer, nullable=False)
+    latitude_sum = Column(Float, nullable=False)
+    longitude_sum = Column(Float, nullable=False)
+
+
+# Statement-level triggers NOTIFY the street and light ids touched by every
+# write to these tables (ORM, raw SQL or COPY) so each API worker can refresh
+# the rollups and evict its caches. They are the tables the cached street
+# views read; values name the column holding the street light id (the
+# street id for streets).
+STREET_CHANGES_CHANNEL = "street_changes"
+# Set to 'on' for a transaction (SET LOCAL) to write without notifying, e.g.
+# bulk loads that rebuild the rollups and reset the caches themselves.
+SUPPRESS_STREET_CHANGES_SETTING = "streetsmart.suppress_street_changes"
+STREET_CHANGE_TABLES = {
+    "streets": "id",
+    "street_lights": "id",
+    "installation_details": "street_light_id",
+    "light_specifications": "street_light_id",
+    "warranty_information": "street_light_id",
+    "cost_and_pricing": "street_light_id",
+    "maintenance_history": "street_light_id",
+    "issue_reports": "street_light_id",
+    "energy_consumption": "street_light_id",
+    "operational_status": "street_light_id",
+}
+
+NOTIFY_STREET_CHANGES_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION notify_street_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed_rows text;
+    pairs text;
+    payload text;
+BEGIN
+    IF current_setting('{SUPPRESS_STREET_CHANGES_SETTING}', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    changed_rows := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+    -- (light, street) pairs touched. Child rows of lights deleted by the
+    -- same statement are covered by the street_lights trigger.
+    IF TG_TABLE_NAME = 'streets' THEN
+        pairs := 'SELECT DISTINCT NULL::integer AS light_id, id AS street_id FROM (' || changed_rows || ') r';
+    ELSIF TG_TABLE_NAME = 'street_lights' THEN
+        pairs := 'SELECT DISTINCT id AS light_id, street_id FROM (' || changed_rows || ') r';
+    ELSE
+        pairs := 'SELECT id AS light_id, street_id FROM street_lights WHERE id IN (SELECT '
+            || quote_ident(TG_ARGV[0]) || ' FROM (' || changed_rows || ') r)';
+    END IF;
+    -- NOTIFY payloads are capped at 8000 bytes, so large statements send
+    -- batches of 250 lights, each carrying its own streets. Lights without a
+    -- street are batched apart so listeners can tell their street is unknown.
+    -- xid lets listeners skip rollups the writing session already refreshed.
+    FOR payload IN EXECUTE $q$
+        SELECT json_build_object(
+            'xid', txid_current(),
+            'street_ids', coalesce(array_agg(DISTINCT street_id) FILTER (WHERE street_id IS NOT NULL), '{{}}'),
+            'light_ids', coalesce(array_agg(DISTINCT light_id) FILTER (WHERE light_id IS NOT NULL), '{{}}')
+        )::text
+        FROM (
+            SELECT light_id, street_id,
+                (row_number() OVER (PARTITION BY street_id IS NULL ORDER BY street_id, light_id) - 1) / 250 AS batch
+            FROM ($q$ || pairs || $q$) p
+        ) b
+        GROUP BY street_id IS NULL, batch
+    $q$
+    LOOP
+        PERFORM pg_notify('{STREET_CHANGES_CHANNEL}', payload);
+    END LOOP;
+    RETURN NULL;
+END $$
+"""
+
+def street_change_trigger_sql(table: str, light_column: str) -> str:
+    # Transition tables require one trigger per event.
+    return "; ".join(
+        f"CREATE TRIGGER {table}_notify_{event_name.lower()} AFTER {event_name} ON {table} "
+        f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION notify_street_changes('{light_column}')"
+        for event_name, referencing in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+            ("DELETE", "OLD TABLE AS old_rows"),
+        )
+    )
+
+for _table_name, _light_column in STREET_CHANGE_TABLES.items():
+    event.listen(
+        Base.metadata.tables[_table_name],
+        "after_create",
+        DDL(NOTIFY_STREET_CHANGES_FUNCTION + "; " + street_change_trigger_sql(_table_name, _light_column))
+    )
+
+
+# Keeps ward_id in step with the ward name on every write path, creating
+# the ward on first use.
+SET_WARD_ID_FUNCTION = """
+CREATE OR REPLACE FUNCTION set_ward_id() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF NEW.ward IS NULL THEN
+        NEW.ward_id := NULL;
+        RETURN NEW;
+    END IF;
+    SELECT id INTO NEW.ward_id FROM wards WHERE name = NEW.ward;
+    IF NOT FOUND THEN
+        INSERT INTO wards (name) VALUES (NEW.ward) ON CONFLICT (name) DO NOTHING;
+        SELECT id INTO NEW.ward_id FROM wards WHERE name = NEW.ward;
+    END IF;
+    RETURN NEW;
+END $$
+"""
+
+def set_ward_id_trigger_sql(table: str) -> str:
+    return (
+        f"CREATE TRIGGER {table}_set_ward_id BEFORE INSERT OR UPDATE OF ward ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION set_ward_id()"
+    )
+
+event.listen(Ward.__table__, "after_create", DDL(SET_WARD_ID_FUNCTION))
+for _table in (Street.__table__, StreetLight.__table__):
+    event.listen(_table, "after_create", DDL(set_ward_id_trigger_sql(_table.name)))
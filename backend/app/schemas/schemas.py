@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_serializer
 from typing import List, Optional, Dict
-from datetime import date
+from datetime import date, datetime
 
 class StreetPointsRequest(BaseModel):
     start_point: List[float]
@@ -10,6 +10,17 @@ class StreetPointsRequest(BaseModel):
 class StreetPointsResponse(BaseModel):
     points: List[List[float]]
 
+class PathPointsRequest(BaseModel):
+    # Polyline vertices as [longitude, latitude] pairs
+    path: List[List[float]] = Field(..., min_length=1)
+    num_points: int = Field(..., ge=0)
+
+class BatchPointsRequest(BaseModel):
+    paths: List[PathPointsRequest]
+
+class BatchPointsResponse(BaseModel):
+    paths: List[List[List[float]]]
+
 class InstallationDetailBase(BaseModel):
     installation_date: date
     contractor_name: Optional[str]
@@ -44,6 +55,32 @@ class MaintenanceHistoryBase(BaseModel):
     contractor_name: Optional[str]
     notes: Optional[str]
 
+class MaintenanceHistory(MaintenanceHistoryBase):
+    id: int
+    street_light_id: int
+
+    class Config:
+        from_attributes = True
+
+class MaintenancePage(BaseModel):
+    items: List[MaintenanceHistory]
+    # Pass back as ``cursor`` for the next page; None on the last page.
+    next_cursor: Optional[str]
+
+class MaintenanceCostPoint(BaseModel):
+    # First day of the week or month.
+    bucket: date
+    records: int
+    cost: float
+
+class MaintenanceCostSeries(BaseModel):
+    resolution: str
+    start: Optional[date]
+    end: Optional[date]
+    total_records: int
+    total_cost: float
+    points: List[MaintenanceCostPoint]
+
 class IssueReportBase(BaseModel):
     issue_date: date
     issue_description: Optional[str]
@@ -82,9 +119,21 @@ class StreetLightCreate(StreetLightBase):
     operational_status: Optional[OperationalStatusBase]
     life_cycle_information: Optional[LifeCycleInformationBase]
 
+class BulkCreatedItem(BaseModel):
+    index: int
+    id: int
+
+class BulkItemError(BaseModel):
+    index: int
+    detail: str
+
+class StreetLightBulkResponse(BaseModel):
+    created: List[BulkCreatedItem]
+    errors: List[BulkItemError]
+
 class StreetLightOperationCreate(BaseModel):
     street_light_id: int
-    timestamp: date
+    timestamp: datetime
     power_consumption: float
     voltage_levels: float
     current_fluctuations: float
@@ -93,6 +142,43 @@ class StreetLightOperationCreate(BaseModel):
     current_fluctuations_env: float
     fault_type: int
 
+class StreetLightOperation(StreetLightOperationCreate):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+class FaultPage(BaseModel):
+    items: List[StreetLightOperation]
+    # Pass back as ``cursor`` for the next page; None on the last page.
+    next_cursor: Optional[str]
+
+class OperationsIngestResponse(BaseModel):
+    status: str
+    message: str
+    ingested: int
+
+class OperationSeriesPoint(BaseModel):
+    bucket: datetime
+    samples: int
+    power_min: Optional[float]
+    power_max: Optional[float]
+    power_avg: Optional[float]
+    power_sum: Optional[float]
+    voltage_min: Optional[float]
+    voltage_max: Optional[float]
+    voltage_avg: Optional[float]
+    temperature_min: Optional[float]
+    temperature_max: Optional[float]
+    temperature_avg: Optional[float]
+    fault_count: int
+
+class OperationSeries(BaseModel):
+    resolution: str
+    start: datetime
+    end: datetime
+    points: List[OperationSeriesPoint]
+
 class StreetLight(StreetLightBase):
     id: int
     installation_detail: Optional[InstallationDetailBase]
@@ -180,18 +266,95 @@ class WarrantySummary(BaseModel):
     active_warranties: int
     expiring_soon: int
 
+class WarrantyCounts(BaseModel):
+    component_name: Optional[str]
+    active: int
+    expiring: int
+    expired: int
+
+class WarrantyReport(BaseModel):
+    as_of: date
+    # ``expiring`` counts active warranties ending within this many days.
+    days: int
+    active: int
+    expiring: int
+    expired: int
+    by_component: List[WarrantyCounts]
+
+class WardSummary(BaseModel):
+    id: int
+    name: str
+    total_streets: int
+    total_lights: int
+    total_power_consumption: float
+    operational_summary: Dict[str, int]
+    open_issues: int
+    cost_summary: CostSummary
+
+class CostBreakdown(BaseModel):
+    name: Optional[str]
+    lights: int
+    installation_cost: float
+    maintenance_cost: float
+    electricity_cost: float
+    total_cost: float
+
+class CostReport(BaseModel):
+    totals: CostSummary
+    by_contractor: List[CostBreakdown]
+    by_manufacturer: List[CostBreakdown]
+
 class StreetInfo(BaseModel):
     street_name: str
     ward: Optional[str]
     description: Optional[str]
 
+class StreetGeometry(BaseModel):
+    street: StreetBasicInfo
+    # [longitude, latitude] vertices of the street and of each light
+    path: List[List[float]]
+    light_positions: List[List[float]]
+
 class StreetDetailedInfo(BaseModel):
     street_info: StreetInfo
-    lights_info: List[LightInfo]
-    maintenance_summary: MaintenanceSummary
-    energy_summary: EnergySummary
-    cost_summary: CostSummary
-    warranty_summary: WarrantySummary
+    # Sections left out of a response's ``include`` are None and omitted from it.
+    lights_info: Optional[List[LightInfo]] = None
+    maintenance_summary: Optional[MaintenanceSummary] = None
+    energy_summary: Optional[EnergySummary] = None
+    cost_summary: Optional[CostSummary] = None
+    warranty_summary: Optional[WarrantySummary] = None
+
+    @model_serializer(mode="wrap")
+    def _omit_excluded_sections(self, serialize):
+        return {key: value for key, value in serialize(self).items() if value is not None}
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ViewportLight(BaseModel):
+    id: int
+    street_id: Optional[int]
+    latitude: float
+    longitude: float
+    status: Optional[str]
+
+class ViewportStreet(BaseModel):
+    id: int
+    street_name: str
+    ward: Optional[str]
+    coordinates: Optional[StreetLocation]
+
+class ViewportResponse(BaseModel):
+    lights: List[ViewportLight]
+    streets: List[ViewportStreet]
+    truncated: bool
+
+class LightCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+    status_counts: Dict[str, int]
+
+class ClusterResponse(BaseModel):
+    zoom: int
+    clusters: List[LightCluster]
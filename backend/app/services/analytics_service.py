@@ -0,0 +1,172 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+from app.models import models
+from app.schemas import schemas
+
+WARRANTY_EXPIRY_WINDOW_DAYS = 90
+
+COST_COLUMNS = {
+    "installation": models.CostAndPricing.installation_cost,
+    "maintenance": models.CostAndPricing.maintenance_cost,
+    "electricity": models.CostAndPricing.electricity_cost,
+}
+
+# Dimensions the cost report is broken down by, keyed by the report field.
+COST_DIMENSIONS = {
+    "by_contractor": (models.InstallationDetail, models.InstallationDetail.contractor_name),
+    "by_manufacturer": (models.LightSpecification, models.LightSpecification.bulb_manufacturer),
+}
+
+def _scoped(query: Query, light_id_column, street_id: Optional[int], ward: Optional[str]) -> Query:
+    """Limit ``query`` to the lights of one street or ward; city-wide when neither is given."""
+    if street_id is None and ward is None:
+        return query
+    query = query.join(models.StreetLight, models.StreetLight.id == light_id_column)
+    if street_id is not None:
+        query = query.filter(models.StreetLight.street_id == street_id)
+    if ward is not None:
+        query = query.filter(models.StreetLight.ward == ward)
+    return query
+
+def get_warranty_report(
+    db: Session,
+    days: int = WARRANTY_EXPIRY_WINDOW_DAYS,
+    street_id: Optional[int] = None,
+    ward: Optional[str] = None,
+    today: Optional[date] = None,
+) -> schemas.WarrantyReport:
+    """Active, expiring (within ``days``) and expired warranties per component.
+
+    Warranties are first counted per (component, end date), which streams
+    off the matching index without reading the table; the few thousand
+    resulting groups are then bucketed relative to ``today``.
+    """
+    today = today or date.today()
+    horizon = today + timedelta(days=days)
+    warranty = models.WarrantyInformation
+    by_end_date = _scoped(
+        db.query(warranty.component_name, warranty.warranty_end, func.count().label("warranties")),
+        warranty.street_light_id, street_id, ward
+    ).group_by(warranty.component_name, warranty.warranty_end).subquery()
+    end, warranties = by_end_date.c.warranty_end, by_end_date.c.warranties
+    rows = db.query(
+        by_end_date.c.component_name,
+        func.coalesce(func.sum(warranties).filter(end > today), 0),
+        func.coalesce(func.sum(warranties).filter(end > today, end <= horizon), 0),
+        func.coalesce(func.sum(warranties).filter(end <= today), 0),
+    ).group_by(by_end_date.c.component_name)\
+        .order_by(by_end_date.c.component_name)\
+        .all()
+    components = [
+        schemas.WarrantyCounts(component_name=component, active=active, expiring=expiring, expired=expired)
+        for component, active, expiring, expired in rows
+    ]
+    return schemas.WarrantyReport(
+        as_of=today,
+        days=days,
+        active=sum(component.active for component in components),
+        expiring=sum(component.expiring for component in components),
+        expired=sum(component.expired for component in components),
+        by_component=components
+    )
+
+def get_street_warranty_summaries(
+    db: Session, street_ids: List[int], today: Optional[date] = None
+) -> Dict[int, schemas.WarrantySummary]:
+    """Active and soon-expiring warranty counts for each of ``street_ids`` in one grouped query."""
+    today = today or date.today()
+    horizon = today + timedelta(days=WARRANTY_EXPIRY_WINDOW_DAYS)
+    end = models.WarrantyInformation.warranty_end
+    rows = db.query(
+        models.StreetLight.street_id,
+        func.count().filter(end > today),
+        func.count().filter(end > today, end <= horizon),
+    ).select_from(models.WarrantyInformation)\
+        .join(models.StreetLight, models.StreetLight.id == models.WarrantyInformation.street_light_id)\
+        .filter(models.StreetLight.street_id.in_(street_ids))\
+        .group_by(models.StreetLight.street_id)\
+        .all()
+    summaries = {
+        street_id: schemas.WarrantySummary(active_warranties=0, expiring_soon=0) for street_id in street_ids
+    }
+    for street_id, active, expiring in rows:
+        summaries[street_id] = schemas.WarrantySummary(active_warranties=active, expiring_soon=expiring)
+    return summaries
+
+def _cost_totals() -> list:
+    """Light count and per-category cost sums, in ``COST_COLUMNS`` order."""
+    return [
+        func.count(models.CostAndPricing.id),
+        *[func.coalesce(func.sum(column), 0) for column in COST_COLUMNS.values()]
+    ]
+
+def _cost_breakdown(name: Optional[str], lights: int, installation: float, maintenance: float, electricity: float):
+    return schemas.CostBreakdown(
+        name=name,
+        lights=lights,
+        installation_cost=installation,
+        maintenance_cost=maintenance,
+        electricity_cost=electricity,
+        total_cost=installation + maintenance + electricity
+    )
+
+def _cost_summary(installation: float, maintenance: float, electricity: float) -> schemas.CostSummary:
+    return schemas.CostSummary(
+        total_installation_cost=installation,
+        total_maintenance_cost=maintenance,
+        total_electricity_cost=electricity,
+        total_cost=installation + maintenance + electricity
+    )
+
+def get_cost_summary(db: Session, street_id: Optional[int] = None, ward: Optional[str] = None) -> schemas.CostSummary:
+    query = db.query(*_cost_totals()).select_from(models.CostAndPricing)
+    _, installation, maintenance, electricity = _scoped(
+        query, models.CostAndPricing.street_light_id, street_id, ward
+    ).one()
+    return _cost_summary(installation, maintenance, electricity)
+
+def get_street_cost_summaries(db: Session, street_ids: List[int]) -> Dict[int, schemas.CostSummary]:
+    """Cost totals for each of ``street_ids`` in one grouped query."""
+    rows = db.query(models.StreetLight.street_id, *_cost_totals())\
+        .select_from(models.CostAndPricing)\
+        .join(models.StreetLight, models.StreetLight.id == models.CostAndPricing.street_light_id)\
+        .filter(models.StreetLight.street_id.in_(street_ids))\
+        .group_by(models.StreetLight.street_id)\
+        .all()
+    summaries = {street_id: _cost_summary(0, 0, 0) for street_id in street_ids}
+    for street_id, _, installation, maintenance, electricity in rows:
+        summaries[street_id] = _cost_summary(installation, maintenance, electricity)
+    return summaries
+
+def get_cost_report(db: Session, ward: Optional[str] = None) -> schemas.CostReport:
+    """Cost totals for the city or a ward, broken down by installation contractor and bulb manufacturer.
+
+    Costs are summed per light first and each light is attributed to its
+    latest contractor and manufacturer, so a light with several cost or
+    specification rows is counted, and its costs added, once.
+    """
+    cost = models.CostAndPricing
+    light_costs = _scoped(
+        db.query(cost.street_light_id, *[func.sum(column).label(name) for name, column in COST_COLUMNS.items()]),
+        cost.street_light_id, None, ward
+    ).group_by(cost.street_light_id).subquery()
+    breakdowns = {}
+    for field, (model, dimension) in COST_DIMENSIONS.items():
+        latest = db.query(model.street_light_id, dimension)\
+            .distinct(model.street_light_id)\
+            .order_by(model.street_light_id, model.id.desc())\
+            .subquery()
+        name = latest.c[dimension.key]
+        rows = db.query(
+            name,
+            func.count(),
+            *[func.coalesce(func.sum(light_costs.c[column]), 0) for column in COST_COLUMNS],
+        ).select_from(light_costs)\
+            .join(latest, latest.c.street_light_id == light_costs.c.street_light_id)\
+            .group_by(name)\
+            .order_by(name)\
+            .all()
+        breakdowns[field] = [_cost_breakdown(*row) for row in rows]
+    return schemas.CostReport(totals=get_cost_summary(db, ward=ward), **breakdowns)
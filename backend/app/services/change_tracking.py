@@ -0,0 +1,213 @@
+from itertools import chain
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+from app.models import models
+
+# Tables whose rows hang off a street light and feed street-level figures.
+LIGHT_CHILD_MODELS = (
+    models.InstallationDetail,
+    models.LightSpecification,
+    models.HardwareInformation,
+    models.WarrantyInformation,
+    models.CostAndPricing,
+    models.MaintenanceHistory,
+    models.IssueReport,
+    models.EnergyConsumption,
+    models.OperationalStatus,
+    models.LifeCycleInformation,
+)
+
+CommitHook = Callable[[Session, Set[int], Set[int]], None]
+InvalidationListener = Callable[[Set[int], Set[int], Set[Tuple[float, float]]], None]
+
+_SESSION_KEY = "street_changes"
+_commit_hooks: List[CommitHook] = []
+_invalidation_listeners: List[InvalidationListener] = []
+_reset_listeners: List[Callable[[], None]] = []
+
+def register_commit_hook(hook: CommitHook) -> CommitHook:
+    """Run ``hook(session, street_ids, light_ids)`` inside the committing transaction."""
+    _commit_hooks.append(hook)
+    return hook
+
+def run_commit_hooks(session: Session, street_ids: Set[int], light_ids: Set[int]):
+    """Refresh the rollups for changed streets and lights, e.g. ones another process committed."""
+    for hook in _commit_hooks:
+        hook(session, street_ids, light_ids)
+
+def register_invalidation_listener(listener: InvalidationListener) -> InvalidationListener:
+    """Run ``listener(street_ids, light_ids, positions)`` once changes are committed.
+
+    ``positions`` holds the (latitude, longitude) pairs a changed light
+    occupied before or after the change, and the endpoints of changed
+    streets. Listeners run on the committing thread, which may be the event
+    loop, so they must not query the database.
+    """
+    _invalidation_listeners.append(listener)
+    return listener
+
+def notify_invalidated(
+    street_ids: Iterable[int],
+    light_ids: Iterable[int] = (),
+    positions: Iterable[Tuple[float, float]] = (),
+):
+    street_ids, light_ids, positions = set(street_ids), set(light_ids), set(positions)
+    for listener in _invalidation_listeners:
+        listener(street_ids, light_ids, positions)
+
+def register_reset_listener(listener: Callable[[], None]) -> Callable[[], None]:
+    """Run ``listener()`` when changes may have been missed and every cached entry is suspect."""
+    _reset_listeners.append(listener)
+    return listener
+
+def notify_reset():
+    for listener in _reset_listeners:
+        listener()
+
+def broadcast_reset(session: Session):
+    """Have every listening worker call ``notify_reset`` once ``session``'s transaction commits."""
+    session.execute(text("SELECT pg_notify(:channel, '{\"reset\": true}')"), {"channel": models.STREET_CHANGES_CHANNEL})
+
+# Advisory lock namespaces, the first key of pg_advisory_xact_lock(int, int).
+STREET_SUMMARY_LOCK = 1
+WARD_SUMMARY_LOCK = 2
+LIGHT_CLUSTER_LOCK = 3
+# Keyed by the writing transaction's id; see InvalidationListener._refresh.
+CHANGE_REFRESH_LOCK = 4
+# Session-level lock held by the one worker that runs the periodic jobs; see app.main.PeriodicJobLock.
+PERIODIC_JOB_LOCK = 5
+
+def lock_rollup_rows(session: Session, namespace: int, keys: Optional[Iterable[int]] = None):
+    """Serialize refreshes of the rollup rows ``keys`` until the transaction ends.
+
+    Rollup rows are recomputed from the refreshing transaction's snapshot,
+    so two concurrent refreshes of one row would each miss the other's
+    writes and the last upsert would win. Once the lock is granted, every
+    transaction that held it has committed, and under READ COMMITTED the
+    recompute sees its rows. Keys are locked in ascending order so
+    refreshes cannot deadlock; ``keys=None`` (full rebuilds) takes key 0,
+    which ids never use, exclusively, and keyed refreshes take it shared.
+    """
+    if keys is None:
+        session.execute(text("SELECT pg_advisory_xact_lock(:namespace, 0)"), {"namespace": namespace})
+        return
+    session.execute(text("SELECT pg_advisory_xact_lock_shared(:namespace, 0)"), {"namespace": namespace})
+    session.execute(
+        text("SELECT pg_advisory_xact_lock(:namespace, key) FROM unnest(CAST(:keys AS integer[])) AS key"),
+        {"namespace": namespace, "keys": sorted(keys)}
+    )
+
+def changed_positions(session: Session, street_ids: Iterable[int], light_ids: Iterable[int]) -> Set[Tuple[float, float]]:
+    """Current positions of ``light_ids`` and endpoints of ``street_ids``."""
+    street_ids, light_ids = list(street_ids), list(light_ids)
+    positions = set()
+    if light_ids:
+        positions.update(
+            session.query(models.StreetLight.latitude, models.StreetLight.longitude)
+            .filter(models.StreetLight.id.in_(light_ids))
+            .all()
+        )
+    if street_ids:
+        for start_latitude, start_longitude, end_latitude, end_longitude in session.query(
+            models.Street.start_latitude, models.Street.start_longitude,
+            models.Street.end_latitude, models.Street.end_longitude,
+        ).filter(models.Street.id.in_(street_ids)):
+            positions.add((start_latitude, start_longitude))
+            positions.add((end_latitude, end_longitude))
+    return {position for position in positions if None not in position}
+
+def _pending(session: Session):
+    return session.info.setdefault(
+        _SESSION_KEY, {"street_ids": set(), "light_ids": set(), "positions": set()}
+    )
+
+def mark_changed(
+    session: Session,
+    street_ids: Iterable[int] = (),
+    light_ids: Iterable[int] = (),
+    positions: Iterable[Tuple[float, float]] = (),
+):
+    """Record writes made outside the ORM unit of work (bulk inserts, raw SQL)."""
+    pending = _pending(session)
+    pending["street_ids"].update(i for i in street_ids if i is not None)
+    pending["light_ids"].update(i for i in light_ids if i is not None)
+    pending["positions"].update(
+        position for position in positions if None not in position
+    )
+
+def _attribute_values(obj, key):
+    history = inspect(obj).attrs[key].history
+    return chain(history.unchanged or (), history.added or (), history.deleted or ())
+
+def _previous_and_current(obj, key):
+    history = inspect(obj).attrs[key].history
+    current = (history.added or history.unchanged or [None])[0]
+    previous = (history.deleted or [current])[0]
+    return previous, current
+
+def _light_positions(obj):
+    previous_latitude, latitude = _previous_and_current(obj, "latitude")
+    previous_longitude, longitude = _previous_and_current(obj, "longitude")
+    return {(previous_latitude, previous_longitude), (latitude, longitude)}
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    pass
+
+# active_history loads the old value before it is overwritten, so a row moved
+# to another street/light/position/ward also refreshes the one it left.
+for column in (
+    models.StreetLight.street_id, models.StreetLight.latitude, models.StreetLight.longitude,
+    models.StreetLight.ward, models.Street.ward,
+):
+    event.listen(column, "set", _keep_previous_value, active_history=True)
+for child_model in LIGHT_CHILD_MODELS:
+    event.listen(child_model.street_light_id, "set", _keep_previous_value, active_history=True)
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    street_ids, light_ids, positions = set(), set(), set()
+    dirty = (obj for obj in session.dirty if session.is_modified(obj))
+    for obj in chain(session.new, dirty, session.deleted):
+        if isinstance(obj, models.Street):
+            street_ids.add(obj.id)
+        elif isinstance(obj, models.StreetLight):
+            light_ids.add(obj.id)
+            street_ids.update(_attribute_values(obj, "street_id"))
+            positions.update(_light_positions(obj))
+        elif isinstance(obj, LIGHT_CHILD_MODELS):
+            light_ids.update(_attribute_values(obj, "street_light_id"))
+    if street_ids or light_ids:
+        mark_changed(session, street_ids, light_ids, positions)
+
+@event.listens_for(Session, "before_commit")
+def _run_commit_hooks(session):
+    session.flush()
+    if _SESSION_KEY not in session.info:
+        return
+    pending = session.info[_SESSION_KEY]
+    if pending["light_ids"]:
+        rows = session.query(models.StreetLight.street_id)\
+            .filter(models.StreetLight.id.in_(pending["light_ids"]))\
+            .distinct()\
+            .all()
+        pending["street_ids"].update(street_id for (street_id,) in rows if street_id is not None)
+    run_commit_hooks(session, pending["street_ids"], pending["light_ids"])
+    # Delivered with this transaction's trigger notifications, so listening
+    # workers know its rollups are current and only evict.
+    session.execute(
+        text("SELECT pg_notify(:channel, json_build_object('refreshed_xid', txid_current())::text)"),
+        {"channel": models.STREET_CHANGES_CHANNEL}
+    )
+    # Looked up here, inside the transaction, so invalidation listeners need no queries.
+    pending["positions"].update(changed_positions(session, pending["street_ids"], pending["light_ids"]))
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed(session):
+    pending = session.info.pop(_SESSION_KEY, None)
+    if pending:
+        notify_invalidated(pending["street_ids"], pending["light_ids"], pending["positions"])
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,128 @@
+from typing import Iterable
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.spatial import CLUSTER_CELL_BITS, MAX_CLUSTER_ZOOM, MAX_MERCATOR_LATITUDE, mercator_cell
+from app.db import SessionLocal
+from app.models import models
+from app.schemas import schemas
+from app.services.change_tracking import LIGHT_CLUSTER_LOCK, lock_rollup_rows, register_commit_hook
+
+CLUSTERS_TABLE = models.LightCluster.__tablename__
+MEMBERS_TABLE = models.LightClusterMember.__tablename__
+UNKNOWN_STATUS = "Unknown"
+
+# Cell arithmetic is done in SQL only, so incremental updates and full
+# rebuilds always agree on which cell a coordinate falls into.
+_CELLS = f"power(2, zooms.zoom + {CLUSTER_CELL_BITS})"
+_CELL_X = f"LEAST(GREATEST(floor((m.longitude + 180) / 360 * {_CELLS}), 0), {_CELLS} - 1)::int"
+_LATITUDE = f"radians(LEAST(GREATEST(m.latitude, -{MAX_MERCATOR_LATITUDE}), {MAX_MERCATOR_LATITUDE}))"
+_CELL_Y = f"LEAST(GREATEST(floor((1 - asinh(tan({_LATITUDE})) / pi()) / 2 * {_CELLS}), 0), {_CELLS} - 1)::int"
+
+def _cluster_delta_sql(sign: str, member_filter: str) -> str:
+    return (
+        f"INSERT INTO {CLUSTERS_TABLE} "
+        f"(zoom, cell_x, cell_y, status, light_count, latitude_sum, longitude_sum) "
+        f"SELECT zooms.zoom, {_CELL_X}, {_CELL_Y}, m.status, "
+        f"{sign}count(*), {sign}sum(m.latitude), {sign}sum(m.longitude) "
+        f"FROM {MEMBERS_TABLE} m CROSS JOIN generate_series(0, {MAX_CLUSTER_ZOOM}) AS zooms(zoom) "
+        f"{member_filter} "
+        f"GROUP BY 1, 2, 3, 4 "
+        f"ON CONFLICT (zoom, cell_x, cell_y, status) DO UPDATE SET "
+        f"light_count = {CLUSTERS_TABLE}.light_count + excluded.light_count, "
+        f"latitude_sum = {CLUSTERS_TABLE}.latitude_sum + excluded.latitude_sum, "
+        f"longitude_sum = {CLUSTERS_TABLE}.longitude_sum + excluded.longitude_sum"
+    )
+
+def _load_members_sql(light_filter: str) -> str:
+    return (
+        f"INSERT INTO {MEMBERS_TABLE} (street_light_id, latitude, longitude, status) "
+        f"SELECT l.id, l.latitude, l.longitude, COALESCE(s.current_status, '{UNKNOWN_STATUS}') "
+        f"FROM street_lights l "
+        f"LEFT JOIN LATERAL ("
+        f"SELECT current_status FROM operational_status "
+        f"WHERE street_light_id = l.id ORDER BY id DESC LIMIT 1"
+        f") s ON true "
+        f"{light_filter}"
+    )
+
+def update_light_clusters(db: Session, light_ids: Iterable[int]):
+    """Move the given lights' contributions from their previous cluster cells to their current ones.
+
+    The lights' member rows are the contributions to subtract, so they are
+    locked before being read; two concurrent updates of a light would
+    otherwise both subtract the same previous contribution.
+    """
+    light_ids = list(light_ids)
+    if not light_ids:
+        return
+    lock_rollup_rows(db, LIGHT_CLUSTER_LOCK, light_ids)
+    params = {"light_ids": light_ids}
+    db.execute(text(_cluster_delta_sql("-", "WHERE m.street_light_id = ANY(:light_ids)")), params)
+    db.execute(text(
+        f"DELETE FROM {CLUSTERS_TABLE} c "
+        f"USING {MEMBERS_TABLE} m CROSS JOIN generate_series(0, {MAX_CLUSTER_ZOOM}) AS zooms(zoom) "
+        f"WHERE m.street_light_id = ANY(:light_ids) AND c.light_count <= 0 "
+        f"AND c.zoom = zooms.zoom AND c.cell_x = {_CELL_X} AND c.cell_y = {_CELL_Y} AND c.status = m.status"
+    ), params)
+    db.execute(text(f"DELETE FROM {MEMBERS_TABLE} WHERE street_light_id = ANY(:light_ids)"), params)
+    db.execute(text(_load_members_sql("WHERE l.id = ANY(:light_ids)")), params)
+    db.execute(text(_cluster_delta_sql("", "WHERE m.street_light_id = ANY(:light_ids)")), params)
+
+@register_commit_hook
+def _update_changed_lights(session: Session, street_ids, light_ids):
+    update_light_clusters(session, light_ids)
+
+def rebuild_light_clusters(db: Session):
+    """Recompute every cluster from scratch; repair path for raw-SQL loads."""
+    lock_rollup_rows(db, LIGHT_CLUSTER_LOCK)
+    db.execute(text(f"TRUNCATE {CLUSTERS_TABLE}, {MEMBERS_TABLE}"))
+    db.execute(text(_load_members_sql("")))
+    db.execute(text(_cluster_delta_sql("", "")))
+
+def repair_light_clusters():
+    db = SessionLocal()
+    try:
+        rebuild_light_clusters(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def get_clusters(
+    db: Session,
+    zoom: int,
+    min_latitude: float,
+    min_longitude: float,
+    max_latitude: float,
+    max_longitude: float,
+) -> schemas.ClusterResponse:
+    zoom = min(zoom, MAX_CLUSTER_ZOOM)
+    min_x, min_y = mercator_cell(max_latitude, min_longitude, zoom)
+    max_x, max_y = mercator_cell(min_latitude, max_longitude, zoom)
+    rows = db.execute(text(
+        f"SELECT sum(light_count) AS count, "
+        f"sum(latitude_sum) / sum(light_count) AS latitude, "
+        f"sum(longitude_sum) / sum(light_count) AS longitude, "
+        f"json_object_agg(status, light_count) AS status_counts "
+        f"FROM {CLUSTERS_TABLE} "
+        f"WHERE zoom = :zoom AND cell_x BETWEEN :min_x AND :max_x "
+        f"AND cell_y BETWEEN :min_y AND :max_y AND light_count > 0 "
+        f"GROUP BY cell_x, cell_y"
+    ), {"zoom": zoom, "min_x": min_x, "max_x": max_x, "min_y": min_y, "max_y": max_y}).all()
+    return schemas.ClusterResponse(
+        zoom=zoom,
+        clusters=[
+            schemas.LightCluster(
+                latitude=row.latitude,
+                longitude=row.longitude,
+                count=row.count,
+                status_counts=row.status_counts
+            )
+            for row in rows
+        ]
+    )
+
+if __name__ == "__main__":
+    repair_light_clusters()
@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import Select, literal_column, select, tuple_
+from app.models import models
+
+FAULT_PAGE_SIZE = 1000
+MAX_FAULT_PAGE_SIZE = 10000
+# Rows fetched per round trip from the server-side cursor when streaming.
+FAULT_STREAM_CHUNK = 5000
+
+def encode_fault_cursor(operation: models.StreetLightOperation) -> str:
+    return f"{operation.timestamp.isoformat()}_{operation.id}"
+
+def decode_fault_cursor(cursor: str) -> Tuple[datetime, int]:
+    """The ``(timestamp, id)`` position a cursor points past; raises ValueError if malformed."""
+    timestamp, separator, operation_id = cursor.rpartition("_")
+    if not separator:
+        raise ValueError(f"Malformed cursor {cursor!r}")
+    return datetime.fromisoformat(timestamp), int(operation_id)
+
+def fault_query(
+    street_id: Optional[int] = None,
+    ward: Optional[str] = None,
+    fault_type: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> Select:
+    """Faulty readings in ``(timestamp, id)`` order, resuming after the ``after`` position.
+
+    ``fault_type <> 0`` is always applied, as a literal rather than a bind
+    parameter, so that prepared (generic) plans can still use the partial
+    index on faulty rows.
+    """
+    operation = models.StreetLightOperation
+    query = select(operation).where(operation.fault_type != literal_column("0"))
+    if fault_type is not None:
+        query = query.where(operation.fault_type == fault_type)
+    if street_id is not None or ward is not None:
+        lights = select(models.StreetLight.id)
+        if street_id is not None:
+            lights = lights.where(models.StreetLight.street_id == street_id)
+        if ward is not None:
+            lights = lights.where(models.StreetLight.ward == ward)
+        query = query.where(operation.street_light_id.in_(lights))
+    if start:
+        query = query.where(operation.timestamp >= start)
+    if end:
+        query = query.where(operation.timestamp < end)
+    if after:
+        query = query.where(tuple_(operation.timestamp, operation.id) > after)
+    return query.order_by(operation.timestamp, operation.id)
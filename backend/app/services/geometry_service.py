@@ -0,0 +1,84 @@
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, List, Set, Tuple
+from sqlalchemy.orm import Session
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models import models
+from app.schemas import schemas
+from app.services.change_tracking import register_invalidation_listener, register_reset_listener
+from app.services.summary_service import get_street_basic_infos
+
+_geometry_cache = LRUCache(settings.street_geometry_cache_size)
+_cache_lock = Lock()
+# Bumped on every invalidation so geometry built from pre-change rows is not cached afterwards.
+_generation = 0
+
+def street_path(street: schemas.StreetBasicInfo) -> List[List[float]]:
+    """The street's polyline as ``[longitude, latitude]`` vertices."""
+    if street.coordinates is None:
+        return []
+    return [
+        [street.coordinates.start.longitude, street.coordinates.start.latitude],
+        [street.coordinates.end.longitude, street.coordinates.end.latitude],
+    ]
+
+def build_street_geometries(db: Session, street_ids: List[int]) -> Dict[int, schemas.StreetGeometry]:
+    """Summary, path and stored light positions for ``street_ids`` in a fixed number of queries.
+
+    Every light has stored coordinates, so positions are never interpolated;
+    a street without lights has none.
+    """
+    streets = get_street_basic_infos(db, street_ids)
+    rows = db.query(
+        models.StreetLight.street_id,
+        models.StreetLight.longitude,
+        models.StreetLight.latitude,
+    ).filter(models.StreetLight.street_id.in_(street_ids))\
+        .order_by(models.StreetLight.street_id, models.StreetLight.id)\
+        .all()
+    positions = defaultdict(list)
+    for street_id, longitude, latitude in rows:
+        positions[street_id].append([longitude, latitude])
+
+    return {
+        street.id: schemas.StreetGeometry(
+            street=street,
+            path=street_path(street),
+            light_positions=positions[street.id]
+        )
+        for street in streets
+    }
+
+def get_street_geometries(db: Session, street_ids: List[int]) -> List[schemas.StreetGeometry]:
+    """Cached geometries for ``street_ids`` in request order; unknown ids are skipped."""
+    street_ids = list(dict.fromkeys(street_ids))
+    cached = {street_id: _geometry_cache.get(street_id) for street_id in street_ids}
+    missing_ids = [street_id for street_id, geometry in cached.items() if geometry is None]
+    if missing_ids:
+        generation = _generation
+        built = build_street_geometries(db, missing_ids)
+        with _cache_lock:
+            if generation == _generation:
+                for street_id, geometry in built.items():
+                    _geometry_cache.set(street_id, geometry)
+        cached.update(built)
+    return [cached[street_id] for street_id in street_ids if cached[street_id] is not None]
+
+@register_invalidation_listener
+def invalidate_street_geometries(street_ids: Set[int], light_ids: Set[int], positions: Set[Tuple[float, float]]):
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        if light_ids and not street_ids:
+            # The owning streets are unknown, so nothing cached can be trusted.
+            _geometry_cache.clear()
+        for street_id in street_ids:
+            _geometry_cache.delete(street_id)
+
+@register_reset_listener
+def clear_street_geometries():
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        _geometry_cache.clear()
@@ -0,0 +1,137 @@
+import json
+import logging
+import select
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import text
+from app.db import SessionLocal, engine
+from app.models.models import STREET_CHANGES_CHANNEL
+from app.services.change_tracking import (
+    CHANGE_REFRESH_LOCK, changed_positions, notify_invalidated, notify_reset, run_commit_hooks
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the stop flag, and before reconnecting after an error.
+POLL_INTERVAL = 1.0
+RECONNECT_DELAY = 5.0
+
+class InvalidationListener:
+    """Refreshes rollups and evicts this worker's caches for changes NOTIFYed by the street change triggers.
+
+    Writes from any process (other workers, scripts, psql) reach every
+    listening worker, so per-worker caches no longer wait for a TTL. Writes
+    from sessions of this app refreshed their rollups in commit hooks and
+    say so with a ``refreshed_xid`` notification; for any other write the
+    listener runs those hooks itself before evicting, so caches are never
+    rebuilt from stale rollups. Bulk loads write without notifying and send
+    one ``reset`` notification instead. The listener holds one connection
+    outside the pool. Notifications sent while it is disconnected are lost,
+    so every reconnect clears the caches outright.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="street-change-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(POLL_INTERVAL * 2)
+            self._thread = None
+
+    def _run(self):
+        missed_changes = False
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                if missed_changes:
+                    notify_reset()
+                    missed_changes = False
+                self._listen(connection)
+            except Exception:
+                logger.exception("Street change listener failed; reconnecting in %s s", RECONNECT_DELAY)
+                missed_changes = True
+                self._stop.wait(RECONNECT_DELAY)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def _connect(self):
+        proxied = engine.raw_connection()
+        connection = proxied.driver_connection
+        # Detached so the pool neither recycles it nor counts it as checked out.
+        proxied.detach()
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {STREET_CHANGES_CHANNEL}")
+        return connection
+
+    def _listen(self, connection):
+        while not self._stop.is_set():
+            if select.select([connection], [], [], POLL_INTERVAL) == ([], [], []):
+                continue
+            connection.poll()
+            payloads = []
+            while connection.notifies:
+                payloads.append(json.loads(connection.notifies.pop(0).payload))
+            self._handle(payloads)
+
+    def _handle(self, payloads: List[dict]):
+        if any("reset" in payload for payload in payloads):
+            notify_reset()
+        refreshed_xids = {payload["refreshed_xid"] for payload in payloads if "refreshed_xid" in payload}
+        street_ids: Set[int] = set()
+        light_ids: Set[int] = set()
+        # Transaction id -> (street ids, light ids) whose rollups nobody refreshed yet.
+        stale: Dict[int, Tuple[Set[int], Set[int]]] = {}
+        for payload in payloads:
+            if "xid" not in payload:
+                continue
+            street_ids.update(payload["street_ids"])
+            light_ids.update(payload["light_ids"])
+            if payload["xid"] not in refreshed_xids:
+                stale_street_ids, stale_light_ids = stale.setdefault(payload["xid"], (set(), set()))
+                stale_street_ids.update(payload["street_ids"])
+                stale_light_ids.update(payload["light_ids"])
+        if street_ids or light_ids:
+            positions = self._refresh(stale, street_ids, light_ids)
+            notify_invalidated(street_ids, light_ids, positions)
+
+    def _refresh(self, stale: Dict[int, Tuple[Set[int], Set[int]]], street_ids: Set[int], light_ids: Set[int]):
+        """Refresh the rollups of ``stale`` writes, then look up the positions to evict.
+
+        Every listening worker gets each notification, but one claims each
+        write and refreshes its rollups; the others wait for that claim to
+        commit instead of repeating the work. Writes are claimed one
+        transaction at a time, so workers never wait on each other's claims.
+        """
+        db = SessionLocal()
+        try:
+            for xid in sorted(stale):
+                params = {"namespace": CHANGE_REFRESH_LOCK, "key": xid & 0x7FFFFFFF}
+                if db.execute(text("SELECT pg_try_advisory_xact_lock(:namespace, :key)"), params).scalar():
+                    run_commit_hooks(db, *stale[xid])
+                else:
+                    db.execute(text("SELECT pg_advisory_xact_lock_shared(:namespace, :key)"), params)
+                db.commit()
+            # Only current positions are known here; tiles at a position a light
+            # moved away from are found through its street instead.
+            positions = changed_positions(db, street_ids, light_ids)
+            db.commit()
+            return positions
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+street_change_listener = InvalidationListener()
@@ -0,0 +1,108 @@
+import logging
+from typing import List, Sequence, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import models
+from app.schemas import schemas
+from app.services.change_tracking import mark_changed
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE of a violated constraint -> message reported for the rejected item.
+INTEGRITY_ERROR_MESSAGES = {
+    "23502": "A required field is missing",
+    "23505": "Street light conflicts with an existing record",
+    "23514": "A field is out of range",
+}
+
+# StreetLightCreate section -> table it is stored in; ``warranties`` is a list.
+LIGHT_SECTIONS = {
+    "installation_detail": models.InstallationDetail,
+    "light_specification": models.LightSpecification,
+    "hardware_information": models.HardwareInformation,
+    "warranties": models.WarrantyInformation,
+    "cost_pricing": models.CostAndPricing,
+    "energy_consumption": models.EnergyConsumption,
+    "operational_status": models.OperationalStatus,
+    "life_cycle_information": models.LifeCycleInformation,
+}
+
+def insert_street_lights(db: Session, lights: Sequence[schemas.StreetLightCreate]) -> List[int]:
+    """Insert lights and their child rows with one multi-row statement per table.
+
+    Returns the new ids in input order. Bypasses the unit of work, so callers
+    must report the rows to ``mark_changed`` once they are kept.
+    """
+    light_ids = db.execute(
+        insert(models.StreetLight).returning(models.StreetLight.id, sort_by_parameter_order=True),
+        [light.dict(exclude=set(LIGHT_SECTIONS)) for light in lights]
+    ).scalars().all()
+
+    for section, model in LIGHT_SECTIONS.items():
+        rows = []
+        for light_id, light in zip(light_ids, lights):
+            value = getattr(light, section)
+            items = value if isinstance(value, list) else [value] if value else []
+            rows.extend({"street_light_id": light_id, **item.dict()} for item in items)
+        if rows:
+            db.execute(insert(model), rows)
+    return light_ids
+
+def _integrity_error_message(light: schemas.StreetLightCreate, exc: IntegrityError) -> str:
+    """Fixed message for a rejected item; the database's own text is only logged."""
+    logger.warning("Street light rejected by the database: %s", exc.orig)
+    code = getattr(exc.orig, "pgcode", None)
+    if code == "23503":
+        # Foreign key: the street was deleted after it was looked up.
+        return f"Street {light.street_id} not found"
+    return INTEGRITY_ERROR_MESSAGES.get(code, "Street light could not be stored")
+
+def create_street_lights(
+    db: Session, lights: Sequence[schemas.StreetLightCreate]
+) -> Tuple[List[Tuple[int, int]], List[Tuple[int, str]]]:
+    """Insert a batch of lights, failing individual items rather than the batch.
+
+    Returns ``(created, errors)`` as ``(position, light_id)`` and
+    ``(position, message)`` pairs. Items naming an unknown street are
+    rejected up front; the rest go in together inside a savepoint, and only
+    if the database still rejects that batch is it retried item by item.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    street_ids = {light.street_id for light in lights if light.street_id is not None}
+    known_street_ids = {
+        street_id for (street_id,) in
+        db.query(models.Street.id).filter(models.Street.id.in_(street_ids)).all()
+    } if street_ids else set()
+
+    errors, pending = [], []
+    for position, light in enumerate(lights):
+        if light.street_id is not None and light.street_id not in known_street_ids:
+            errors.append((position, f"Street {light.street_id} not found"))
+        else:
+            pending.append(position)
+    if not pending:
+        return [], errors
+
+    created = []
+    try:
+        with db.begin_nested():
+            light_ids = insert_street_lights(db, [lights[position] for position in pending])
+        created = list(zip(pending, light_ids))
+    except IntegrityError:
+        for position in pending:
+            try:
+                with db.begin_nested():
+                    (light_id,) = insert_street_lights(db, [lights[position]])
+                created.append((position, light_id))
+            except IntegrityError as exc:
+                errors.append((position, _integrity_error_message(lights[position], exc)))
+
+    mark_changed(
+        db,
+        street_ids={lights[position].street_id for position, _ in created},
+        light_ids=[light_id for _, light_id in created],
+        positions={(lights[position].latitude, lights[position].longitude) for position, _ in created},
+    )
+    errors.sort()
+    return created, errors
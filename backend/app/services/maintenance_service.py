@@ -0,0 +1,86 @@
+from datetime import date
+from typing import Optional, Tuple
+from sqlalchemy import Date, Select, cast, func, literal_column, select, tuple_
+from sqlalchemy.orm import Session
+from app.models import models
+from app.schemas import schemas
+
+MAINTENANCE_PAGE_SIZE = 100
+MAX_MAINTENANCE_PAGE_SIZE = 1000
+MAINTENANCE_COST_RESOLUTIONS = ("week", "month")
+
+def encode_maintenance_cursor(record: models.MaintenanceHistory) -> str:
+    return f"{record.maintenance_date.isoformat()}_{record.id}"
+
+def decode_maintenance_cursor(cursor: str) -> Tuple[date, int]:
+    """The ``(maintenance_date, id)`` position a cursor points past; raises ValueError if malformed."""
+    maintenance_date, separator, record_id = cursor.rpartition("_")
+    if not separator:
+        raise ValueError(f"Malformed cursor {cursor!r}")
+    return date.fromisoformat(maintenance_date), int(record_id)
+
+def _filtered(
+    query: Select,
+    street_id: int,
+    maintenance_type: Optional[str],
+    start: Optional[date],
+    end: Optional[date],
+) -> Select:
+    record = models.MaintenanceHistory
+    lights = select(models.StreetLight.id).where(models.StreetLight.street_id == street_id)
+    query = query.where(record.street_light_id.in_(lights))
+    if maintenance_type is not None:
+        query = query.where(record.maintenance_type == maintenance_type)
+    if start:
+        query = query.where(record.maintenance_date >= start)
+    if end:
+        query = query.where(record.maintenance_date < end)
+    return query
+
+def maintenance_query(
+    street_id: int,
+    maintenance_type: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    after: Optional[Tuple[date, int]] = None,
+) -> Select:
+    """A street's maintenance records newest first, in ``(maintenance_date, id)`` order, resuming after ``after``."""
+    record = models.MaintenanceHistory
+    query = _filtered(select(record), street_id, maintenance_type, start, end)
+    if after:
+        query = query.where(tuple_(record.maintenance_date, record.id) < after)
+    return query.order_by(record.maintenance_date.desc(), record.id.desc())
+
+def get_maintenance_cost_series(
+    db: Session,
+    street_id: int,
+    resolution: str = "month",
+    maintenance_type: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> schemas.MaintenanceCostSeries:
+    """Record count and cost of a street's maintenance per week or month, oldest bucket first.
+
+    Buckets without maintenance are omitted. Weeks start on Monday.
+    """
+    if resolution not in MAINTENANCE_COST_RESOLUTIONS:
+        raise ValueError(f"Unsupported resolution {resolution!r}")
+    record = models.MaintenanceHistory
+    # The unit is inlined so the grouped expression is identical under server-side binding.
+    bucket = cast(func.date_trunc(literal_column(f"'{resolution}'"), record.maintenance_date), Date)
+    rows = db.execute(_filtered(
+        select(bucket, func.count(record.id), func.coalesce(func.sum(record.cost), 0)),
+        street_id, maintenance_type, start, end
+    ).group_by(bucket).order_by(bucket)).all()
+    points = [
+        schemas.MaintenanceCostPoint(bucket=bucket_start, records=records, cost=cost)
+        for bucket_start, records, cost in rows
+    ]
+    return schemas.MaintenanceCostSeries(
+        resolution=resolution,
+        start=start,
+        end=end,
+        total_records=sum(point.records for point in points),
+        total_cost=sum(point.cost for point in points),
+        points=points
+    )
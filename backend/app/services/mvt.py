@@ -0,0 +1,103 @@
+"""Minimal Mapbox Vector Tile (v2.1) protobuf encoder.
+
+Only what the tile endpoint needs: point and linestring features with
+scalar properties, already projected to integer tile coordinates.
+"""
+import struct
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+POINT = 1
+LINESTRING = 2
+
+_MOVE_TO = 1
+_LINE_TO = 2
+_VARINT = 0
+_FIXED64 = 1
+_LENGTH_DELIMITED = 2
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+def _length_delimited(field: int, payload: bytes) -> bytes:
+    return _key(field, _LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+def _packed(field: int, values: Iterable[int]) -> bytes:
+    return _length_delimited(field, b"".join(_varint(value) for value in values))
+
+def _command(command: int, count: int) -> int:
+    return (command & 0x7) | (count << 3)
+
+def _encode_geometry(points: Sequence[Tuple[int, int]]) -> List[int]:
+    commands = [_command(_MOVE_TO, 1)]
+    cursor_x = cursor_y = 0
+    for index, (x, y) in enumerate(points):
+        if index == 1:
+            commands.append(_command(_LINE_TO, len(points) - 1))
+        commands += [_zigzag(x - cursor_x), _zigzag(y - cursor_y)]
+        cursor_x, cursor_y = x, y
+    return commands
+
+def _encode_value(value) -> bytes:
+    if isinstance(value, bool):
+        return _key(7, _VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        return _key(6, _VARINT) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _key(3, _FIXED64) + struct.pack("<d", value)
+    return _length_delimited(1, str(value).encode("utf-8"))
+
+def encode_layer(name: str, features: Iterable[dict], extent: int = 4096) -> bytes:
+    """Encode one layer.
+
+    Each feature is a dict with ``id`` (optional int), ``type`` (POINT or
+    LINESTRING), ``geometry`` (list of (x, y) tile coordinates) and
+    ``properties`` (dict of scalars; None values are skipped).
+    """
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, object], int] = {}
+    encoded_features = []
+    for feature in features:
+        tags = []
+        for key, value in feature.get("properties", {}).items():
+            if value is None:
+                continue
+            key_index = keys.setdefault(key, len(keys))
+            value_index = values.setdefault((type(value), value), len(values))
+            tags += [key_index, value_index]
+        body = b""
+        feature_id: Optional[int] = feature.get("id")
+        if feature_id is not None:
+            body += _key(1, _VARINT) + _varint(feature_id)
+        if tags:
+            body += _packed(2, tags)
+        body += _key(3, _VARINT) + _varint(feature["type"])
+        body += _packed(4, _encode_geometry(feature["geometry"]))
+        encoded_features.append(_length_delimited(2, body))
+
+    layer = _key(15, _VARINT) + _varint(2)
+    layer += _length_delimited(1, name.encode("utf-8"))
+    layer += b"".join(encoded_features)
+    layer += b"".join(_length_delimited(3, key.encode("utf-8")) for key in keys)
+    layer += b"".join(_length_delimited(4, _encode_value(value)) for _, value in values)
+    layer += _key(5, _VARINT) + _varint(extent)
+    return layer
+
+def encode_tile(layers: Dict[str, Iterable[dict]], extent: int = 4096) -> bytes:
+    return b"".join(
+        _length_delimited(3, encode_layer(name, features, extent))
+        for name, features in layers.items()
+    )
@@ -0,0 +1,296 @@
+import csv
+import io
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Sequence
+import psycopg2
+from sqlalchemy import func, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import SessionLocal
+from app.models import models
+from app.schemas import schemas
+
+OPERATIONS_TABLE = models.StreetLightOperation.__tablename__
+DEFAULT_PARTITION = f"{OPERATIONS_TABLE}_default"
+# Monthly partitions are created this many months before they are needed.
+PARTITION_MONTHS_AHEAD = 2
+# pg_advisory_xact_lock key held while partitions are created.
+PARTITION_LOCK_KEY = 5301
+STAGING_TABLE = "street_light_operations_staging"
+LIGHT_ROLLUPS_TABLE = models.LightOperationRollup.__tablename__
+STREET_ROLLUPS_TABLE = models.StreetOperationRollup.__tablename__
+ROLLUP_RESOLUTIONS = ("hour", "day")
+ROLLUP_METRICS = {
+    "power": "power_consumption",
+    "voltage": "voltage_levels",
+    "temperature": "temperature",
+}
+RESOLUTION_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+MAX_SERIES_POINTS = 744
+COPY_CHUNK_SIZE = 50000
+COPY_COLUMNS = (
+    "street_light_id",
+    "timestamp",
+    "power_consumption",
+    "voltage_levels",
+    "current_fluctuations",
+    "temperature",
+    "environmental_conditions",
+    "current_fluctuations_env",
+    "fault_type",
+)
+
+def _month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{OPERATIONS_TABLE}_p{month:%Y_%m}"
+
+def create_operation_partition(db: Session, month: date):
+    """Create and attach the partition for ``month``, moving its rows out of the default partition.
+
+    The partition is filled while detached and then attached, which only
+    needs a SHARE UPDATE EXCLUSIVE lock on the parent table, so ingest keeps
+    running; attaching fails if the default partition still held rows for it.
+    """
+    name = partition_name(month)
+    params = {"start": month, "end": _next_month(month)}
+    db.execute(text(f"CREATE TABLE {name} (LIKE {OPERATIONS_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(
+        f"WITH moved AS ("
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end RETURNING *"
+        f") INSERT INTO {name} SELECT * FROM moved"
+    ), params)
+    db.execute(text(
+        f"ALTER TABLE {OPERATIONS_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{params['start'].isoformat()}') TO ('{params['end'].isoformat()}')"
+    ))
+
+def ensure_operation_partitions(db: Session, months_ahead: int = PARTITION_MONTHS_AHEAD, today: Optional[date] = None):
+    """Create missing monthly partitions: this month's, the next ``months_ahead`` and those of readings in the default partition."""
+    month = _month_start(today or date.today())
+    months = {month}
+    for _ in range(months_ahead):
+        month = _next_month(month)
+        months.add(month)
+    months.update(_month_start(timestamp) for (timestamp,) in db.execute(text(
+        f"SELECT DISTINCT date_trunc('month', timestamp) FROM {DEFAULT_PARTITION}"
+    )))
+    for month in sorted(months):
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": partition_name(month)}).scalar() is None:
+            create_operation_partition(db, month)
+
+def maintain_operation_partitions():
+    """Startup and periodic job: create upcoming partitions ahead of ingest, in a transaction of its own.
+
+    Ingest never creates partitions; readings for a month without one land
+    in the default partition until this job moves them.
+    """
+    db = SessionLocal()
+    try:
+        # Workers start together; the first one creates the partitions.
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+        ensure_operation_partitions(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _rollup_upsert_sql(target: str, key_column: str, source: str, resolution: str) -> str:
+    metric_columns, aggregates, merges = [], [], []
+    for metric, column in ROLLUP_METRICS.items():
+        metric_columns += [f"{metric}_min", f"{metric}_max", f"{metric}_sum"]
+        aggregates += [f"min({column})", f"max({column})", f"sum({column})"]
+        merges += [
+            f"{metric}_min = LEAST({target}.{metric}_min, excluded.{metric}_min)",
+            f"{metric}_max = GREATEST({target}.{metric}_max, excluded.{metric}_max)",
+            f"{metric}_sum = COALESCE({target}.{metric}_sum, 0) + COALESCE(excluded.{metric}_sum, 0)",
+        ]
+    return (
+        f"INSERT INTO {target} (resolution, bucket, {key_column}, samples, "
+        f"{', '.join(metric_columns)}, fault_count) "
+        f"SELECT '{resolution}', date_trunc('{resolution}', timestamp), {key_column}, count(*), "
+        f"{', '.join(aggregates)}, count(*) FILTER (WHERE fault_type <> 0) "
+        f"FROM {source} "
+        f"GROUP BY 2, 3 "
+        f"ON CONFLICT (resolution, bucket, {key_column}) DO UPDATE SET "
+        f"samples = {target}.samples + excluded.samples, "
+        f"{', '.join(merges)}, "
+        f"fault_count = {target}.fault_count + excluded.fault_count"
+    )
+
+def _rollup_statements(source: str, condition: str = "") -> List[str]:
+    """Upserts folding the operations in ``source`` into every rollup table and resolution."""
+    where = f" WHERE {condition}" if condition else ""
+    light_source = f"{source}{where}"
+    # Readings of lights without a street only count towards their light's rollups.
+    street_source = (
+        f"{source} JOIN street_lights ON street_lights.id = street_light_id "
+        f"WHERE street_lights.street_id IS NOT NULL{f' AND {condition}' if condition else ''}"
+    )
+    statements = []
+    for resolution in ROLLUP_RESOLUTIONS:
+        statements.append(_rollup_upsert_sql(LIGHT_ROLLUPS_TABLE, "street_light_id", light_source, resolution))
+        statements.append(_rollup_upsert_sql(STREET_ROLLUPS_TABLE, "street_id", street_source, resolution))
+    return statements
+
+def _copy_rows(cursor, rows: Sequence[schemas.StreetLightOperationCreate]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for operation in rows:
+        writer.writerow([getattr(operation, column) for column in COPY_COLUMNS])
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {STAGING_TABLE} ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+
+def ingest_operations(db: Session, operations: List[schemas.StreetLightOperationCreate]) -> int:
+    """Append telemetry readings and fold them into the hourly/daily rollups.
+
+    Each chunk of ``COPY_CHUNK_SIZE`` rows is COPYed into a temporary staging
+    table, moved into the partitioned table with one INSERT ... SELECT and
+    aggregated into the rollup tables from the same staging rows, so rollups
+    are never re-scanned from raw telemetry. Runs inside the caller's
+    transaction; the caller commits.
+    """
+    if not operations:
+        return 0
+    columns = ", ".join(COPY_COLUMNS)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} ON COMMIT DROP AS "
+            f"SELECT {columns} FROM {OPERATIONS_TABLE} WITH NO DATA"
+        )
+        for offset in range(0, len(operations), COPY_CHUNK_SIZE):
+            _copy_rows(cursor, operations[offset:offset + COPY_CHUNK_SIZE])
+            cursor.execute(
+                f"INSERT INTO {OPERATIONS_TABLE} ({columns}) SELECT {columns} FROM {STAGING_TABLE}"
+            )
+            for statement in _rollup_statements(STAGING_TABLE):
+                cursor.execute(statement)
+            cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+    except psycopg2.IntegrityError as exc:
+        raise IntegrityError(f"COPY {OPERATIONS_TABLE}", None, exc) from exc
+    finally:
+        cursor.close()
+    return len(operations)
+
+def rebuild_operation_rollups(db: Session, start: datetime, end: datetime):
+    """Recompute rollups for whole days between ``start`` and ``end`` from raw telemetry.
+
+    Repair path for readings written outside ``ingest_operations``.
+    """
+    window_start = datetime.combine(start.date(), time.min)
+    window_end = datetime.combine(end.date(), time.min)
+    if window_end < end:
+        window_end += timedelta(days=1)
+    params = {"start": window_start, "end": window_end}
+    # Ingest waits here instead of folding a chunk into buckets being rebuilt.
+    db.execute(text(f"LOCK TABLE {LIGHT_ROLLUPS_TABLE}, {STREET_ROLLUPS_TABLE} IN EXCLUSIVE MODE"))
+    for table in (LIGHT_ROLLUPS_TABLE, STREET_ROLLUPS_TABLE):
+        db.execute(text(f"DELETE FROM {table} WHERE bucket >= :start AND bucket < :end"), params)
+    condition = "timestamp >= :start AND timestamp < :end"
+    for statement in _rollup_statements(OPERATIONS_TABLE, condition):
+        db.execute(text(statement), params)
+
+def repair_operation_rollups():
+    """Periodic job: rebuild the rollups of the last ``settings.operation_rollup_repair_days`` days."""
+    end = datetime.now()
+    db = SessionLocal()
+    try:
+        rebuild_operation_rollups(db, end - timedelta(days=settings.operation_rollup_repair_days), end)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def choose_resolution(start: datetime, end: datetime) -> str:
+    """Finest resolution that keeps the series within ``MAX_SERIES_POINTS`` buckets."""
+    span = (end - start).total_seconds()
+    for resolution in ("minute", "hour"):
+        if span / RESOLUTION_SECONDS[resolution] <= MAX_SERIES_POINTS:
+            return resolution
+    return "day"
+
+def _raw_series_query(db: Session, street_light_id: Optional[int], street_id: Optional[int]):
+    operation = models.StreetLightOperation
+    bucket = func.date_trunc("minute", operation.timestamp).label("bucket")
+    query = db.query(
+        bucket,
+        func.count().label("samples"),
+        func.min(operation.power_consumption).label("power_min"),
+        func.max(operation.power_consumption).label("power_max"),
+        func.avg(operation.power_consumption).label("power_avg"),
+        func.sum(operation.power_consumption).label("power_sum"),
+        func.min(operation.voltage_levels).label("voltage_min"),
+        func.max(operation.voltage_levels).label("voltage_max"),
+        func.avg(operation.voltage_levels).label("voltage_avg"),
+        func.min(operation.temperature).label("temperature_min"),
+        func.max(operation.temperature).label("temperature_max"),
+        func.avg(operation.temperature).label("temperature_avg"),
+        func.count().filter(operation.fault_type != 0).label("fault_count"),
+    )
+    if street_id is not None:
+        query = query.join(models.StreetLight, models.StreetLight.id == operation.street_light_id)\
+            .filter(models.StreetLight.street_id == street_id)
+    else:
+        query = query.filter(operation.street_light_id == street_light_id)
+    return query.group_by(bucket), operation.timestamp, bucket
+
+def _rollup_series_query(db: Session, resolution: str, street_light_id: Optional[int], street_id: Optional[int]):
+    if street_id is not None:
+        rollup = models.StreetOperationRollup
+        key_filter = rollup.street_id == street_id
+    else:
+        rollup = models.LightOperationRollup
+        key_filter = rollup.street_light_id == street_light_id
+    query = db.query(
+        rollup.bucket,
+        rollup.samples,
+        rollup.power_min,
+        rollup.power_max,
+        (rollup.power_sum / rollup.samples).label("power_avg"),
+        rollup.power_sum,
+        rollup.voltage_min,
+        rollup.voltage_max,
+        (rollup.voltage_sum / rollup.samples).label("voltage_avg"),
+        rollup.temperature_min,
+        rollup.temperature_max,
+        (rollup.temperature_sum / rollup.samples).label("temperature_avg"),
+        rollup.fault_count,
+    ).filter(rollup.resolution == resolution, key_filter)
+    return query, rollup.bucket, rollup.bucket
+
+def get_operation_series(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    resolution: Optional[str] = None,
+    street_light_id: Optional[int] = None,
+    street_id: Optional[int] = None,
+) -> schemas.OperationSeries:
+    """Telemetry series for one light or one street, read from the coarsest table that fits."""
+    resolution = resolution or choose_resolution(start, end)
+    if resolution == "minute":
+        query, time_column, bucket = _raw_series_query(db, street_light_id, street_id)
+        query = query.filter(time_column >= start, time_column < end)
+    else:
+        query, time_column, bucket = _rollup_series_query(db, resolution, street_light_id, street_id)
+        query = query.filter(time_column >= func.date_trunc(resolution, start), time_column < end)
+    rows = query.order_by(bucket).all()
+    return schemas.OperationSeries(
+        resolution=resolution,
+        start=start,
+        end=end,
+        points=[schemas.OperationSeriesPoint(**row._mapping) for row in rows]
+    )
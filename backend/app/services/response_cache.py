@@ -0,0 +1,101 @@
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Optional, Set, Tuple
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import LRUCache, create_cache_backend
+from app.core.config import settings
+from app.db import AsyncSessionLocal, ReadAsyncSessionLocal
+from app.services.change_tracking import register_invalidation_listener, register_reset_listener
+
+# The street list is cached as a view of no particular street.
+LIST_VIEW = "list"
+
+# Bumped by invalidate_all() for changes that are not tied to specific streets.
+GENERATION_KEY = "streetsmart:version:generation"
+LIST_VERSION_KEY = "streetsmart:version:streets"
+
+# Only worth tracking recent bumps when reads can come from a lagging replica.
+_backend = create_cache_backend(
+    settings.response_cache_url, settings.replica_max_lag if settings.read_replica_url else 0
+)
+# street_id -> {view: (etag, body, expires_at)}; one slot per street so an
+# invalidation drops every view of it, including each detailed section set.
+_local = LRUCache(settings.response_cache_size)
+
+def _street_version_key(street_id: int) -> str:
+    return f"streetsmart:version:street:{street_id}"
+
+async def current_etag(street_id: Optional[int]) -> Tuple[str, bool]:
+    """The ETag of a street's (or the list's) responses, and whether it changed recently."""
+    version_key = LIST_VERSION_KEY if street_id is None else _street_version_key(street_id)
+    (generation, version), recent = await _backend.get_versions([GENERATION_KEY, version_key])
+    return f'"{_backend.epoch}-{generation}-{version}"', recent
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+@lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+async def cached_response(
+    request: Request,
+    view: str,
+    street_id: Optional[int],
+    response_type: Any,
+    build: Callable[[AsyncSession], Awaitable[Any]],
+) -> Response:
+    """Serve ``view`` for a street (or the street list) from cache, honouring If-None-Match.
+
+    ``build`` gets a session and returns the response object, or its
+    already encoded JSON body as bytes. The ETag is read before ``build``
+    runs, so a body is never stored under a version older than the data it
+    was built from. Within ``settings.replica_max_lag`` of an invalidation
+    the session is on the primary, since the replica may not have the
+    change yet.
+    """
+    etag, recent = await current_etag(street_id)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    views = _local.get(street_id, {})
+    cached = views.get(view)
+    if cached and cached[0] == etag and cached[2] > time.monotonic():
+        body = cached[1]
+    else:
+        shared_key = f"streetsmart:response:{view}:{street_id}:{etag}"
+        body = await _backend.get(shared_key)
+        if body is None:
+            async with (AsyncSessionLocal if recent else ReadAsyncSessionLocal)() as db:
+                built = await build(db)
+            body = built if isinstance(built, bytes) else _adapter(response_type).dump_json(built)
+            await _backend.set(shared_key, body, settings.response_cache_ttl)
+        # Replaced rather than updated in place, since listeners drop slots from other threads.
+        expires_at = time.monotonic() + settings.response_cache_ttl
+        _local.set(street_id, {**_local.get(street_id, {}), view: (etag, body, expires_at)})
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@register_reset_listener
+def invalidate_all():
+    """Retire every cached response, e.g. after time-windowed figures were recomputed."""
+    _backend.bump_versions([GENERATION_KEY])
+    _local.clear()
+
+@register_invalidation_listener
+def invalidate_street_responses(street_ids: Set[int], light_ids: Set[int], positions: Set[Tuple[float, float]]):
+    if light_ids and not street_ids:
+        invalidate_all()
+        return
+    if not street_ids:
+        return
+    _backend.bump_versions([_street_version_key(street_id) for street_id in street_ids] + [LIST_VERSION_KEY])
+    for street_id in street_ids:
+        _local.delete(street_id)
+    _local.delete(None)
@@ -0,0 +1,78 @@
+from typing import Iterable, List, Tuple
+from sqlalchemy import and_, or_, true
+from sqlalchemy.orm import Session
+from app.core.spatial import grid_cell_ranges
+from app.models import models
+from app.schemas import schemas
+from app.services.street_service import build_street_location, latest_per_light
+
+def bbox_filter(cell_column, latitude_column, longitude_column, min_latitude, min_longitude, max_latitude, max_longitude):
+    """Bounding-box predicate that lets Postgres range-scan the grid cell index."""
+    exact = and_(
+        latitude_column.between(min_latitude, max_latitude),
+        longitude_column.between(min_longitude, max_longitude),
+    )
+    ranges = grid_cell_ranges(min_latitude, min_longitude, max_latitude, max_longitude)
+    if ranges is None:
+        return exact
+    return and_(or_(*(cell_column.between(first, last) for first, last in ranges)), exact)
+
+def streets_in_bbox(db: Session, bbox: Tuple[float, float, float, float], street_ids: Iterable[int] = ()) -> List[models.Street]:
+    """Streets with an endpoint inside ``bbox`` plus any of ``street_ids``."""
+    return db.query(models.Street).filter(or_(
+        models.Street.id.in_(list(street_ids)),
+        bbox_filter(models.Street.start_grid_cell, models.Street.start_latitude, models.Street.start_longitude, *bbox),
+        bbox_filter(models.Street.end_grid_cell, models.Street.end_latitude, models.Street.end_longitude, *bbox),
+    )).all()
+
+def get_viewport(
+    db: Session,
+    min_latitude: float,
+    min_longitude: float,
+    max_latitude: float,
+    max_longitude: float,
+    limit: int,
+) -> schemas.ViewportResponse:
+    bbox = (min_latitude, min_longitude, max_latitude, max_longitude)
+    status = latest_per_light(models.OperationalStatus, models.OperationalStatus.current_status)
+    light_rows = db.query(
+        models.StreetLight.id,
+        models.StreetLight.street_id,
+        models.StreetLight.latitude,
+        models.StreetLight.longitude,
+        status.c.current_status,
+    ).select_from(models.StreetLight)\
+        .outerjoin(status, true())\
+        .filter(bbox_filter(
+            models.StreetLight.grid_cell, models.StreetLight.latitude, models.StreetLight.longitude, *bbox
+        ))\
+        .limit(limit + 1)\
+        .all()
+    truncated = len(light_rows) > limit
+    light_rows = light_rows[:limit]
+
+    street_ids = {row.street_id for row in light_rows if row.street_id is not None}
+    streets = streets_in_bbox(db, bbox, street_ids)
+
+    return schemas.ViewportResponse(
+        lights=[
+            schemas.ViewportLight(
+                id=row.id,
+                street_id=row.street_id,
+                latitude=row.latitude,
+                longitude=row.longitude,
+                status=row.current_status
+            )
+            for row in light_rows
+        ],
+        streets=[
+            schemas.ViewportStreet(
+                id=street.id,
+                street_name=street.name,
+                ward=street.ward,
+                coordinates=build_street_location(street)
+            )
+            for street in streets
+        ],
+        truncated=truncated
+    )
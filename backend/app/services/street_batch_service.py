@@ -0,0 +1,70 @@
+from threading import Lock
+from typing import List, Optional, Sequence, Set, Tuple
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from app.core import fast_json
+from app.core.cache import SingleFlight
+from app.core.config import settings
+from app.db import ReadAsyncSessionLocal
+from app.schemas import schemas
+from app.services.change_tracking import register_invalidation_listener, register_reset_listener
+from app.services.street_service import build_street_detailed_infos, build_street_detailed_payloads
+from app.services.summary_service import get_street_basic_infos
+
+MAX_BATCH_STREETS = 500
+
+# View -> serializer for the list of streets it returns.
+BATCH_VIEWS = {
+    "basic": TypeAdapter(List[schemas.StreetBasicInfo]),
+    "detailed": TypeAdapter(List[schemas.StreetDetailedInfo]),
+}
+
+_loads = SingleFlight()
+_lock = Lock()
+# Bumped on every invalidation so requests made after a write never join a load started before it.
+_generation = 0
+
+def build_street_batch(
+    db: Session, view: str, street_ids: List[int], sections: Optional[Sequence[str]] = None
+) -> list:
+    """``view`` of each street in ``street_ids`` in request order; unknown ids are skipped.
+
+    ``sections`` limits the detailed view as for ``build_street_detailed_infos``.
+    With ``settings.fast_json`` detailed streets are plain payloads instead.
+    """
+    if view == "basic":
+        built = {street.id: street for street in get_street_basic_infos(db, street_ids)}
+    elif settings.fast_json:
+        built = build_street_detailed_payloads(db, street_ids, sections)
+    else:
+        built = build_street_detailed_infos(db, street_ids, sections)
+    return [built[street_id] for street_id in street_ids if street_id in built]
+
+async def load_street_batch(view: str, street_ids: List[int], sections: Optional[Tuple[str, ...]] = None) -> bytes:
+    """Serialized ``view`` of ``street_ids``, loaded once for all identical concurrent requests in this worker.
+
+    The load runs in its own session rather than the first caller's, since
+    it may outlive that request when its client disconnects.
+    """
+    street_ids = list(dict.fromkeys(street_ids))
+
+    async def load():
+        async with ReadAsyncSessionLocal() as db:
+            streets = await db.run_sync(build_street_batch, view, street_ids, sections)
+        if settings.fast_json and view == "detailed":
+            return fast_json.dumps(streets)
+        return BATCH_VIEWS[view].dump_json(streets)
+
+    return await _loads.do((view, tuple(street_ids), sections, _generation), load)
+
+@register_invalidation_listener
+def invalidate_street_batches(street_ids: Set[int], light_ids: Set[int], positions: Set[Tuple[float, float]]):
+    global _generation
+    with _lock:
+        _generation += 1
+
+@register_reset_listener
+def reset_street_batches():
+    global _generation
+    with _lock:
+        _generation += 1
@@ -1,11 +1,351 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import Row, func, select, true
+from sqlalchemy.orm import Session
+from app.models import models
+from app.schemas import schemas
+from app.services.analytics_service import get_street_cost_summaries, get_street_warranty_summaries
+
+RECENT_ISSUE_WINDOW_DAYS = 30
+
+def _haversine_angles(longitudes: np.ndarray, latitudes: np.ndarray) -> np.ndarray:
+    """Central angle in radians between each pair of consecutive vertices."""
+    longitudes, latitudes = np.radians(longitudes), np.radians(latitudes)
+    haversine = np.sin(np.diff(latitudes) / 2) ** 2 \
+        + np.cos(latitudes[:-1]) * np.cos(latitudes[1:]) * np.sin(np.diff(longitudes) / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
+
+def interpolate_paths(paths: Sequence[Sequence[Sequence[float]]], counts: Sequence[int]) -> List[List[List[float]]]:
+    """Place ``counts[i]`` evenly spaced points along each ``[lon, lat]`` polyline in ``paths``.
+
+    Points are spaced by haversine distance along the whole path, so they
+    spread over its segments in proportion to their real lengths. Within a
+    segment they are interpolated in degrees, which over street lengths
+    stays within centimetres of the great circle. The first and last points
+    are exactly the path's end vertices.
+
+    The whole batch is one NumPy pass: all vertices are concatenated, their
+    cumulative arc length gives one increasing axis for every path, and
+    ``np.interp`` reads each point's position off it.
+    """
+    if len(paths) != len(counts):
+        raise ValueError("Each path needs exactly one point count")
+    if not len(paths):
+        return []
+    counts = np.asarray(counts, dtype=np.intp)
+    if counts.min() < 0:
+        raise ValueError("Point counts must not be negative")
+    vertex_counts = np.fromiter(map(len, paths), dtype=np.intp, count=len(paths))
+    if vertex_counts.min() < 1:
+        raise ValueError("Each path needs at least one vertex")
+    try:
+        vertices = np.array([vertex for path in paths for vertex in path], dtype=np.float64)
+    except (TypeError, ValueError):
+        vertices = None
+    if vertices is None or vertices.ndim != 2 or vertices.shape[1] != 2:
+        raise ValueError("Vertices must be [longitude, latitude] pairs")
+    longitudes, latitudes = vertices[:, 0], vertices[:, 1]
+
+    first_vertices = np.cumsum(vertex_counts) - vertex_counts
+    last_vertices = first_vertices + vertex_counts - 1
+    angles = _haversine_angles(longitudes, latitudes)
+    # The pair joining one path's last vertex to the next path's first adds no length.
+    angles[last_vertices[:-1]] = 0.0
+    arc = np.concatenate(([0.0], np.cumsum(angles)))
+
+    # Point i of a path with n points lies i / (n - 1) of the way along it.
+    point_paths = np.repeat(np.arange(len(paths)), counts)
+    point_offsets = np.cumsum(counts) - counts
+    steps = np.arange(counts.sum()) - point_offsets[point_paths]
+    fractions = steps / np.maximum(counts - 1, 1)[point_paths]
+    path_starts, path_ends = arc[first_vertices][point_paths], arc[last_vertices][point_paths]
+    targets = path_starts + (path_ends - path_starts) * fractions
+    point_longitudes = np.interp(targets, arc, longitudes)
+    point_latitudes = np.interp(targets, arc, latitudes)
+
+    # A path without length shares its arc position with its neighbours' ends.
+    firsts = (steps == 0) | (path_starts == path_ends)
+    lasts = (steps == counts[point_paths] - 1) & ~firsts
+    for points, vertex_indices in ((firsts, first_vertices), (lasts, last_vertices)):
+        indices = vertex_indices[point_paths[points]]
+        point_longitudes[points], point_latitudes[points] = longitudes[indices], latitudes[indices]
+
+    points = np.column_stack((point_longitudes, point_latitudes)).tolist()
+    return [points[offset:offset + count] for offset, count in zip(point_offsets.tolist(), counts.tolist())]
+
 def interpolate_points(start_point: list, end_point: list, num_points: int):
-    lat_step = (end_point[1] - start_point[1]) / (num_points - 1)
-    lon_step = (end_point[0] - start_point[0]) / (num_points - 1)
+    return interpolate_paths([[start_point, end_point]], [num_points])[0]
+
+def latest_per_light(model, *columns, light_id=models.StreetLight.id):
+    """LATERAL subquery of ``columns`` from ``light_id``'s newest ``model`` row, to outer join ON true.
+
+    Lights may have several rows in their one-to-many tables; joining them
+    directly would repeat the light once per row.
+    """
+    return select(*columns)\
+        .where(model.street_light_id == light_id)\
+        .order_by(model.id.desc())\
+        .limit(1)\
+        .lateral(f"latest_{model.__tablename__}")
+
+def _empty_street_stats():
+    return {
+        "total_lights": 0,
+        "total_power_consumption": 0,
+        "operational_summary": {},
+        "recent_issues": 0,
+    }
+
+def get_street_stats(db: Session, street_ids: Optional[List[int]] = None) -> Dict[int, dict]:
+    """Aggregate light, energy, status and issue figures for many streets at once.
+
+    Runs one grouped query per figure regardless of how many streets are
+    requested; pass ``street_ids=None`` to aggregate every street.
+    """
+    def scoped(query):
+        if street_ids is not None:
+            query = query.filter(models.StreetLight.street_id.in_(street_ids))
+        return query
+
+    stats = defaultdict(_empty_street_stats)
+
+    light_counts = scoped(db.query(models.StreetLight.street_id, func.count(models.StreetLight.id)))\
+        .group_by(models.StreetLight.street_id)\
+        .all()
+    for street_id, total_lights in light_counts:
+        stats[street_id]["total_lights"] = total_lights
+
+    power_totals = scoped(db.query(
+        models.StreetLight.street_id,
+        func.sum(models.EnergyConsumption.average_monthly_consumption)
+    ).join(models.StreetLight))\
+        .group_by(models.StreetLight.street_id)\
+        .all()
+    for street_id, total_power in power_totals:
+        stats[street_id]["total_power_consumption"] = total_power or 0
+
+    status_counts = scoped(db.query(
+        models.StreetLight.street_id,
+        models.OperationalStatus.current_status,
+        func.count(models.OperationalStatus.id)
+    ).join(models.StreetLight))\
+        .group_by(models.StreetLight.street_id, models.OperationalStatus.current_status)\
+        .all()
+    for street_id, status, count in status_counts:
+        stats[street_id]["operational_summary"][status] = count
+
+    issue_counts = scoped(db.query(
+        models.StreetLight.street_id,
+        func.count(models.IssueReport.id)
+    ).join(models.StreetLight))\
+        .filter(models.IssueReport.issue_date >= datetime.now() - timedelta(days=RECENT_ISSUE_WINDOW_DAYS))\
+        .group_by(models.StreetLight.street_id)\
+        .all()
+    for street_id, recent_issues in issue_counts:
+        stats[street_id]["recent_issues"] = recent_issues or 0
+
+    return stats
+
+def build_street_location(street: models.Street) -> Optional[schemas.StreetLocation]:
+    if not (street.start_latitude and street.start_longitude and street.end_latitude and street.end_longitude):
+        return None
+    return schemas.StreetLocation(
+        start=schemas.Coordinates(
+            latitude=street.start_latitude,
+            longitude=street.start_longitude
+        ),
+        end=schemas.Coordinates(
+            latitude=street.end_latitude,
+            longitude=street.end_longitude
+        )
+    )
+
+def build_street_basic_info(street: models.Street, stats: dict) -> schemas.StreetBasicInfo:
+    return schemas.StreetBasicInfo(
+        id=street.id,
+        street_name=street.name,
+        ward=street.ward,
+        total_lights=stats["total_lights"],
+        total_power_consumption=stats["total_power_consumption"],
+        operational_summary=stats["operational_summary"],
+        recent_issues=stats["recent_issues"],
+        coordinates=build_street_location(street)
+    )
+
+# Optional sections of ``StreetDetailedInfo``; ``street_info`` is always returned.
+DETAILED_SECTIONS = ("lights_info", "maintenance_summary", "energy_summary", "cost_summary", "warranty_summary")
+# Sections aggregated from per-light rows, which need each light's street.
+LIGHT_ROW_SECTIONS = {"lights_info", "maintenance_summary", "energy_summary"}
+
+# Section payloads are plain dicts shaped like the matching schemas, so
+# they can either be validated into ``StreetDetailedInfo`` or encoded
+# directly on the fast JSON path.
+
+def _light_payload(light: Row) -> dict:
+    return {
+        "id": light.id,
+        "location": {"latitude": light.latitude, "longitude": light.longitude},
+        "address": light.address,
+        "installation": {
+            "installation_date": light.installation_date,
+            "contractor_name": light.contractor_name,
+        } if light.installation_id is not None else None,
+        "specifications": {
+            "bulb_type": light.bulb_type,
+            "bulb_manufacturer": light.bulb_manufacturer,
+            "wattage": light.wattage,
+        } if light.specification_id is not None else None,
+        "status": {
+            "current_status": light.current_status,
+            "last_status_update": light.last_status_update,
+        } if light.status_id is not None else None,
+    }
+
+def _maintenance_payload(maintenance_history: List[Row]) -> dict:
+    return {
+        "total_maintenance_records": len(maintenance_history),
+        "maintenance": [
+            {
+                "date": record.maintenance_date,
+                "type": record.maintenance_type,
+                "cost": record.cost,
+                "street_light_id": record.street_light_id,
+            }
+            for record in maintenance_history
+        ],
+    }
+
+def _energy_payload(energy_data: List[Row]) -> dict:
+    # Floats throughout, as the schema would coerce them, so both paths encode alike.
+    return {
+        "total_monthly_consumption": float(sum(e.average_monthly_consumption or 0 for e in energy_data)),
+        "average_daily_consumption": float(sum(e.average_daily_consumption or 0 for e in energy_data) / len(energy_data)) if energy_data else 0.0,
+        "per_light_consumption": [
+            {
+                "light_id": e.street_light_id,
+                "monthly_consumption": float(e.average_monthly_consumption or 0),
+                "daily_consumption": float(e.average_daily_consumption or 0),
+            }
+            for e in energy_data
+        ],
+    }
+
+def _group_by_street(rows, street_of_light: Dict[int, int]) -> Dict[int, list]:
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[street_of_light[row.street_light_id]].append(row)
+    return grouped
+
+def build_street_detailed_payloads(
+    db: Session, street_ids: List[int], sections: Optional[Iterable[str]] = None
+) -> Dict[int, dict]:
+    """``StreetDetailedInfo``-shaped payloads for every existing street in ``street_ids``, keyed by street id.
+
+    Only ``sections`` (all of ``DETAILED_SECTIONS`` by default) are filled
+    in, and only their queries run. Lights, maintenance records and energy
+    figures for all the streets are read as plain rows with one IN-list
+    query each and grouped per street here; costs and warranties are
+    aggregated per street in SQL. The number of queries does not depend on
+    how many streets are requested.
+    """
+    sections = set(DETAILED_SECTIONS if sections is None else sections)
+    streets = db.query(models.Street).filter(models.Street.id.in_(street_ids)).all()
+    if not streets:
+        return {}
+    street_ids = [street.id for street in streets]
+    # Section -> builder taking a street id.
+    builders = {}
+
+    street_of_light = {}
+    if "lights_info" in sections:
+        light = models.StreetLight
+        installed, specified, reported = models.InstallationDetail, models.LightSpecification, models.OperationalStatus
+        # A light can have several rows in each table; only its latest is reported.
+        installation = latest_per_light(installed, installed.id, installed.installation_date, installed.contractor_name)
+        specification = latest_per_light(
+            specified, specified.id, specified.bulb_type, specified.bulb_manufacturer, specified.wattage
+        )
+        status = latest_per_light(reported, reported.id, reported.current_status, reported.last_status_update)
+        lights = db.query(
+            light.id, light.street_id, light.latitude, light.longitude, light.address,
+            installation.c.id.label("installation_id"), installation.c.installation_date, installation.c.contractor_name,
+            specification.c.id.label("specification_id"), specification.c.bulb_type,
+            specification.c.bulb_manufacturer, specification.c.wattage,
+            status.c.id.label("status_id"), status.c.current_status, status.c.last_status_update,
+        ).select_from(light)\
+            .outerjoin(installation, true())\
+            .outerjoin(specification, true())\
+            .outerjoin(status, true())\
+            .filter(light.street_id.in_(street_ids))\
+            .order_by(light.id)\
+            .all()
+        street_of_light = {row.id: row.street_id for row in lights}
+        lights_by_street = defaultdict(list)
+        for row in lights:
+            lights_by_street[row.street_id].append(row)
+        builders["lights_info"] = lambda street_id: [_light_payload(row) for row in lights_by_street[street_id]]
+    elif sections & LIGHT_ROW_SECTIONS:
+        street_of_light = dict(
+            db.query(models.StreetLight.id, models.StreetLight.street_id)
+            .filter(models.StreetLight.street_id.in_(street_ids))
+            .all()
+        )
+    light_ids = list(street_of_light)
+
+    if "maintenance_summary" in sections:
+        maintenance_by_street = _group_by_street(db.query(
+            models.MaintenanceHistory.street_light_id,
+            models.MaintenanceHistory.maintenance_date,
+            models.MaintenanceHistory.maintenance_type,
+            models.MaintenanceHistory.cost,
+        ).filter(models.MaintenanceHistory.street_light_id.in_(light_ids))
+            .order_by(models.MaintenanceHistory.maintenance_date.desc(), models.MaintenanceHistory.id.desc())
+            .all(), street_of_light)
+        builders["maintenance_summary"] = lambda street_id: _maintenance_payload(maintenance_by_street[street_id])
+    if "energy_summary" in sections:
+        energy_by_street = _group_by_street(db.query(
+            models.EnergyConsumption.street_light_id,
+            models.EnergyConsumption.average_monthly_consumption,
+            models.EnergyConsumption.average_daily_consumption,
+        ).filter(models.EnergyConsumption.street_light_id.in_(light_ids))
+            .all(), street_of_light)
+        builders["energy_summary"] = lambda street_id: _energy_payload(energy_by_street[street_id])
+    if "cost_summary" in sections:
+        cost_summaries = get_street_cost_summaries(db, street_ids)
+        builders["cost_summary"] = lambda street_id: cost_summaries[street_id].model_dump()
+    if "warranty_summary" in sections:
+        warranty_summaries = get_street_warranty_summaries(db, street_ids)
+        builders["warranty_summary"] = lambda street_id: warranty_summaries[street_id].model_dump()
+
+    return {
+        street.id: {
+            "street_info": {
+                "street_name": street.name,
+                "ward": street.ward,
+                "description": street.description,
+            },
+            **{section: build(street.id) for section, build in builders.items()},
+        }
+        for street in streets
+    }
+
+def build_street_detailed_infos(
+    db: Session, street_ids: List[int], sections: Optional[Iterable[str]] = None
+) -> Dict[int, schemas.StreetDetailedInfo]:
+    """``build_street_detailed_payloads`` validated into ``StreetDetailedInfo``; unrequested sections are None."""
+    return {
+        street_id: schemas.StreetDetailedInfo.model_validate(payload)
+        for street_id, payload in build_street_detailed_payloads(db, street_ids, sections).items()
+    }
 
-    points = []
-    for i in range(num_points):
-        lat = start_point[1] + lat_step * i
-        lon = start_point[0] + lon_step * i
-        points.append([lon, lat])
+def build_street_detailed_payload(
+    db: Session, street_id: int, sections: Optional[Iterable[str]] = None
+) -> Optional[dict]:
+    return build_street_detailed_payloads(db, [street_id], sections).get(street_id)
 
-    return points
\ No newline at end of file
+def build_street_detailed_info(
+    db: Session, street_id: int, sections: Optional[Iterable[str]] = None
+) -> Optional[schemas.StreetDetailedInfo]:
+    return build_street_detailed_infos(db, [street_id], sections).get(street_id)
@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import Iterable, List, Optional
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.db import SessionLocal
+from app.models import models
+from app.schemas import schemas
+from app.services.change_tracking import (
+    STREET_SUMMARY_LOCK, broadcast_reset, lock_rollup_rows, notify_reset, register_commit_hook
+)
+from app.services.street_service import get_street_stats, build_street_basic_info
+
+def refresh_street_summaries(db: Session, street_ids: Optional[Iterable[int]] = None):
+    """Recompute ``street_summaries`` rows for the given streets, or for every street.
+
+    Holds the streets' rollup locks until the transaction ends, so
+    concurrent refreshes of a street run one after the other.
+    """
+    query = db.query(models.Street.id)
+    if street_ids is not None:
+        street_ids = list(street_ids)
+        if not street_ids:
+            return
+        query = query.filter(models.Street.id.in_(street_ids))
+    lock_rollup_rows(db, STREET_SUMMARY_LOCK, street_ids)
+    existing_ids = [street_id for (street_id,) in query.all()]
+    if not existing_ids:
+        return
+
+    stats = get_street_stats(db, existing_ids if street_ids is not None else None)
+    refreshed_at = datetime.now()
+    rows = [
+        {"street_id": street_id, "refreshed_at": refreshed_at, **stats[street_id]}
+        for street_id in existing_ids
+    ]
+    table = models.StreetSummary.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.street_id],
+        set_={
+            column.name: stmt.excluded[column.name]
+            for column in table.columns
+            if column.name != "street_id"
+        }
+    )
+    db.execute(stmt, rows)
+
+@register_commit_hook
+def _refresh_changed_streets(session: Session, street_ids, light_ids):
+    refresh_street_summaries(session, street_ids)
+
+def _summary_stats(summary: models.StreetSummary) -> dict:
+    return {
+        "total_lights": summary.total_lights,
+        "total_power_consumption": summary.total_power_consumption,
+        "operational_summary": summary.operational_summary,
+        "recent_issues": summary.recent_issues,
+    }
+
+def get_street_basic_infos(db: Session, street_ids: Optional[List[int]] = None) -> List[schemas.StreetBasicInfo]:
+    """Build ``StreetBasicInfo`` from the rollup table, one row per street.
+
+    Streets that have not been summarised yet (e.g. loaded with raw SQL before
+    the repair job ran) fall back to live grouped aggregation.
+    """
+    query = db.query(models.Street, models.StreetSummary)\
+        .outerjoin(models.StreetSummary, models.StreetSummary.street_id == models.Street.id)
+    if street_ids is not None:
+        query = query.filter(models.Street.id.in_(street_ids))
+    rows = query.all()
+
+    missing_ids = [street.id for street, summary in rows if summary is None]
+    live_stats = get_street_stats(db, missing_ids) if missing_ids else {}
+    return [
+        build_street_basic_info(street, _summary_stats(summary) if summary else live_stats[street.id])
+        for street, summary in rows
+    ]
+
+def repair_street_summaries():
+    """Periodic job: rebuild every summary so time-windowed figures stay current."""
+    db = SessionLocal()
+    try:
+        refresh_street_summaries(db)
+        # Responses and geometries cached from the old summaries are dropped by
+        # every worker, and by this one even when its listener is off.
+        broadcast_reset(db)
+        db.commit()
+        notify_reset()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    repair_street_summaries()
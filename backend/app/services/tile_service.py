@@ -0,0 +1,238 @@
+import json
+import math
+import os
+import shutil
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, Optional, Set, Tuple
+from sqlalchemy import true
+from sqlalchemy.orm import Session
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.spatial import mercator_latitude, mercator_longitude, mercator_position
+from app.models import models
+from app.services import mvt
+from app.services.change_tracking import register_invalidation_listener, register_reset_listener
+from app.services.cluster_service import get_clusters
+from app.services.spatial_service import bbox_filter, streets_in_bbox
+from app.services.street_service import latest_per_light
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+MAX_TILE_ZOOM = 22
+# Below this zoom the lights layer is replaced by precomputed clusters.
+MIN_LIGHT_TILE_ZOOM = 13
+MIN_STREET_TILE_ZOOM = 10
+
+TileKey = Tuple[int, int, int]
+
+# Tile key -> (tile, ids of the streets it shows).
+_memory_cache = LRUCache(settings.tile_cache_size)
+# Street id -> keys of the cached tiles showing it; covers exactly the tiles in _memory_cache.
+_tiles_by_street: Dict[Optional[int], Set[TileKey]] = defaultdict(set)
+_index_lock = Lock()
+# Bumped on every invalidation so a tile built from pre-change rows is not cached afterwards.
+_generation = 0
+
+def tile_bounds(z: int, x: int, y: int, buffer: int = 0) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) of a tile, widened by ``buffer`` tile pixels."""
+    tiles = 2 ** z
+    margin = buffer / TILE_EXTENT
+    return (
+        mercator_latitude(y + 1 + margin, tiles),
+        mercator_longitude(x - margin, tiles),
+        mercator_latitude(y - margin, tiles),
+        mercator_longitude(x + 1 + margin, tiles),
+    )
+
+def tiles_covering(latitude: float, longitude: float) -> Set[TileKey]:
+    """Every tile, at every zoom, whose buffered area contains the coordinate."""
+    margin = TILE_BUFFER / TILE_EXTENT
+    keys = set()
+    for z in range(MAX_TILE_ZOOM + 1):
+        tiles = 2 ** z
+        x, y = mercator_position(latitude, longitude, tiles)
+        for tile_x in range(max(math.floor(x - margin), 0), min(math.floor(x + margin), tiles - 1) + 1):
+            for tile_y in range(max(math.floor(y - margin), 0), min(math.floor(y + margin), tiles - 1) + 1):
+                keys.add((z, tile_x, tile_y))
+    return keys
+
+def _project(latitude: float, longitude: float, z: int, x: int, y: int) -> Tuple[int, int]:
+    tile_x, tile_y = mercator_position(latitude, longitude, 2 ** z)
+    return round((tile_x - x) * TILE_EXTENT), round((tile_y - y) * TILE_EXTENT)
+
+def build_tile(db: Session, z: int, x: int, y: int) -> Tuple[bytes, Set[Optional[int]]]:
+    """Encode a tile and return it with the street ids whose data it contains."""
+    bbox = tile_bounds(z, x, y, TILE_BUFFER)
+    layers = {}
+    street_ids = set()
+
+    if z >= MIN_LIGHT_TILE_ZOOM:
+        status = latest_per_light(models.OperationalStatus, models.OperationalStatus.current_status)
+        specification = latest_per_light(models.LightSpecification, models.LightSpecification.wattage)
+        rows = db.query(
+            models.StreetLight.id,
+            models.StreetLight.street_id,
+            models.StreetLight.latitude,
+            models.StreetLight.longitude,
+            status.c.current_status,
+            specification.c.wattage,
+        ).select_from(models.StreetLight)\
+            .outerjoin(status, true())\
+            .outerjoin(specification, true())\
+            .filter(bbox_filter(
+                models.StreetLight.grid_cell, models.StreetLight.latitude, models.StreetLight.longitude, *bbox
+            ))\
+            .all()
+        layers["lights"] = [
+            {
+                "id": row.id,
+                "type": mvt.POINT,
+                "geometry": [_project(row.latitude, row.longitude, z, x, y)],
+                "properties": {
+                    "street_id": row.street_id,
+                    "status": row.current_status,
+                    "wattage": row.wattage,
+                },
+            }
+            for row in rows
+        ]
+        street_ids.update(row.street_id for row in rows)
+    else:
+        clusters = get_clusters(db, z, *bbox).clusters
+        layers["clusters"] = [
+            {
+                "type": mvt.POINT,
+                "geometry": [_project(cluster.latitude, cluster.longitude, z, x, y)],
+                "properties": {"count": cluster.count, **cluster.status_counts},
+            }
+            for cluster in clusters
+        ]
+
+    if z >= MIN_STREET_TILE_ZOOM:
+        streets = [
+            street for street in streets_in_bbox(db, bbox, street_ids - {None})
+            if street.end_latitude is not None and street.end_longitude is not None
+        ]
+        layers["streets"] = [
+            {
+                "id": street.id,
+                "type": mvt.LINESTRING,
+                "geometry": [
+                    _project(street.start_latitude, street.start_longitude, z, x, y),
+                    _project(street.end_latitude, street.end_longitude, z, x, y),
+                ],
+                "properties": {"name": street.name, "ward": street.ward},
+            }
+            for street in streets
+        ]
+        street_ids.update(street.id for street in streets)
+
+    return mvt.encode_tile(layers, TILE_EXTENT), street_ids
+
+def _disk_paths(key: TileKey) -> Tuple[str, str]:
+    z, x, y = key
+    directory = os.path.join(settings.tile_cache_dir, str(z), str(x))
+    return os.path.join(directory, f"{y}.mvt"), os.path.join(directory, f"{y}.json")
+
+def _read_disk(key: TileKey) -> Optional[Tuple[bytes, Set[Optional[int]]]]:
+    if not settings.tile_cache_dir:
+        return None
+    tile_path, index_path = _disk_paths(key)
+    try:
+        with open(index_path) as index_file:
+            street_ids = set(json.load(index_file))
+        with open(tile_path, "rb") as tile_file:
+            return tile_file.read(), street_ids
+    except (OSError, ValueError):
+        return None
+
+def _write_disk(key: TileKey, tile: bytes, street_ids: Set[Optional[int]]):
+    tile_path, index_path = _disk_paths(key)
+    os.makedirs(os.path.dirname(tile_path), exist_ok=True)
+    for path, mode, content in (
+        (index_path, "w", json.dumps(sorted(street_ids, key=lambda i: -1 if i is None else i))),
+        (tile_path, "wb", tile),
+    ):
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, mode) as cache_file:
+            cache_file.write(content)
+        os.replace(temporary_path, path)
+
+def _remove_disk(key: TileKey):
+    if not settings.tile_cache_dir:
+        return
+    for path in _disk_paths(key):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def _unindex(key: TileKey, street_ids: Set[Optional[int]]):
+    for street_id in street_ids:
+        keys = _tiles_by_street.get(street_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del _tiles_by_street[street_id]
+
+def _remember(key: TileKey, tile: bytes, street_ids: Set[Optional[int]]):
+    previous = _memory_cache.get(key)
+    if previous is not None:
+        _unindex(key, previous[1])
+    # A tile leaving the LRU leaves the index too, and its disk copy with it:
+    # a disk tile nobody indexes could not be found when its streets change.
+    for evicted_key, (_, evicted_street_ids) in _memory_cache.set(key, (tile, street_ids)):
+        _unindex(evicted_key, evicted_street_ids)
+        _remove_disk(evicted_key)
+    for street_id in street_ids:
+        _tiles_by_street[street_id].add(key)
+
+def get_tile(db: Session, z: int, x: int, y: int) -> bytes:
+    key = (z, x, y)
+    cached = _memory_cache.get(key)
+    if cached is not None:
+        return cached[0]
+
+    cached = _read_disk(key)
+    if cached is not None:
+        tile, street_ids = cached
+        with _index_lock:
+            _remember(key, tile, street_ids)
+        return tile
+
+    generation = _generation
+    tile, street_ids = build_tile(db, z, x, y)
+    with _index_lock:
+        if generation == _generation:
+            _remember(key, tile, street_ids)
+            if settings.tile_cache_dir:
+                _write_disk(key, tile, street_ids)
+    return tile
+
+@register_invalidation_listener
+def invalidate_tiles(street_ids: Set[int], light_ids: Set[int], positions: Set[Tuple[float, float]]):
+    """Evict tiles showing a changed street, or covering a changed light or street position."""
+    global _generation
+    keys = set()
+    for latitude, longitude in positions:
+        keys.update(tiles_covering(latitude, longitude))
+    with _index_lock:
+        _generation += 1
+        for street_id in street_ids:
+            keys.update(_tiles_by_street.get(street_id, ()))
+        for key in keys:
+            cached = _memory_cache.pop(key)
+            if cached is not None:
+                _unindex(key, cached[1])
+            _remove_disk(key)
+
+@register_reset_listener
+def clear_tiles():
+    global _generation
+    with _index_lock:
+        _generation += 1
+        _tiles_by_street.clear()
+        _memory_cache.clear()
+    if settings.tile_cache_dir:
+        shutil.rmtree(settings.tile_cache_dir, ignore_errors=True)
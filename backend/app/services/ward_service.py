@@ -0,0 +1,208 @@
+from collections import defaultdict
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import event, func, inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.db import SessionLocal
+from app.models import models
+from app.schemas import schemas
+from app.services.change_tracking import WARD_SUMMARY_LOCK, lock_rollup_rows, register_commit_hook
+
+RESOLVED_STATUS = "Resolved"
+
+# Session info key: names of the wards flushed lights and streets left.
+_LEFT_WARDS_KEY = "left_wards"
+
+def _empty_stats() -> dict:
+    return {
+        "total_streets": 0,
+        "total_lights": 0,
+        "total_power_consumption": 0,
+        "operational_summary": {},
+        "open_issues": 0,
+        "total_installation_cost": 0,
+        "total_maintenance_cost": 0,
+        "total_electricity_cost": 0,
+    }
+
+def get_ward_stats(db: Session, ward_ids: Optional[List[int]] = None) -> Dict[int, dict]:
+    """Aggregate ward figures with one grouped query per figure, all wards when ``ward_ids`` is None."""
+    stats = defaultdict(_empty_stats)
+
+    def scoped(query, ward_column=models.StreetLight.ward_id):
+        return query.filter(ward_column.in_(ward_ids)) if ward_ids is not None else query
+
+    street_counts = scoped(db.query(models.Street.ward_id, func.count(models.Street.id)), models.Street.ward_id)\
+        .group_by(models.Street.ward_id)\
+        .all()
+    for ward_id, total_streets in street_counts:
+        stats[ward_id]["total_streets"] = total_streets
+
+    light_counts = scoped(db.query(models.StreetLight.ward_id, func.count(models.StreetLight.id)))\
+        .group_by(models.StreetLight.ward_id)\
+        .all()
+    for ward_id, total_lights in light_counts:
+        stats[ward_id]["total_lights"] = total_lights
+
+    power_totals = scoped(db.query(
+        models.StreetLight.ward_id,
+        func.sum(models.EnergyConsumption.average_monthly_consumption)
+    ).join(models.StreetLight))\
+        .group_by(models.StreetLight.ward_id)\
+        .all()
+    for ward_id, total_power in power_totals:
+        stats[ward_id]["total_power_consumption"] = total_power or 0
+
+    status_counts = scoped(db.query(
+        models.StreetLight.ward_id,
+        models.OperationalStatus.current_status,
+        func.count(models.OperationalStatus.id)
+    ).join(models.StreetLight))\
+        .group_by(models.StreetLight.ward_id, models.OperationalStatus.current_status)\
+        .all()
+    for ward_id, status, count in status_counts:
+        stats[ward_id]["operational_summary"][status] = count
+
+    issue_counts = scoped(db.query(
+        models.StreetLight.ward_id,
+        func.count(models.IssueReport.id)
+    ).join(models.StreetLight))\
+        .filter(models.IssueReport.resolution_status.is_distinct_from(RESOLVED_STATUS))\
+        .group_by(models.StreetLight.ward_id)\
+        .all()
+    for ward_id, open_issues in issue_counts:
+        stats[ward_id]["open_issues"] = open_issues
+
+    cost_totals = scoped(db.query(
+        models.StreetLight.ward_id,
+        func.sum(models.CostAndPricing.installation_cost),
+        func.sum(models.CostAndPricing.maintenance_cost),
+        func.sum(models.CostAndPricing.electricity_cost),
+    ).join(models.StreetLight))\
+        .group_by(models.StreetLight.ward_id)\
+        .all()
+    for ward_id, installation, maintenance, electricity in cost_totals:
+        stats[ward_id]["total_installation_cost"] = installation or 0
+        stats[ward_id]["total_maintenance_cost"] = maintenance or 0
+        stats[ward_id]["total_electricity_cost"] = electricity or 0
+
+    return stats
+
+def refresh_ward_summaries(db: Session, ward_ids: Optional[Iterable[int]] = None):
+    """Recompute ``ward_summaries`` rows for the given wards, or for every ward, under their rollup locks."""
+    query = db.query(models.Ward.id)
+    if ward_ids is not None:
+        ward_ids = [ward_id for ward_id in ward_ids if ward_id is not None]
+        if not ward_ids:
+            return
+        query = query.filter(models.Ward.id.in_(ward_ids))
+    lock_rollup_rows(db, WARD_SUMMARY_LOCK, ward_ids)
+    existing_ids = [ward_id for (ward_id,) in query.all()]
+    if not existing_ids:
+        return
+
+    stats = get_ward_stats(db, existing_ids if ward_ids is not None else None)
+    refreshed_at = datetime.now()
+    rows = [
+        {"ward_id": ward_id, "refreshed_at": refreshed_at, **stats[ward_id]}
+        for ward_id in existing_ids
+    ]
+    table = models.WardSummary.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.ward_id],
+        set_={
+            column.name: stmt.excluded[column.name]
+            for column in table.columns
+            if column.name != "ward_id"
+        }
+    )
+    db.execute(stmt, rows)
+
+@event.listens_for(Session, "after_flush")
+def _collect_left_wards(session, flush_context):
+    # change_tracking keeps ``ward``'s previous value, so moved and deleted
+    # rows still name the ward they were counted in.
+    left_wards = session.info.setdefault(_LEFT_WARDS_KEY, set())
+    for obj in chain(session.dirty, session.deleted):
+        if isinstance(obj, (models.StreetLight, models.Street)):
+            history = inspect(obj).attrs.ward.history
+            left_wards.update(ward for ward in chain(history.deleted or (), history.unchanged or ()) if ward)
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _discard_left_wards(session):
+    session.info.pop(_LEFT_WARDS_KEY, None)
+
+@register_commit_hook
+def _refresh_changed_wards(session: Session, street_ids, light_ids):
+    # The wards the changed rows are in now, plus the ones they left in this
+    # session. Rows moved by raw SQL only name their current ward; the ward
+    # they left waits for the periodic repair.
+    ward_ids = set()
+    if street_ids:
+        ward_ids.update(ward_id for (ward_id,) in
+                        session.query(models.Street.ward_id).filter(models.Street.id.in_(street_ids)).distinct())
+    if light_ids:
+        ward_ids.update(ward_id for (ward_id,) in
+                        session.query(models.StreetLight.ward_id).filter(models.StreetLight.id.in_(light_ids)).distinct())
+    left_wards = session.info.pop(_LEFT_WARDS_KEY, None)
+    if left_wards:
+        ward_ids.update(ward_id for (ward_id,) in
+                        session.query(models.Ward.id).filter(models.Ward.name.in_(left_wards)))
+    refresh_ward_summaries(session, ward_ids)
+
+def build_ward_summary(ward: models.Ward, stats: dict) -> schemas.WardSummary:
+    installation = stats["total_installation_cost"]
+    maintenance = stats["total_maintenance_cost"]
+    electricity = stats["total_electricity_cost"]
+    return schemas.WardSummary(
+        id=ward.id,
+        name=ward.name,
+        total_streets=stats["total_streets"],
+        total_lights=stats["total_lights"],
+        total_power_consumption=stats["total_power_consumption"],
+        operational_summary=stats["operational_summary"],
+        open_issues=stats["open_issues"],
+        cost_summary=schemas.CostSummary(
+            total_installation_cost=installation,
+            total_maintenance_cost=maintenance,
+            total_electricity_cost=electricity,
+            total_cost=installation + maintenance + electricity
+        )
+    )
+
+def get_ward_summaries(db: Session, ward_ids: Optional[List[int]] = None) -> List[schemas.WardSummary]:
+    """Build ``WardSummary`` from the rollup table, falling back to live aggregation for unsummarised wards."""
+    query = db.query(models.Ward, models.WardSummary)\
+        .outerjoin(models.WardSummary, models.WardSummary.ward_id == models.Ward.id)\
+        .order_by(models.Ward.name)
+    if ward_ids is not None:
+        query = query.filter(models.Ward.id.in_(ward_ids))
+    rows = query.all()
+
+    missing_ids = [ward.id for ward, summary in rows if summary is None]
+    live_stats = get_ward_stats(db, missing_ids) if missing_ids else {}
+    return [
+        build_ward_summary(ward, {
+            column: getattr(summary, column) for column in _empty_stats()
+        } if summary else live_stats[ward.id])
+        for ward, summary in rows
+    ]
+
+def repair_ward_summaries():
+    """Periodic job: rebuild every ward summary, catching writes made outside the ORM."""
+    db = SessionLocal()
+    try:
+        refresh_ward_summaries(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    repair_ward_summaries()
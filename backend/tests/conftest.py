@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+from typing import Callable, List
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.db import engine
+from app.models import models
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """The configured database; tests that need one are skipped when it is unreachable."""
+    try:
+        engine.connect().close()
+    except OperationalError:
+        pytest.skip("No database configured")
+    return engine
+
+@pytest.fixture
+def db(db_engine):
+    """A session whose writes, including commits, are rolled back after the test."""
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+@pytest.fixture
+def count_queries(db_engine) -> Callable[[Callable[[], object]], int]:
+    """Run a callable and return how many statements it sent to the database."""
+    def count(run: Callable[[], object]) -> int:
+        statements: List[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", record)
+        try:
+            run()
+        finally:
+            event.remove(db_engine, "before_cursor_execute", record)
+        return len(statements)
+    return count
+
+@pytest.fixture
+def make_street(db: Session) -> Callable[..., models.Street]:
+    """Create a street with ``lights`` fully described lights and return it."""
+    def make(lights: int = 3, ward: str = "Test ward") -> models.Street:
+        street = models.Street(
+            name="Test street", ward=ward,
+            start_latitude=12.9, start_longitude=77.5, end_latitude=12.91, end_longitude=77.51
+        )
+        db.add(street)
+        db.flush()
+        today = date.today()
+        for index in range(lights):
+            light = models.StreetLight(
+                street_id=street.id, ward=ward, address=f"{index} Test street",
+                latitude=12.9 + index * 1e-4, longitude=77.5 + index * 1e-4
+            )
+            light.installation_detail = models.InstallationDetail(
+                installation_date=today - timedelta(days=365), contractor_name="Test contractor"
+            )
+            light.light_specification = models.LightSpecification(
+                bulb_type="LED", bulb_manufacturer="Test manufacturer", wattage=60
+            )
+            light.cost_pricing = models.CostAndPricing(
+                installation_cost=100, bulb_cost=10, fixture_cost=20, electricity_cost=5, maintenance_cost=15
+            )
+            light.energy_consumption = models.EnergyConsumption(
+                average_daily_consumption=1.5, average_monthly_consumption=45, operating_hours=12
+            )
+            light.operational_status = models.OperationalStatus(current_status="Operational", last_status_update=today)
+            light.warranties = [models.WarrantyInformation(
+                component_name="Bulb", warranty_start=today - timedelta(days=30), warranty_end=today + timedelta(days=30)
+            )]
+            light.maintenance_histories = [
+                models.MaintenanceHistory(maintenance_date=today - timedelta(days=days), maintenance_type="Repair", cost=10)
+                for days in (10, 40)
+            ]
+            light.issue_reports = [models.IssueReport(issue_date=today - timedelta(days=2), resolution_status="Open")]
+            db.add(light)
+        db.flush()
+        return street
+    return make
@@ -0,0 +1,60 @@
+import threading
+import time
+from sqlalchemy import text
+from app.core.spatial import MAX_CLUSTER_ZOOM, mercator_cell
+from app.db import SessionLocal, engine
+from app.models import models
+from app.services.cluster_service import CLUSTERS_TABLE, update_light_clusters
+
+# Far from any seeded light, so the test light has its finest cluster cells to itself.
+OLD_POSITION = (-60.123, -150.456)
+NEW_POSITION = (-61.5, -151.5)
+
+def _cell_count(db, position) -> int:
+    cell_x, cell_y = mercator_cell(*position, MAX_CLUSTER_ZOOM)
+    return db.execute(text(
+        f"SELECT coalesce(sum(light_count), 0) FROM {CLUSTERS_TABLE} "
+        f"WHERE zoom = :zoom AND cell_x = :cell_x AND cell_y = :cell_y"
+    ), {"zoom": MAX_CLUSTER_ZOOM, "cell_x": cell_x, "cell_y": cell_y}).scalar()
+
+def test_concurrent_updates_of_a_moved_light_move_it_once(db_engine):
+    setup = SessionLocal()
+    light = models.StreetLight(latitude=OLD_POSITION[0], longitude=OLD_POSITION[1])
+    setup.add(light)
+    setup.commit()
+    failures = []
+    try:
+        # Moved without the ORM, like a write another process made.
+        with engine.begin() as connection:
+            connection.execute(
+                text("UPDATE street_lights SET latitude = :latitude, longitude = :longitude WHERE id = :id"),
+                {"latitude": NEW_POSITION[0], "longitude": NEW_POSITION[1], "id": light.id}
+            )
+        first = SessionLocal()
+        update_light_clusters(first, [light.id])
+
+        def second_update():
+            second = SessionLocal()
+            try:
+                update_light_clusters(second, [light.id])
+                second.commit()
+            except Exception as exc:
+                failures.append(exc)
+            finally:
+                second.close()
+
+        thread = threading.Thread(target=second_update)
+        thread.start()
+        # Let the second update start before the first commits.
+        time.sleep(0.5)
+        first.commit()
+        first.close()
+        thread.join()
+
+        assert failures == []
+        setup.rollback()
+        assert (_cell_count(setup, OLD_POSITION), _cell_count(setup, NEW_POSITION)) == (0, 1)
+    finally:
+        setup.delete(light)
+        setup.commit()
+        setup.close()
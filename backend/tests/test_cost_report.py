@@ -0,0 +1,19 @@
+from app.models import models
+from app.services.analytics_service import get_cost_report
+
+def test_lights_with_several_cost_and_specification_rows_count_once(db, make_street):
+    street = make_street(lights=2, ward="Test ward costs")
+    light = street.street_lights[0]
+    db.add_all([
+        models.LightSpecification(street_light_id=light.id, bulb_type="Sodium", bulb_manufacturer="Other manufacturer"),
+        models.CostAndPricing(street_light_id=light.id, installation_cost=50, maintenance_cost=5, electricity_cost=1),
+    ])
+    db.flush()
+
+    report = get_cost_report(db, ward="Test ward costs")
+
+    assert report.totals.total_cost == 296
+    assert [(row.name, row.lights, row.total_cost) for row in report.by_manufacturer] == [
+        ("Other manufacturer", 1, 176), ("Test manufacturer", 1, 120)
+    ]
+    assert [(row.name, row.lights, row.total_cost) for row in report.by_contractor] == [("Test contractor", 2, 296)]
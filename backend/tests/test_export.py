@@ -0,0 +1,43 @@
+import asyncio
+from datetime import date
+import pytest
+from app.db import read_async_engine
+from app.models import models
+from app.services import export_service
+
+def test_export_has_one_row_per_light_with_its_latest_rows(db, make_street):
+    street = make_street(lights=2)
+    light = street.street_lights[0]
+    db.add(models.OperationalStatus(street_light_id=light.id, current_status="Faulty", last_status_update=date.today()))
+    db.add(models.CostAndPricing(street_light_id=light.id, installation_cost=1, bulb_cost=1, fixture_cost=1))
+    db.flush()
+
+    rows = db.execute(export_service.street_light_export_query(street_id=street.id)).all()
+
+    assert [row.id for row in rows] == sorted(street_light.id for street_light in street.street_lights)
+    assert (rows[0].current_status, rows[0].installation_cost) == ("Faulty", 1)
+    assert rows[1].current_status == "Operational"
+
+@pytest.mark.parametrize("format", ["arrow", "parquet"])
+def test_export_round_trips_through_pyarrow(db, format):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+    query = export_service.street_light_export_query(street_id=1)
+    expected = db.execute(query).all()
+
+    async def export():
+        try:
+            return b"".join([chunk async for chunk in export_service.stream_export(query, format)])
+        finally:
+            await read_async_engine.dispose()
+
+    data = pyarrow.BufferReader(asyncio.run(export()))
+    if format == "parquet":
+        table = pyarrow.parquet.read_table(data)
+    else:
+        table = pyarrow.ipc.open_stream(data).read_all()
+
+    assert table.schema == export_service.arrow_schema(query)
+    assert table.column("id").to_pylist() == [row.id for row in expected]
+    assert table.column("current_status").to_pylist() == [row.current_status for row in expected]
@@ -0,0 +1,32 @@
+import pytest
+from app.services.street_service import interpolate_paths, interpolate_points
+
+def test_endpoints_are_returned_exactly():
+    points = interpolate_points([77.2, 28.6], [77.3, 28.7], 3)
+
+    assert points[0] == [77.2, 28.6]
+    assert points[-1] == [77.3, 28.7]
+    assert points[1] == pytest.approx([77.25, 28.65])
+
+def test_points_spread_by_distance_across_segments():
+    # The second segment is three times as long as the first.
+    (points,) = interpolate_paths([[[77.0, 28.0], [77.0, 28.001], [77.0, 28.004]]], [5])
+
+    assert [round(latitude, 6) for _, latitude in points] == [28.0, 28.001, 28.002, 28.003, 28.004]
+
+def test_small_counts_and_invalid_input():
+    assert interpolate_paths([[[1.0, 2.0], [3.0, 4.0]]], [1]) == [[[1.0, 2.0]]]
+    assert interpolate_paths([[[1.0, 2.0], [3.0, 4.0]]], [0]) == [[]]
+    for paths, counts in (([[]], [2]), ([[[1.0, 2.0, 3.0], [1.0, 2.0]]], [2]), ([[[1.0, 2.0]]], [-1])):
+        with pytest.raises(ValueError):
+            interpolate_paths(paths, counts)
+
+def test_paths_in_one_batch_do_not_bleed_into_each_other():
+    paths = [[[77.0, 28.0], [77.0, 28.002]], [[1.0, 2.0], [1.0, 2.0]], [[5.0, 6.0]], [[77.1, 28.1], [77.1, 28.101], [77.1, 28.104]]]
+
+    first, still, single, polyline = interpolate_paths(paths, [3, 3, 2, 5])
+
+    assert [round(latitude, 6) for _, latitude in first] == [28.0, 28.001, 28.002]
+    assert still == [[1.0, 2.0]] * 3
+    assert single == [[5.0, 6.0]] * 2
+    assert [round(latitude, 6) for _, latitude in polyline] == [28.1, 28.101, 28.102, 28.103, 28.104]
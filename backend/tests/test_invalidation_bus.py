@@ -0,0 +1,54 @@
+import re
+from sqlalchemy import event
+from app.models.models import STREET_CHANGE_TABLES
+from app.services import invalidation_bus
+from app.services.geometry_service import get_street_geometries
+from app.services.street_service import build_street_detailed_infos
+from app.services.summary_service import get_street_basic_infos
+
+# Rollups the commit hooks keep current from the tables that are watched.
+ROLLUP_TABLES = {"street_summaries"}
+
+def test_triggers_watch_every_table_the_street_views_read(db, make_street):
+    street = make_street()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        get_street_basic_infos(db, [street.id])
+        build_street_detailed_infos(db, [street.id])
+        get_street_geometries(db, [street.id])
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    read = {
+        table for statement in statements
+        for table in re.findall(r"\b(?:FROM|JOIN) (?:LATERAL )?([a-z_]+)", statement)
+    }
+    assert read - ROLLUP_TABLES <= set(STREET_CHANGE_TABLES)
+
+def test_refreshes_rollups_only_for_writes_not_refreshed_by_the_writer(monkeypatch):
+    listener = invalidation_bus.InvalidationListener()
+    refreshed, invalidated, resets = [], [], []
+    monkeypatch.setattr(listener, "_refresh", lambda *ids: refreshed.append(ids) or set())
+    monkeypatch.setattr(invalidation_bus, "notify_invalidated", lambda *args: invalidated.append(args))
+    monkeypatch.setattr(invalidation_bus, "notify_reset", lambda: resets.append(True))
+
+    listener._handle([
+        {"xid": 7, "street_ids": [1], "light_ids": [10]},
+        {"refreshed_xid": 7},
+        {"xid": 8, "street_ids": [2], "light_ids": []},
+        {"xid": 8, "street_ids": [], "light_ids": [11]},
+    ])
+
+    assert refreshed == [({8: ({2}, {11})}, {1, 2}, {10, 11})]
+    assert invalidated == [({1, 2}, {10, 11}, set())]
+    assert resets == []
+
+    listener._handle([{"reset": True}])
+
+    assert resets == [True]
+    assert len(refreshed) == 1
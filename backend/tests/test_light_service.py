@@ -0,0 +1,33 @@
+from sqlalchemy import delete, event
+from app.models import models
+from app.schemas import schemas
+from app.services.light_service import LIGHT_SECTIONS, create_street_lights
+
+def test_batch_with_every_item_rejected_runs_no_insert(db, count_queries):
+    light = schemas.StreetLightCreate.model_validate({
+        "latitude": 12.9, "longitude": 77.5, "street_id": -1,
+        **{field: None for field in ("address", "ward", *LIGHT_SECTIONS)},
+    })
+
+    created, errors = create_street_lights(db, [light, light])
+    assert created == []
+    assert errors == [(0, "Street -1 not found"), (1, "Street -1 not found")]
+    # Only the street lookup.
+    assert count_queries(lambda: create_street_lights(db, [light])) == 1
+
+def test_street_deleted_after_the_lookup_is_reported_without_database_text(db, make_street):
+    street = make_street(lights=0)
+    light = schemas.StreetLightCreate.model_validate({
+        "latitude": 12.9, "longitude": 77.5, "street_id": street.id,
+        **{field: None for field in ("address", "ward", *LIGHT_SECTIONS)},
+    })
+
+    @event.listens_for(db, "do_orm_execute", once=True)
+    def delete_street_after_lookup(state):
+        streets = state.invoke_statement().freeze()
+        db.execute(delete(models.Street).where(models.Street.id == street.id))
+        return streets()
+
+    created, errors = create_street_lights(db, [light])
+    assert created == []
+    assert errors == [(0, f"Street {street.id} not found")]
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app.models import models
+from app.schemas import schemas
+from app.services.operations_service import ingest_operations, rebuild_operation_rollups
+
+def _reading(light_id: int, timestamp: datetime) -> schemas.StreetLightOperationCreate:
+    return schemas.StreetLightOperationCreate(
+        street_light_id=light_id, timestamp=timestamp, power_consumption=50, voltage_levels=230,
+        current_fluctuations=0.1, temperature=25, environmental_conditions="Clear",
+        current_fluctuations_env=0.1, fault_type=0
+    )
+
+def _hourly_samples(db, rollup, key_column, keys):
+    return sorted(db.scalars(select(rollup.samples).where(key_column.in_(keys), rollup.resolution == "hour")))
+
+def test_ingests_readings_of_lights_without_a_street(db, make_street):
+    street = make_street(lights=1)
+    loose = models.StreetLight(latitude=12.95, longitude=77.55)
+    db.add(loose)
+    db.flush()
+    timestamp = datetime.now().replace(minute=0, second=0, microsecond=0)
+    light_ids = [street.street_lights[0].id, loose.id]
+    light, street_rollup = models.LightOperationRollup, models.StreetOperationRollup
+
+    assert ingest_operations(db, [_reading(light_id, timestamp) for light_id in light_ids]) == 2
+    assert _hourly_samples(db, light, light.street_light_id, light_ids) == [1, 1]
+    assert _hourly_samples(db, street_rollup, street_rollup.street_id, [street.id]) == [1]
+
+    rebuild_operation_rollups(db, timestamp - timedelta(hours=1), timestamp + timedelta(hours=1))
+    assert _hourly_samples(db, light, light.street_light_id, light_ids) == [1, 1]
+    assert _hourly_samples(db, street_rollup, street_rollup.street_id, [street.id]) == [1]
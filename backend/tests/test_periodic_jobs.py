@@ -0,0 +1,16 @@
+from app.main import PeriodicJobLock
+
+def test_one_worker_at_a_time_runs_the_periodic_jobs(db_engine):
+    first, second = PeriodicJobLock(db_engine), PeriodicJobLock(db_engine)
+    try:
+        assert first.held()
+        assert first.held()
+        assert not second.held()
+
+        first.release()
+
+        assert second.held()
+        assert not first.held()
+    finally:
+        first.release()
+        second.release()
@@ -0,0 +1,151 @@
+"""Check that the queries behind the read endpoints use indexes.
+
+Runs each endpoint's queries against the configured database, EXPLAINs
+every statement they issue and fails when a plan sequentially scans a
+table with ``PLAN_CHECK_MIN_ROWS`` (default 10000) or more estimated rows.
+Skipped without a database, and when no table is that large; seed one
+first, e.g. with ``python -m app.data_generator --streets 1000``.
+"""
+import json
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Tuple
+import pytest
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+from app.api.street import STREET_LIGHT_DETAILS
+from app.core.spatial import mercator_position
+from app.models import models
+from app.services.cluster_service import get_clusters
+from app.services.fault_service import FAULT_PAGE_SIZE, fault_query
+from app.services.geometry_service import build_street_geometries
+from app.services.maintenance_service import MAINTENANCE_PAGE_SIZE, get_maintenance_cost_series, maintenance_query
+from app.services.operations_service import get_operation_series
+from app.services.spatial_service import get_viewport
+from app.services.street_batch_service import BATCH_VIEWS, build_street_batch
+from app.services.street_service import build_street_detailed_info
+from app.services.summary_service import get_street_basic_infos
+from app.services.tile_service import build_tile
+
+MIN_ROWS = int(os.getenv("PLAN_CHECK_MIN_ROWS", 10000))
+
+# Half-width in degrees of the viewport and cluster boxes checked around the sample light.
+VIEWPORT_MARGIN = 0.005
+TILE_ZOOM = 15
+CLUSTER_ZOOM = 12
+
+Case = Callable[[Session, models.StreetLight], object]
+
+def _tile(db: Session, light: models.StreetLight):
+    x, y = mercator_position(light.latitude, light.longitude, 2 ** TILE_ZOOM)
+    return build_tile(db, TILE_ZOOM, math.floor(x), math.floor(y))
+
+def _bbox(light: models.StreetLight) -> Tuple[float, float, float, float]:
+    return (
+        light.latitude - VIEWPORT_MARGIN, light.longitude - VIEWPORT_MARGIN,
+        light.latitude + VIEWPORT_MARGIN, light.longitude + VIEWPORT_MARGIN,
+    )
+
+def _series(**keys) -> Case:
+    def run(db: Session, light: models.StreetLight):
+        end = datetime.now()
+        for start in (end - timedelta(hours=6), end - timedelta(days=7), end - timedelta(days=90)):
+            get_operation_series(db, start, end, **{key: getattr(light, column) for key, column in keys.items()})
+    return run
+
+# Endpoint -> the service calls it makes, given a sample light.
+CASES: Dict[str, Case] = {
+    "GET /streetlights/{id}": lambda db, light: db.scalars(
+        select(models.StreetLight).options(*STREET_LIGHT_DETAILS).where(models.StreetLight.id == light.id)
+    ).all(),
+    "GET /streetlights/{id}/operations/series": _series(street_light_id="id"),
+    "GET /streets/{id}/operations/series": _series(street_id="street_id"),
+    "GET /streetlights/faults/": lambda db, light: [
+        db.scalars(query.limit(FAULT_PAGE_SIZE + 1)).all() for query in (
+            fault_query(),
+            fault_query(fault_type=1, start=datetime.now() - timedelta(days=1)),
+            fault_query(street_id=light.street_id),
+            fault_query(ward=light.ward),
+        )
+    ],
+    "GET /streets/{id}/maintenance": lambda db, light: db.scalars(
+        maintenance_query(light.street_id).limit(MAINTENANCE_PAGE_SIZE + 1)
+    ).all(),
+    "GET /streets/{id}/maintenance/costs": lambda db, light: get_maintenance_cost_series(db, light.street_id),
+    "GET /streets/{id}/basic": lambda db, light: get_street_basic_infos(db, [light.street_id]),
+    "GET /streets/{id}/detailed": lambda db, light: build_street_detailed_info(db, light.street_id),
+    "GET /streets/{id}/detailed?include=energy_summary": lambda db, light: build_street_detailed_info(
+        db, light.street_id, ["energy_summary"]
+    ),
+    "GET /streets/batch": lambda db, light: [
+        build_street_batch(db, view, [light.street_id, light.street_id + 1]) for view in BATCH_VIEWS
+    ],
+    "GET /streets/geometry": lambda db, light: build_street_geometries(db, [light.street_id]),
+    "GET /streets/list": lambda db, light: get_street_basic_infos(db),
+    "GET /viewport": lambda db, light: get_viewport(db, *_bbox(light), 50000),
+    "GET /clusters": lambda db, light: get_clusters(db, CLUSTER_ZOOM, *_bbox(light)),
+    "GET /tiles/{z}/{x}/{y}.mvt": _tile,
+}
+
+def _capture(db: Session, case: Case, light: models.StreetLight) -> List[Tuple[str, object]]:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        case(db, light)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+    return statements
+
+def _plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+def sequential_scans(db: Session, statement: str, parameters, large_tables: Dict[str, int]) -> List[Tuple[str, int]]:
+    """Large tables the plan for ``statement`` reads with a sequential scan."""
+    (plan,) = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    if isinstance(plan, str):
+        (plan,) = json.loads(plan)
+    return [
+        (node["Relation Name"], large_tables[node["Relation Name"]])
+        for node in _plan_nodes(plan["Plan"])
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in large_tables
+    ]
+
+@pytest.fixture(scope="module")
+def large_tables(db_engine) -> Dict[str, int]:
+    with db_engine.connect() as connection:
+        tables = {
+            name: int(rows) for name, rows in connection.execute(text(
+                "SELECT relname, reltuples FROM pg_class "
+                "WHERE relkind IN ('r', 'p') AND reltuples >= :min_rows"
+            ), {"min_rows": MIN_ROWS})
+        }
+    if not tables:
+        pytest.skip(f"No table has {MIN_ROWS} rows; seed the database first")
+    return tables
+
+@pytest.fixture
+def sample_light(db) -> models.StreetLight:
+    light = db.scalars(
+        select(models.StreetLight).where(models.StreetLight.street_id.is_not(None)).order_by(models.StreetLight.id)
+    ).first()
+    if light is None:
+        pytest.skip("No street lights to check against; seed the database first")
+    return light
+
+@pytest.mark.parametrize("name", CASES)
+def test_endpoint_queries_use_indexes(db, large_tables, sample_light, name):
+    statements = _capture(db, CASES[name], sample_light)
+    scans = {
+        scan
+        for statement, parameters in statements
+        for scan in sequential_scans(db, statement, parameters, large_tables)
+    }
+    assert not scans, f"{name}: sequential scans on {', '.join(f'{table} (~{rows} rows)' for table, rows in sorted(scans))}"
@@ -0,0 +1,71 @@
+import asyncio
+from starlette.requests import Request
+from app.core.cache import LRUCache, LocalCacheBackend
+from app.services import response_cache
+
+def _serve(view, build, street_id=1):
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+    return asyncio.run(response_cache.cached_response(request, view, street_id, bytes, build))
+
+class _FakeSession:
+    def __init__(self, name, opened):
+        self.name = name
+        opened.append(name)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+def _setup(monkeypatch, recent_window=0):
+    monkeypatch.setattr(response_cache, "_backend", LocalCacheBackend(recent_window))
+    monkeypatch.setattr(response_cache, "_local", LRUCache(8))
+    sessions = []
+    monkeypatch.setattr(response_cache, "AsyncSessionLocal", lambda: _FakeSession("primary", sessions))
+    monkeypatch.setattr(response_cache, "ReadAsyncSessionLocal", lambda: _FakeSession("replica", sessions))
+    return sessions
+
+def test_invalidation_drops_every_detailed_section_set(monkeypatch):
+    _setup(monkeypatch)
+    builds = []
+
+    async def build(db):
+        builds.append(db.name)
+        return b"{}"
+
+    for view in ("detailed", "detailed:cost_summary", "detailed:cost_summary,warranty_summary"):
+        _serve(view, build)
+    assert len(response_cache._local.get(1)) == 3
+
+    response_cache.invalidate_street_responses({1}, set(), set())
+
+    assert 1 not in response_cache._local
+    _serve("detailed:cost_summary", build)
+    assert len(builds) == 4
+
+def test_rebuilds_from_primary_right_after_an_invalidation(monkeypatch):
+    sessions = _setup(monkeypatch, recent_window=60)
+
+    async def build(db):
+        return b"{}"
+
+    _serve("basic", build)
+    response_cache.invalidate_street_responses({1}, set(), set())
+    _serve("basic", build)
+
+    assert sessions == ["replica", "primary"]
+
+def test_local_entries_expire(monkeypatch):
+    _setup(monkeypatch)
+    monkeypatch.setattr(response_cache.settings, "response_cache_ttl", 0)
+    builds = []
+
+    async def build(db):
+        builds.append(db.name)
+        return b"{}"
+
+    _serve("basic", build)
+    _serve("basic", build)
+
+    assert len(builds) == 2
@@ -0,0 +1,44 @@
+from datetime import date
+from app.models import models
+from app.services.street_service import build_street_detailed_payloads
+
+# Streets, lights, maintenance, energy, costs and warranties: one query each.
+MAX_DETAILED_QUERIES = 6
+
+def test_detailed_query_count_does_not_grow_with_streets(db, count_queries, make_street):
+    street_ids = [make_street(lights=3).id for _ in range(5)]
+
+    assert count_queries(lambda: build_street_detailed_payloads(db, street_ids[:1])) <= MAX_DETAILED_QUERIES
+    assert count_queries(lambda: build_street_detailed_payloads(db, street_ids)) <= MAX_DETAILED_QUERIES
+
+def test_detailed_sections_run_only_their_queries(db, count_queries, make_street):
+    street_id = make_street(lights=3).id
+
+    assert count_queries(lambda: build_street_detailed_payloads(db, [street_id], ["cost_summary"])) == 2
+
+def test_detailed_lights_report_latest_status_once(db, make_street):
+    street = make_street(lights=2)
+    light = street.street_lights[0]
+    db.add(models.OperationalStatus(street_light_id=light.id, current_status="Faulty", last_status_update=date.today()))
+    db.flush()
+
+    lights = build_street_detailed_payloads(db, [street.id], ["lights_info"])[street.id]["lights_info"]
+
+    assert [payload["id"] for payload in lights] == sorted(l.id for l in street.street_lights)
+    assert lights[0]["status"]["current_status"] == "Faulty"
+    assert lights[1]["status"]["current_status"] == "Operational"
+
+def test_detailed_lights_report_latest_installation_and_specification_once(db, make_street):
+    street = make_street(lights=1)
+    light = street.street_lights[0]
+    db.add_all([
+        models.InstallationDetail(street_light_id=light.id, installation_date=date.today(), contractor_name="Second"),
+        models.LightSpecification(street_light_id=light.id, bulb_type="Sodium", wattage=150),
+    ])
+    db.flush()
+
+    lights = build_street_detailed_payloads(db, [street.id], ["lights_info"])[street.id]["lights_info"]
+
+    assert len(lights) == 1
+    assert lights[0]["installation"]["contractor_name"] == "Second"
+    assert lights[0]["specifications"]["bulb_type"] == "Sodium"
@@ -0,0 +1,21 @@
+from app.services.street_service import get_street_stats
+
+# One grouped query per figure: lights, power, statuses and recent issues.
+MAX_STREET_STATS_QUERIES = 4
+
+def test_street_stats_query_count_does_not_grow_with_streets(db, count_queries, make_street):
+    streets = [make_street(lights=3) for _ in range(5)]
+    street_ids = [street.id for street in streets]
+
+    assert count_queries(lambda: get_street_stats(db, street_ids[:1])) <= MAX_STREET_STATS_QUERIES
+    assert count_queries(lambda: get_street_stats(db, street_ids)) <= MAX_STREET_STATS_QUERIES
+
+def test_street_stats_figures(db, make_street):
+    street = make_street(lights=3)
+
+    stats = get_street_stats(db, [street.id])[street.id]
+
+    assert stats["total_lights"] == 3
+    assert stats["total_power_consumption"] == 135
+    assert stats["operational_summary"] == {"Operational": 3}
+    assert stats["recent_issues"] == 3
@@ -0,0 +1,51 @@
+from datetime import date
+from app.core.cache import LRUCache
+from app.models import models
+from app.services import change_tracking, tile_service
+
+def test_tile_index_only_covers_cached_tiles(monkeypatch):
+    monkeypatch.setattr(tile_service, "_memory_cache", LRUCache(2))
+    monkeypatch.setattr(tile_service, "_tiles_by_street", tile_service.defaultdict(set))
+    monkeypatch.setattr(tile_service, "build_tile", lambda db, z, x, y: (b"tile", {x, x + 1}))
+
+    for x in range(10):
+        tile_service.get_tile(None, 15, x, 0)
+
+    assert dict(tile_service._tiles_by_street) == {8: {(15, 8, 0)}, 9: {(15, 8, 0), (15, 9, 0)}, 10: {(15, 9, 0)}}
+
+    tile_service.invalidate_tiles({9}, set(), set())
+
+    assert len(tile_service._memory_cache) == 0
+    assert dict(tile_service._tiles_by_street) == {}
+
+def test_commit_passes_changed_positions_to_listeners(db, make_street, monkeypatch):
+    street = make_street(lights=0)
+    db.commit()
+    received = []
+    monkeypatch.setattr(change_tracking, "_invalidation_listeners", [
+        lambda street_ids, light_ids, positions: received.append((street_ids, positions))
+    ])
+
+    db.add(models.StreetLight(street_id=street.id, latitude=12.95, longitude=77.55))
+    db.commit()
+
+    (street_ids, positions), = received
+    assert street_ids == {street.id}
+    assert {(12.95, 77.55), (12.9, 77.5), (12.91, 77.51)} <= positions
+
+def test_light_tile_shows_each_light_once_with_its_latest_status(db, make_street, monkeypatch):
+    street = make_street(lights=2)
+    light = street.street_lights[0]
+    db.add(models.OperationalStatus(street_light_id=light.id, current_status="Faulty", last_status_update=date.today()))
+    db.flush()
+    encoded = {}
+    monkeypatch.setattr(tile_service.mvt, "encode_tile", lambda layers, extent: encoded.update(layers) or b"tile")
+    z = tile_service.MIN_LIGHT_TILE_ZOOM + 5
+    x, y = tile_service.mercator_position(12.9, 77.5, 2 ** z)
+
+    tile_service.build_tile(db, z, int(x), int(y))
+
+    features = [feature for feature in encoded["lights"] if feature["properties"]["street_id"] == street.id]
+    statuses = {feature["id"]: feature["properties"]["status"] for feature in features}
+    assert len(features) == len(statuses)
+    assert statuses == {light.id: "Faulty", street.street_lights[1].id: "Operational"}
@@ -0,0 +1,18 @@
+from datetime import date
+from app.models import models
+from app.services.spatial_service import get_viewport
+
+# Around make_street's lights, away from the seeded ones.
+BBOX = (12.8999, 77.4999, 12.9003, 77.5003)
+
+def test_viewport_lists_each_light_once_with_its_latest_status(db, make_street):
+    street = make_street(lights=3)
+    light = street.street_lights[0]
+    db.add(models.OperationalStatus(street_light_id=light.id, current_status="Faulty", last_status_update=date.today()))
+    db.flush()
+
+    viewport = get_viewport(db, *BBOX, limit=3)
+
+    assert sorted(viewport_light.id for viewport_light in viewport.lights) == sorted(street_light.id for street_light in street.street_lights)
+    assert {viewport_light.id: viewport_light.status for viewport_light in viewport.lights}[light.id] == "Faulty"
+    assert not viewport.truncated
@@ -0,0 +1,26 @@
+from app.services.ward_service import get_ward_summaries
+
+def _ward_counts(db):
+    return {
+        summary.name: (summary.total_streets, summary.total_lights)
+        for summary in get_ward_summaries(db) if summary.name.startswith("Test ward")
+    }
+
+def test_rows_moved_or_deleted_refresh_the_ward_they_left(db, make_street):
+    street = make_street(lights=3, ward="Test ward A")
+    db.commit()
+    assert _ward_counts(db) == {"Test ward A": (1, 3)}
+
+    street.ward = "Test ward B"
+    db.commit()
+    assert _ward_counts(db) == {"Test ward A": (0, 3), "Test ward B": (1, 0)}
+
+    # Neither the lights' street nor their new ward leads back to the ward they left.
+    moved, deleted = street.street_lights[0], street.street_lights[1]
+    moved.ward = "Test ward C"
+    db.commit()
+    assert _ward_counts(db) == {"Test ward A": (0, 2), "Test ward B": (1, 0), "Test ward C": (0, 1)}
+
+    db.delete(deleted)
+    db.commit()
+    assert _ward_counts(db) == {"Test ward A": (0, 1), "Test ward B": (1, 0), "Test ward C": (0, 1)}
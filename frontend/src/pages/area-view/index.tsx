@@ -7,11 +7,11 @@ import "maplibre-gl/dist/maplibre-gl.css";
 import { transformRequest } from '../../services/ola-maps-api';
 import { FlyToInterpolator } from '@deck.gl/core';
 import { ScatterplotLayer, PathLayer } from '@deck.gl/layers';
-import { fetchInterpolatedPoints, fetchStreetBasicInfo } from "../../services/be-api";
+import { fetchStreetGeometries } from "../../services/be-api";
 import './Map.css';
 import Loading from "../../components/loading/Loading";
 import Sidebar from "../../components/sidebar/Sidebar";
-import { StreetBasicInfo } from '../../types/street';
+import { StreetBasicInfo, StreetGeometry } from '../../types/street';
 import { useNavigate } from "react-router-dom";
 
 const mapStyle = process.env.REACT_APP_MAP_STYLE;
@@ -26,12 +26,11 @@ const Map: React.FC = () => {
     transitionDuration: 0,
   });
   const navigate = useNavigate();
-  const [streetPoints, setStreetPoints] = useState<number[][]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [isSidebarOpen, setIsSidebarOpen] = useState(false);
   const [selectedStreetInfo, setSelectedStreetInfo] = useState<StreetBasicInfo | null>(null);
-  const [streetPathData, setStreetPathData] = useState<StreetBasicInfo | null>(null); // New state
+  const [streetGeometries, setStreetGeometries] = useState<StreetGeometry[]>([]);
 
   useEffect(() => {
     setTimeout(() => {
@@ -48,14 +47,8 @@ const Map: React.FC = () => {
 
     const fetchData = async () => {
       try {
-        const streetData = await fetchStreetBasicInfo(1);
-        const points = await fetchInterpolatedPoints(
-          [streetData.coordinates.start.longitude, streetData.coordinates.start.latitude],
-          [streetData.coordinates.end.longitude, streetData.coordinates.end.latitude],
-          streetData.total_lights
-        );
-        setStreetPathData(streetData);
-        setStreetPoints(points);
+        const geometries = await fetchStreetGeometries([1]);
+        setStreetGeometries(geometries);
         setLoading(false);
       } catch (err) {
         setError("Failed to fetch street points");
@@ -66,20 +59,17 @@ const Map: React.FC = () => {
     fetchData();
   }, []);
 
-  const pathLayer = streetPathData
+  const pathLayer = streetGeometries.length
     ? new PathLayer({
         id: "path-layer",
-        data: [streetPathData],
-        getPath: (d) => [
-          [d.coordinates.start.longitude, d.coordinates.start.latitude],
-          [d.coordinates.end.longitude, d.coordinates.end.latitude],
-        ],
+        data: streetGeometries.filter((geometry) => geometry.path.length),
+        getPath: (d) => d.path,
         getWidth: 5,
         getColor: [0, 128, 255],
         pickable: true,
         onClick: (info) => {
           if (info.object) {
-            setSelectedStreetInfo(info.object); 
+            setSelectedStreetInfo(info.object.street);
             setIsSidebarOpen(true);
           }
         },
@@ -88,7 +78,9 @@ const Map: React.FC = () => {
 
   const scatterplotLayer = new ScatterplotLayer({
     id: "scatterplot-layer",
-    data: streetPoints.map((point) => ({ position: point, size: 1 })),
+    data: streetGeometries.flatMap((geometry) =>
+      geometry.light_positions.map((point) => ({ position: point, size: 1 }))
+    ),
     getPosition: (d) => d.position,
     getRadius: (d) => d.size,
     getColor: [255, 0, 0],
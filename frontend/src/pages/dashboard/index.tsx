@@ -15,21 +15,34 @@ import {
   Pie,
   Cell,
 } from "recharts";
-import { fetchStreetDetailedInfo } from "../../services/be-api";
+import { fetchMaintenanceCostSeries, fetchStreetDetailedInfo } from "../../services/be-api";
+import { MaintenanceCostSeries } from "../../types/street";
+
+const DETAILED_SECTIONS = ["lights_info", "energy_summary", "cost_summary", "warranty_summary"];
 
 const Dashboard: React.FC = () => {
   const [data, setData] = useState<any>(null);
+  const [maintenanceCosts, setMaintenanceCosts] = useState<MaintenanceCostSeries | null>(null);
   const [toggleConsumption, setToggleConsumption] = useState<"daily" | "monthly">("daily");
+  const [maintenanceResolution, setMaintenanceResolution] = useState<"week" | "month">("month");
 
   useEffect(() => {
     const fetchData = async () => {
-      const streetData = await fetchStreetDetailedInfo(1);
+      const streetData = await fetchStreetDetailedInfo(1, DETAILED_SECTIONS);
       setData(streetData);
     };
     fetchData();
   }, []);
 
-  if (!data) return <div>Loading...</div>;
+  useEffect(() => {
+    const fetchMaintenanceCosts = async () => {
+      const series = await fetchMaintenanceCostSeries(1, maintenanceResolution);
+      setMaintenanceCosts(series);
+    };
+    fetchMaintenanceCosts();
+  }, [maintenanceResolution]);
+
+  if (!data || !maintenanceCosts) return <div>Loading...</div>;
 
   const energyConsumptionData =
     toggleConsumption === "daily"
@@ -42,14 +55,11 @@ const Dashboard: React.FC = () => {
           consumption: light.monthly_consumption.toFixed(3),
         }));
 
-  const maintenanceCostData = data.maintenance_summary.maintenance.map(
-    (maintenance: any) => ({
-      date: maintenance.date,
-      cost: Math.round(maintenance.cost),
-      type: maintenance.type,
-      street_light_id: maintenance.street_light_id,
-    })
-  );
+  const maintenanceCostData = maintenanceCosts.points.map((point) => ({
+    date: point.bucket,
+    cost: Math.round(point.cost),
+    records: point.records,
+  }));
 
   const costSummaryData = [
     { name: "Installation Cost", value: Math.round(data.cost_summary.total_installation_cost) },
@@ -72,7 +82,7 @@ const Dashboard: React.FC = () => {
         </div>
         <div className="card">
           <h3>Maintenance Records</h3>
-          <p>{data.maintenance_summary.total_maintenance_records}</p>
+          <p>{maintenanceCosts.total_records}</p>
         </div>
       </div>
 
@@ -142,13 +152,22 @@ const Dashboard: React.FC = () => {
           </ResponsiveContainer>
         </div>
         <div className="chart">
-          <h4>Maintenance Costs</h4>
+          <div className="chart-header">
+            <h4>Maintenance Costs</h4>
+            <button
+              onClick={() =>
+                setMaintenanceResolution(maintenanceResolution === "month" ? "week" : "month")
+              }
+            >
+              Show {maintenanceResolution === "month" ? "Weekly" : "Monthly"}
+            </button>
+          </div>
           <ResponsiveContainer width="100%" height={300}>
             <LineChart data={maintenanceCostData}>
               <CartesianGrid stroke="#f5f5f5" />
               <XAxis dataKey="date" />
               <YAxis />
-              <Tooltip formatter={(value, name, props) => [`₹${value}`, `${props.payload.type} on light id - ${props.payload.street_light_id}`]} />
+              <Tooltip formatter={(value, name, props) => [`₹${value}`, `${props.payload.records} maintenance records`]} />
               <Legend />
               <Line type="monotone" dataKey="cost" stroke="#8884d8" />
             </LineChart>
@@ -1,4 +1,11 @@
 import axios from "axios";
+import {
+  ClusterResponse,
+  MaintenanceCostSeries,
+  MaintenancePage,
+  StreetGeometry,
+  ViewportResponse,
+} from "../types/street";
 
 const BASE_URL = process.env.REACT_APP_BE_URL;
 
@@ -16,6 +23,20 @@ export const fetchInterpolatedPoints = async (startPoint: number[], endPoint: nu
   }
 };
 
+export const fetchInterpolatedPaths = async (
+  paths: { path: number[][]; numPoints: number }[]
+): Promise<number[][][]> => {
+  try {
+    const response = await axios.post(`${BASE_URL}/api/interpolate-points/batch`, {
+      paths: paths.map(({ path, numPoints }) => ({ path, num_points: numPoints })),
+    });
+    return response.data.paths;
+  } catch (error) {
+    console.error("Error fetching interpolated paths:", error);
+    throw new Error("Failed to fetch paths.");
+  }
+};
+
 export const fetchStreetBasicInfo = async (streetId: number) => {
   try {
     const response = await axios.get(`${BASE_URL}/api/streets/${streetId}/basic`);
@@ -26,12 +47,115 @@ export const fetchStreetBasicInfo = async (streetId: number) => {
   }
 };
 
-export const fetchStreetDetailedInfo = async (streetId: number) => {
+export const fetchStreetDetailedInfo = async (streetId: number, include?: string[]) => {
+  try {
+    const response = await axios.get(`${BASE_URL}/api/streets/${streetId}/detailed`, {
+      params: include ? { include: include.join(",") } : undefined,
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching street information:", error);
+    throw new Error("Failed to fetch street information.");
+  }
+};
+
+export const fetchStreetsBatch = async (
+  streetIds: number[],
+  view: "basic" | "detailed" = "basic",
+  include?: string[]
+) => {
   try {
-    const response = await axios.get(`${BASE_URL}/api/streets/${streetId}/detailed`);
+    const response = await axios.get(`${BASE_URL}/api/streets/batch`, {
+      params: { ids: streetIds, view, include: include?.join(",") },
+      paramsSerializer: { indexes: null },
+    });
     return response.data;
   } catch (error) {
     console.error("Error fetching street information:", error);
     throw new Error("Failed to fetch street information.");
   }
-};
\ No newline at end of file
+};
+
+export const fetchStreetMaintenance = async (
+  streetId: number,
+  options: { cursor?: string; limit?: number; maintenanceType?: string; start?: string; end?: string } = {}
+): Promise<MaintenancePage> => {
+  try {
+    const response = await axios.get(`${BASE_URL}/api/streets/${streetId}/maintenance`, {
+      params: {
+        cursor: options.cursor,
+        limit: options.limit,
+        maintenance_type: options.maintenanceType,
+        start: options.start,
+        end: options.end,
+      },
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching maintenance history:", error);
+    throw new Error("Failed to fetch maintenance history.");
+  }
+};
+
+export const fetchMaintenanceCostSeries = async (
+  streetId: number,
+  resolution: "week" | "month" = "month"
+): Promise<MaintenanceCostSeries> => {
+  try {
+    const response = await axios.get(`${BASE_URL}/api/streets/${streetId}/maintenance/costs`, {
+      params: { resolution },
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching maintenance costs:", error);
+    throw new Error("Failed to fetch maintenance costs.");
+  }
+};
+
+export const fetchStreetGeometries = async (streetIds: number[]): Promise<StreetGeometry[]> => {
+  try {
+    const response = await axios.get(`${BASE_URL}/api/streets/geometry`, {
+      params: { ids: streetIds },
+      paramsSerializer: { indexes: null },
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching street geometry:", error);
+    throw new Error("Failed to fetch street geometry.");
+  }
+};
+
+export const fetchViewport = async (
+  minLat: number,
+  minLon: number,
+  maxLat: number,
+  maxLon: number
+): Promise<ViewportResponse> => {
+  try {
+    const response = await axios.get(`${BASE_URL}/api/viewport`, {
+      params: { min_lat: minLat, min_lon: minLon, max_lat: maxLat, max_lon: maxLon },
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching viewport lights:", error);
+    throw new Error("Failed to fetch viewport lights.");
+  }
+};
+
+export const fetchClusters = async (
+  zoom: number,
+  minLat: number,
+  minLon: number,
+  maxLat: number,
+  maxLon: number
+): Promise<ClusterResponse> => {
+  try {
+    const response = await axios.get(`${BASE_URL}/api/clusters`, {
+      params: { zoom: Math.floor(zoom), min_lat: minLat, min_lon: minLon, max_lat: maxLat, max_lon: maxLon },
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching light clusters:", error);
+    throw new Error("Failed to fetch light clusters.");
+  }
+};
@@ -6,4 +6,83 @@ export interface StreetBasicInfo {
   total_power_consumption: number;
   operational_summary: { [key: string]: number };
   recent_issues: number;
-}
\ No newline at end of file
+}
+
+export interface Coordinates {
+  latitude: number;
+  longitude: number;
+}
+
+export interface StreetLocation {
+  start: Coordinates;
+  end: Coordinates;
+}
+
+export interface ViewportLight {
+  id: number;
+  street_id: number | null;
+  latitude: number;
+  longitude: number;
+  status: string | null;
+}
+
+export interface ViewportStreet {
+  id: number;
+  street_name: string;
+  ward: string | null;
+  coordinates: StreetLocation | null;
+}
+
+export interface ViewportResponse {
+  lights: ViewportLight[];
+  streets: ViewportStreet[];
+  truncated: boolean;
+}
+
+export interface LightCluster {
+  latitude: number;
+  longitude: number;
+  count: number;
+  status_counts: { [status: string]: number };
+}
+
+export interface ClusterResponse {
+  zoom: number;
+  clusters: LightCluster[];
+}
+
+export interface StreetGeometry {
+  street: StreetBasicInfo;
+  path: number[][];
+  light_positions: number[][];
+}
+
+export interface MaintenanceRecord {
+  id: number;
+  street_light_id: number;
+  maintenance_date: string;
+  maintenance_type: string | null;
+  cost: number | null;
+  contractor_name: string | null;
+  notes: string | null;
+}
+
+export interface MaintenancePage {
+  items: MaintenanceRecord[];
+  next_cursor: string | null;
+}
+
+export interface MaintenanceCostPoint {
+  bucket: string;
+  records: number;
+  cost: number;
+}
+
+export interface MaintenanceCostSeries {
+  resolution: "week" | "month";
+  start: string | null;
+  end: string | null;
+  total_records: number;
+  total_cost: number;
+  points: MaintenanceCostPoint[];
+}